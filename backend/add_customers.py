@@ -3,9 +3,10 @@
 Script to add multiple customers to the database using SQLite directly
 """
 import sqlite3
-import uuid
 from datetime import datetime
 
+from ids import new_id
+
 customers_data = [
     {
         "name": "علی اکبر رفعتی",
@@ -120,7 +121,7 @@ def add_customers():
                 continue
             
             # Create new customer
-            customer_id = str(uuid.uuid4())
+            customer_id = new_id()
             created_at = datetime.now().isoformat()
             
             cursor.execute("""
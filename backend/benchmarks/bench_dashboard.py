@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Latency of GET /api/dashboard/summary (routers.dashboard.dashboard_summary).
+
+Creates a database with the real schema (all migrations) holding
+INSTALLMENTS installment rows, 12 per sale, most of the past ones paid and
+some overdue, and times the summary on one read snapshot:
+
+- cold: every call recomputes the aggregates (as right after a write)
+- warm: nothing changed since the previous call
+
+Usage:
+    python benchmarks/bench_dashboard.py [installments] [requests]
+"""
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database  # noqa: E402
+import migrations  # noqa: E402
+from ids import new_id  # noqa: E402
+from routers import dashboard  # noqa: E402
+
+TODAY = date(2026, 1, 1)
+
+
+def build(path: str, installment_count: int, seed: int = 7) -> None:
+    migrations.run_migrations(path)
+    rng = random.Random(seed)
+    conn = database.connect(path)
+    customer_id, phone_id = new_id(), new_id()
+    conn.execute(
+        "INSERT INTO customers (id, name, phone, national_id, address, created_at) VALUES (?, 'C', '', '', '', ?)",
+        (customer_id, TODAY.isoformat()),
+    )
+    conn.execute(
+        "INSERT INTO partners (id, name, capital, available_capital, share, created_at) VALUES (?, 'P', ?, ?, 100, ?)",
+        (new_id(), 10**12, 10**12, "2022-01-01T00:00:00.000Z"),
+    )
+    sales, installments = [], []
+    for _ in range(installment_count // 12):
+        sale_id = new_id()
+        sold = TODAY - timedelta(days=rng.randrange(0, 1500))
+        price = rng.randrange(100, 800) * 100_000
+        sales.append((sale_id, customer_id, phone_id, price + 2_000_000, price, 0, 12, 0.04, 2_000_000, sold.isoformat()))
+        for month in range(1, 13):
+            due = sold + timedelta(days=30 * month)
+            if due >= TODAY:
+                status = "pending"
+            else:
+                status = "paid" if rng.random() < 0.95 else "overdue"
+            interest = round(price * 0.04 * (13 - month) / 12)
+            installments.append((
+                new_id(), sale_id, month, price // 12, interest, price // 12 + interest, 0, due.isoformat(), status,
+            ))
+    conn.executemany(
+        "INSERT INTO sales (id, customer_id, phone_id, announced_price, purchase_price, down_payment, "
+        "installment_months, monthly_interest_rate, initial_profit, sale_date) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        sales,
+    )
+    conn.executemany(
+        "INSERT INTO installments (id, sale_id, installment_number, principal_amount, interest_amount, "
+        "total_amount, remaining_debt, due_date, status) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        installments,
+    )
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+
+
+def timings(conn, requests: int, cold: bool) -> list:
+    result = []
+    for _ in range(requests):
+        if cold:
+            dashboard._last = None
+        start = time.perf_counter()
+        conn.execute("BEGIN")
+        dashboard.dashboard_summary(conn.cursor(), TODAY.isoformat())
+        conn.execute("COMMIT")
+        result.append((time.perf_counter() - start) * 1000)
+    return result
+
+
+def report(label: str, values: list) -> None:
+    values = sorted(values)
+    p95 = values[min(len(values) - 1, int(len(values) * 0.95))]
+    print(f"{label:5} p50 {statistics.median(values):8.2f} ms   p95 {p95:8.2f} ms   max {values[-1]:8.2f} ms")
+
+
+def main() -> None:
+    installment_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    path = os.path.join(tempfile.mkdtemp(), "dashboard.db")
+    start = time.perf_counter()
+    build(path, installment_count)
+    print(f"{installment_count:,} installments built in {time.perf_counter() - start:.1f} s")
+
+    conn = database.connect(path)
+    conn.isolation_level = None
+    report("cold", timings(conn, requests, cold=True))
+    report("warm", timings(conn, requests * 10, cold=False))
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
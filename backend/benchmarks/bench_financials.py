@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Partner financials: GET /api/financials (financials.compute_financials) vs
+the browser's calculateFinancialsFromData (src/lib/profitCalculator.ts).
+
+For each size, builds an in-memory database with PARTNERS partners (some
+deleted), sales and 12 installments per sale (some paid, some whose sale was
+deleted), times compute_financials, and checks it against the port of the
+TypeScript function in profit_reference.py fed the same rows the frontend
+would fetch. Amounts must agree to the Toman, shares exactly.
+``--no-reference`` skips it. ``python financials.py check`` runs the same
+comparison on a real database.
+
+Usage:
+    python benchmarks/bench_financials.py [installments ...] [--no-reference]
+"""
+import os
+import random
+import sqlite3
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from financials import compute_financials  # noqa: E402
+from profit_reference import compare, database_from, frontend_data, reference  # noqa: E402
+from ids import new_id  # noqa: E402
+
+PARTNERS = 20
+START = date(2023, 1, 1)
+
+
+def build(installment_count: int, seed: int = 7) -> sqlite3.Connection:
+    rng = random.Random(seed)
+    partners = []
+    for n in range(PARTNERS):
+        joined = START + timedelta(days=rng.randrange(0, 900))
+        created_at = f"{joined.isoformat()}T{rng.randrange(24):02d}:{rng.randrange(60):02d}:00.000Z"
+        deleted_at, status = None, "active"
+        if n % 5 == 4:
+            left = joined + timedelta(days=rng.randrange(30, 400))
+            deleted_at, status = f"{left.isoformat()}T09:30:00.000Z", "inactive"
+        partners.append((new_id(), f"Partner {n}", rng.randrange(50, 500) * 10_000_000, status, created_at, deleted_at))
+    # One partner joins exactly at midnight of a sale day
+    partners[0] = partners[0][:4] + ("2024-03-01T00:00:00.000Z", None)
+
+    sales, installments = [], []
+    for _ in range(max(1, installment_count // 12)):
+        sale_id = new_id()
+        sold = START + timedelta(days=rng.randrange(0, 1000))
+        price = rng.randrange(100, 800) * 100_000
+        # Every 50th sale was deleted; its installments stay
+        if len(installments) % 600 != 0:
+            profit = rng.randrange(5, 40) * 100_000
+            sales.append((sale_id, price + profit, price, 0, profit, sold.isoformat()))
+        for month in range(1, 13):
+            due = sold + timedelta(days=30 * month)
+            paid = due < START + timedelta(days=900) and rng.random() < 0.8
+            interest = round(price * 0.04 * (13 - month) / 12)
+            installments.append((
+                new_id(), sale_id, price // 12, interest, price // 12 + interest,
+                due.isoformat(), None, "paid" if paid else "pending",
+            ))
+    return database_from(partners, sales, installments)
+
+
+def best_of(fn, runs: int) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    with_reference = "--no-reference" not in sys.argv
+    sizes = [int(arg) for arg in args] or [10_000, 100_000, 1_000_000]
+    failed = False
+    for size in sizes:
+        conn = build(size)
+        cursor = conn.cursor()
+        result = compute_financials(cursor)
+        server_time = best_of(lambda: compute_financials(cursor), 5)
+        line = f"{size:>9,} installments  server {server_time * 1000:8.1f} ms"
+        if with_reference:
+            data = frontend_data(conn)
+            start = time.perf_counter()
+            expected = reference(*data)
+            line += f"  reference {(time.perf_counter() - start) * 1000:9.1f} ms"
+            problems = compare(result, expected)
+            line += "  parity OK" if not problems else f"  MISMATCH ({len(problems)})"
+            for problem in problems[:10]:
+                line += f"\n    {problem}"
+            failed = failed or bool(problems)
+        print(line)
+        conn.close()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Insert throughput and file size: random UUIDv4 vs time-ordered UUIDv7 keys.
+
+Inserts ROWS installment-shaped rows into a fresh database per key type, in
+transactions of BATCH rows (like group commit does), and reports rows/s,
+page count and file size after a checkpoint.
+
+Usage:
+    python benchmarks/bench_ids.py [rows] [batch]
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ids import new_id  # noqa: E402
+
+SCHEMA = """
+    CREATE TABLE installments (
+        id TEXT PRIMARY KEY,
+        sale_id TEXT NOT NULL,
+        installment_number INTEGER NOT NULL,
+        principal_amount REAL NOT NULL,
+        interest_amount REAL NOT NULL,
+        total_amount REAL NOT NULL,
+        remaining_debt REAL NOT NULL,
+        due_date TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending'
+    )
+"""
+
+
+def run(label, make_id, rows, batch):
+    path = os.path.join(tempfile.mkdtemp(), f"{label}.db")
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(SCHEMA)
+    conn.execute("CREATE INDEX idx_installments_sale ON installments(sale_id)")
+
+    sale_id = make_id()
+    started = time.perf_counter()
+    for offset in range(0, rows, batch):
+        conn.execute("BEGIN")
+        conn.executemany(
+            "INSERT INTO installments VALUES (?, ?, ?, 1000000, 48000, 1048000, 0, '2026-01-01', 'pending')",
+            [(make_id(), sale_id, n) for n in range(offset, min(offset + batch, rows))],
+        )
+        conn.execute("COMMIT")
+    elapsed = time.perf_counter() - started
+
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    pages = conn.execute("PRAGMA page_count").fetchone()[0]
+    conn.close()
+    size = os.path.getsize(path)
+    os.remove(path)
+    return rows / elapsed, pages, size
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    batch = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    print(f"{rows} rows, {batch} rows per transaction")
+    print(f"{'key':<8} {'rows/s':>10} {'pages':>8} {'size MB':>9}")
+    for label, make_id in (("uuid4", lambda: str(uuid.uuid4())), ("uuid7", new_id)):
+        rate, pages, size = run(label, make_id, rows, batch)
+        print(f"{label:<8} {rate:>10.0f} {pages:>8} {size / 1_048_576:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Per-row cost of list responses: validated response_model path vs fast path.
+
+Builds ROWS installment rows in an in-memory database, then serializes the
+fetched sqlite3.Row list the way FastAPI does for ``response_model=
+List[Installment]`` (dict rows -> validate -> dump by alias -> json.dumps)
+and with serialization.json_rows (mapping computed once -> orjson).
+
+Usage:
+    python benchmarks/bench_serialization.py [rows]
+"""
+import json
+import os
+import sqlite3
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydantic import TypeAdapter  # noqa: E402
+
+from ids import new_id  # noqa: E402
+from models import Installment  # noqa: E402
+from serialization import dumps, orjson, rows_to_api  # noqa: E402
+
+
+def build_rows(count: int) -> list:
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.execute("""
+        CREATE TABLE installments (
+            id TEXT PRIMARY KEY, sale_id TEXT, installment_number INTEGER,
+            principal_amount INTEGER, interest_amount INTEGER, total_amount INTEGER,
+            remaining_debt INTEGER, due_date TEXT, paid_date TEXT, status TEXT
+        )
+    """)
+    sale_id = new_id()
+    conn.executemany(
+        "INSERT INTO installments VALUES (?, ?, ?, 3200000, 1536000, 4736000, 16000000, '2026-01-01T12:00:00.000Z', NULL, 'pending')",
+        [(new_id(), sale_id, n % 12 + 1) for n in range(count)],
+    )
+    return conn.execute("SELECT * FROM installments").fetchall()
+
+
+def validated(rows) -> bytes:
+    adapter = TypeAdapter(List[Installment])
+    content = [dict(row) for row in rows]
+    value = adapter.validate_python(content)
+    data = adapter.dump_python(value, mode="json", by_alias=True)
+    return json.dumps(data, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def fast(rows) -> bytes:
+    return dumps(rows_to_api(rows, Installment))
+
+
+def timed(func, rows, repeat: int = 3) -> tuple:
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = func(rows)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, body
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rows = build_rows(count)
+    print(f"{count} installments, encoder: {'orjson' if orjson else 'json'}")
+    results = {}
+    for label, func in (("validated", validated), ("fast", fast)):
+        elapsed, body = timed(func, rows)
+        results[label] = body
+        print(f"{label:<10} {elapsed * 1000:>8.0f} ms  {elapsed / count * 1e6:>6.2f} us/row  {len(body) / 1e6:.1f} MB")
+    same = json.loads(results["validated"]) == json.loads(results["fast"])
+    print(f"same JSON: {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Partner capital over time, from the ``partner_history`` timeline.
+
+Every change to a partner's capital or presence appends a snapshot of the
+partner row to partner_history (``record``): 'created' at the join date,
+'updated' and 'capital_adjusted' when it happens, 'deleted' at deleted_at.
+A deleted partner stays out of the roster from then on, whatever is recorded
+later (there is no way to reactivate one).
+
+``CapitalIndex`` turns the timeline into sorted arrays: one of instants with
+the total capital after each, and one per partner with their capital. A
+partner's capital, the total and each share at time T are then bisect
+lookups, O(log n) per partner. ``capital_index`` keeps the last index in
+memory and rebuilds it when partner_history's table_versions state (counter
+and change time, like the ETags in conditional.py) moves, i.e. after any
+write to the timeline. The change time keeps a counter that repeats after a
+restore or rebuild from matching a stale index.
+"""
+from bisect import bisect_right
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import queries
+from conditional import table_state
+from financials import instant
+from ids import new_id
+
+
+def record(cursor, partner_id: str, action: str, action_date: Optional[str] = None) -> None:
+    """Append the partner's current row to the timeline as ``action`` at ``action_date`` (now)"""
+    now = datetime.now().isoformat()
+    queries.execute(cursor, "partner_history.record", (new_id(), action, action_date or now, now, partner_id))
+
+
+def _at(instants: List[float], values: List, at: float):
+    """Value in effect at ``at`` (the last one recorded at or before it), None before the first"""
+    position = bisect_right(instants, at)
+    return values[position - 1] if position else None
+
+
+class CapitalIndex:
+    """Capital per partner and in total at any instant (milliseconds, see financials.instant)"""
+
+    def __init__(self, rows) -> None:
+        events = []
+        for order, row in enumerate(rows):
+            at = instant(row["action_date"])
+            if at is not None:
+                events.append((at, order, row))
+        # Rows come ordered by action_date text; formats can differ
+        events.sort(key=lambda event: event[:2])
+
+        self.instants: List[float] = []
+        self.totals: List[int] = []
+        # partner_id -> (instants, capital or None while not a partner)
+        self.partners: Dict[str, Tuple[List[float], List[Optional[int]]]] = {}
+        current: Dict[str, Optional[int]] = {}
+        deleted = set()
+        total = 0
+        for at, _, row in events:
+            partner_id = row["partner_id"]
+            if row["action"] == "deleted":
+                deleted.add(partner_id)
+            capital = None if partner_id in deleted else row["capital"]
+            total += (capital or 0) - (current.get(partner_id) or 0)
+            current[partner_id] = capital
+            self._append(self.instants, self.totals, at, total)
+            self._append(*self.partners.setdefault(partner_id, ([], [])), at, capital)
+
+    @staticmethod
+    def _append(instants: List[float], values: List, at: float, value) -> None:
+        # Several changes at one instant: the last one wins
+        if instants and instants[-1] == at:
+            values[-1] = value
+        else:
+            instants.append(at)
+            values.append(value)
+
+    def total_at(self, at: float) -> int:
+        return _at(self.instants, self.totals, at) or 0
+
+    def capital_at(self, partner_id: str, at: float) -> Optional[int]:
+        """Partner's capital at ``at``, None if they had not joined or had left"""
+        timeline = self.partners.get(partner_id)
+        return _at(*timeline, at) if timeline else None
+
+    def shares_at(self, at: float) -> Tuple[int, Dict[str, Tuple[int, float]]]:
+        """(total capital, partner_id -> (capital, share in percent)) of the partners present at ``at``"""
+        total = self.total_at(at)
+        shares = {}
+        for partner_id in self.partners:
+            capital = self.capital_at(partner_id, at)
+            if capital is not None:
+                shares[partner_id] = (capital, capital / total * 100 if total > 0 else 0.0)
+        return total, shares
+
+
+# (partner_history table_state, index) of the last build
+_last: Optional[Tuple[tuple, CapitalIndex]] = None
+
+
+def capital_index(cursor) -> CapitalIndex:
+    """Index of the timeline in the current snapshot, rebuilt only after a write to it"""
+    global _last
+    state = table_state(cursor, ("partner_history",))
+    last = _last
+    if last is not None and last[0] == state:
+        return last[1]
+    index = CapitalIndex(queries.execute(cursor, "partner_history.timeline").fetchall())
+    _last = (state, index)
+    return index
@@ -1,9 +1,10 @@
 import sqlite3
 import os
 import bcrypt
-import uuid
 from datetime import datetime
 
+from ids import new_id
+
 # Get the directory where this script is located
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 DATABASE_URL = os.path.join(SCRIPT_DIR, "installment_business.db")
@@ -32,7 +33,7 @@ def create_default_admin():
     hashed = bcrypt.hashpw(admin_password.encode('utf-8'), bcrypt.gensalt())
     
     # Create admin user
-    admin_id = str(uuid.uuid4())
+    admin_id = new_id()
     created_at = datetime.now().isoformat()
     
     cursor.execute("""
@@ -1,204 +1,337 @@
+import os
+import queue
 import sqlite3
+import threading
+import time
+from collections import OrderedDict
 from contextlib import contextmanager
-from typing import Generator
+from typing import Dict, Generator, Optional
 
-DATABASE_URL = "installment_business.db"
+DATABASE_URL = os.getenv("DATABASE_URL", "installment_business.db")
 
-def get_db_connection():
-    """Get database connection"""
-    conn = sqlite3.connect(DATABASE_URL)
-    conn.row_factory = sqlite3.Row
+# Connection pool settings (per uvicorn worker process). Reads use their own
+# query_only pool, sized to cover both read executors in db_executor.py
+# (8 default + 4 report workers). Most writes go through the write
+# coordinator's own connection, so the read-write pool can stay small.
+DB_READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", "12"))
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "4"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_MAX_AGE = float(os.getenv("DB_POOL_MAX_AGE", "3600"))
+# Compiled statements kept per connection (sqlite3 default is 128)
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "256"))
+
+# Storage profiles: journal/durability/caching trade-offs selected with DB_PROFILE.
+# All of them use WAL so readers never block the single writer (and vice versa).
+#   safe     - fsync on every commit, survives power loss without losing commits
+#   balanced - fsync at checkpoints only; a crash can lose the last commits but never corrupts
+#   fast     - no fsync at all; for throwaway/dev databases
+STORAGE_PROFILES: Dict[str, Dict[str, object]] = {
+    "safe": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "busy_timeout": 10000,
+        "mmap_size": 0,
+        "cache_size": -8000,
+    },
+    "balanced": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "mmap_size": 64 * 1024 * 1024,
+        "cache_size": -32000,
+    },
+    "fast": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "busy_timeout": 5000,
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64000,
+    },
+}
+
+DB_PROFILE = os.getenv("DB_PROFILE", "balanced")
+if DB_PROFILE not in STORAGE_PROFILES:
+    raise ValueError(
+        f"Unknown DB_PROFILE '{DB_PROFILE}', expected one of: {', '.join(STORAGE_PROFILES)}"
+    )
+STORAGE_PROFILE = STORAGE_PROFILES[DB_PROFILE]
+
+# PRAGMAs applied once when a pooled connection is opened
+CONNECTION_PRAGMAS = (
+    f"PRAGMA journal_mode = {STORAGE_PROFILE['journal_mode']}",
+    f"PRAGMA synchronous = {STORAGE_PROFILE['synchronous']}",
+    f"PRAGMA busy_timeout = {STORAGE_PROFILE['busy_timeout']}",
+    f"PRAGMA mmap_size = {STORAGE_PROFILE['mmap_size']}",
+    f"PRAGMA cache_size = {STORAGE_PROFILE['cache_size']}",
+    "PRAGMA temp_store = MEMORY",
+)
+
+
+class PoolTimeoutError(RuntimeError):
+    """Raised when no pooled connection becomes free within the timeout"""
+
+
+class Connection(sqlite3.Connection):
+    """sqlite3 connection that remembers which statements it has compiled.
+
+    ``seen_statements`` mirrors sqlite3's statement-cache LRU so queries.py can
+    report cache hits and misses.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.seen_statements: "OrderedDict[str, None]" = OrderedDict()
+
+
+def connect(database: Optional[str] = None) -> sqlite3.Connection:
+    """Open a new connection configured with the active storage profile"""
+    conn = sqlite3.connect(
+        database or DATABASE_URL,
+        timeout=STORAGE_PROFILE["busy_timeout"] / 1000,
+        check_same_thread=False,
+        cached_statements=DB_STATEMENT_CACHE_SIZE,
+        factory=Connection,
+    )
+    _configure_connection(conn)
     return conn
 
+
+def _configure_connection(conn: sqlite3.Connection) -> None:
+    """Apply row factory and PRAGMAs to a freshly opened connection"""
+    conn.row_factory = sqlite3.Row
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+
+
+def get_storage_settings(conn: sqlite3.Connection) -> dict:
+    """Effective storage PRAGMAs as reported by SQLite"""
+    settings = {"profile": DB_PROFILE}
+    for name in ("journal_mode", "synchronous", "busy_timeout", "mmap_size", "cache_size"):
+        settings[name] = conn.execute(f"PRAGMA {name}").fetchone()[0]
+    return settings
+
+
+class ConnectionPool:
+    """Bounded pool of pre-configured SQLite connections.
+
+    Connections are opened lazily up to ``size``, pinged before being handed
+    out and recycled once they are older than ``max_age`` seconds.
+    """
+
+    def __init__(self, database: str, size: int, timeout: float, max_age: float, read_only: bool = False):
+        self.database = database
+        self.size = size
+        self.read_only = read_only
+        self.timeout = timeout
+        self.max_age = max_age
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._opened_at: Dict[sqlite3.Connection, float] = {}
+        self._lock = threading.Lock()
+        self._in_use = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._created = 0
+        self._recycled = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _open(self) -> sqlite3.Connection:
+        conn = connect(self.database)
+        if self.read_only:
+            conn.execute("PRAGMA query_only = 1")
+        with self._lock:
+            self._opened_at[conn] = time.monotonic()
+            self._created += 1
+        return conn
+
+    def _discard(self, conn: sqlite3.Connection) -> None:
+        with self._lock:
+            self._opened_at.pop(conn, None)
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    def _is_usable(self, conn: sqlite3.Connection) -> bool:
+        opened_at = self._opened_at.get(conn)
+        if opened_at is None or time.monotonic() - opened_at > self.max_age:
+            return False
+        try:
+            conn.execute("SELECT 1").fetchone()
+        except sqlite3.Error:
+            return False
+        return True
+
+    def acquire(self) -> sqlite3.Connection:
+        """Check a connection out of the pool, waiting up to ``timeout`` seconds"""
+        started = time.perf_counter()
+        if not self._slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self._timeouts += 1
+            raise PoolTimeoutError(f"No database connection available after {self.timeout}s")
+        waited = time.perf_counter() - started
+
+        try:
+            conn = None
+            while conn is None:
+                try:
+                    candidate = self._idle.get_nowait()
+                except queue.Empty:
+                    conn = self._open()
+                    break
+                if self._is_usable(candidate):
+                    conn = candidate
+                else:
+                    self._discard(candidate)
+                    with self._lock:
+                        self._recycled += 1
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._in_use += 1
+            self._checkouts += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+        return conn
+
+    def release(self, conn: sqlite3.Connection, discard: bool = False) -> None:
+        """Return a connection to the pool (or close it when ``discard`` is set)"""
+        if not discard and conn.in_transaction:
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                discard = True
+
+        if discard:
+            self._discard(conn)
+        else:
+            self._idle.put(conn)
+
+        with self._lock:
+            self._in_use -= 1
+        self._slots.release()
+
+    def close(self) -> None:
+        """Close every idle connection"""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "size": self.size,
+                "open": len(self._opened_at),
+                "in_use": self._in_use,
+                "idle": self._idle.qsize(),
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "created": self._created,
+                "recycled": self._recycled,
+                "wait_avg_ms": round(self._wait_total / self._checkouts * 1000, 3) if self._checkouts else 0.0,
+                "wait_max_ms": round(self._wait_max * 1000, 3),
+            }
+
+
+_pool = ConnectionPool(DATABASE_URL, DB_POOL_SIZE, DB_POOL_TIMEOUT, DB_POOL_MAX_AGE)
+_read_pool = ConnectionPool(DATABASE_URL, DB_READ_POOL_SIZE, DB_POOL_TIMEOUT, DB_POOL_MAX_AGE, read_only=True)
+
+
+def get_pool_stats() -> dict:
+    """Pool size and wait statistics for the current worker process"""
+    return {"read": _read_pool.stats(), "write": _pool.stats()}
+
+
+def close_pool() -> None:
+    """Close idle pooled connections (called on shutdown)"""
+    _read_pool.close()
+    _pool.close()
+
+
+_writer_local = threading.local()
+
+
+def bind_writer_connection(conn: Optional[sqlite3.Connection]) -> None:
+    """Make get_write_db()/get_read_db() hand out ``conn`` on this thread (used by the write coordinator)"""
+    _writer_local.conn = conn
+
+
+def get_db_connection() -> sqlite3.Connection:
+    """Get a pooled database connection; hand it back with release_db_connection()"""
+    return _pool.acquire()
+
+
+def release_db_connection(conn: sqlite3.Connection, discard: bool = False) -> None:
+    """Return a connection obtained from get_db_connection() to the pool"""
+    _pool.release(conn, discard=discard)
+
+
 @contextmanager
-def get_db() -> Generator[sqlite3.Connection, None, None]:
-    """Context manager for database connection"""
+def get_read_db() -> Generator[sqlite3.Connection, None, None]:
+    """Read-only connection holding one snapshot for the whole block.
+
+    Everything read inside the block sees the database as of the first
+    query, even if writes commit in between (WAL snapshot isolation).
+    """
+    writer_conn = getattr(_writer_local, "conn", None)
+    if writer_conn is not None:
+        # Reads inside a write job must see the job's own uncommitted changes
+        yield writer_conn
+        return
+
+    conn = _read_pool.acquire()
+    broken = False
+    try:
+        conn.execute("BEGIN")
+        yield conn
+    finally:
+        try:
+            conn.rollback()
+        except sqlite3.Error:
+            broken = True
+        _read_pool.release(conn, discard=broken)
+
+
+@contextmanager
+def get_write_db() -> Generator[sqlite3.Connection, None, None]:
+    """Context manager for a read-write connection (committed on success)"""
+    writer_conn = getattr(_writer_local, "conn", None)
+    if writer_conn is not None:
+        # Running as a write-coordinator job: the coordinator owns the
+        # transaction and commits it together with the rest of the batch
+        yield writer_conn
+        return
+
     conn = get_db_connection()
+    broken = False
     try:
         yield conn
         conn.commit()
     except Exception:
-        conn.rollback()
+        try:
+            conn.rollback()
+        except sqlite3.Error:
+            broken = True
         raise
     finally:
-        conn.close()
+        release_db_connection(conn, discard=broken)
+
+
+# Kept for scripts and older call sites: a read-write connection
+get_db = get_write_db
+
 
 def init_db():
-    """Initialize database with tables"""
-    with get_db() as conn:
-        cursor = conn.cursor()
-        
-        # Partners table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS partners (
-                id TEXT PRIMARY KEY,
-                name TEXT NOT NULL,
-                capital REAL NOT NULL DEFAULT 0,
-                available_capital REAL NOT NULL DEFAULT 0,
-                initial_profit REAL NOT NULL DEFAULT 0,
-                monthly_profit REAL NOT NULL DEFAULT 0,
-                share REAL NOT NULL DEFAULT 0,
-                created_at TEXT NOT NULL
-            )
-        """)
-        
-        # Phones table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS phones (
-                id TEXT PRIMARY KEY,
-                brand TEXT NOT NULL,
-                model TEXT NOT NULL,
-                imei TEXT NOT NULL UNIQUE,
-                purchase_price REAL NOT NULL,
-                selling_price REAL NOT NULL,
-                status TEXT NOT NULL DEFAULT 'available',
-                purchase_date TEXT NOT NULL,
-                color TEXT,
-                storage TEXT,
-                condition TEXT DEFAULT 'new',
-                purchase_source TEXT,
-                notes TEXT
-            )
-        """)
-        
-        # Customers table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS customers (
-                id TEXT PRIMARY KEY,
-                name TEXT NOT NULL,
-                phone TEXT NOT NULL,
-                national_id TEXT NOT NULL,
-                address TEXT NOT NULL,
-                created_at TEXT NOT NULL
-            )
-        """)
-        
-        # Sales table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS sales (
-                id TEXT PRIMARY KEY,
-                customer_id TEXT NOT NULL,
-                phone_id TEXT NOT NULL,
-                announced_price REAL NOT NULL,
-                purchase_price REAL NOT NULL,
-                down_payment REAL NOT NULL DEFAULT 0,
-                installment_months INTEGER NOT NULL,
-                monthly_interest_rate REAL NOT NULL DEFAULT 0.04,
-                initial_profit REAL NOT NULL DEFAULT 0,
-                profit_calculation_type TEXT DEFAULT 'fixed_4_percent',
-                custom_profit_rate REAL DEFAULT 0.04,
-                total_profit REAL DEFAULT 0,
-                sale_date TEXT NOT NULL,
-                status TEXT NOT NULL DEFAULT 'active',
-                FOREIGN KEY (customer_id) REFERENCES customers(id),
-                FOREIGN KEY (phone_id) REFERENCES phones(id)
-            )
-        """)
-        
-        # Installments table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS installments (
-                id TEXT PRIMARY KEY,
-                sale_id TEXT NOT NULL,
-                installment_number INTEGER NOT NULL,
-                principal_amount REAL NOT NULL,
-                interest_amount REAL NOT NULL,
-                total_amount REAL NOT NULL,
-                remaining_debt REAL NOT NULL,
-                due_date TEXT NOT NULL,
-                paid_date TEXT,
-                status TEXT NOT NULL DEFAULT 'pending',
-                FOREIGN KEY (sale_id) REFERENCES sales(id)
-            )
-        """)
-        
-        # Transactions table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS transactions (
-                id TEXT PRIMARY KEY,
-                partner_id TEXT NOT NULL,
-                type TEXT NOT NULL,
-                amount REAL NOT NULL,
-                description TEXT NOT NULL,
-                profit_type TEXT,
-                date TEXT NOT NULL,
-                FOREIGN KEY (partner_id) REFERENCES partners(id)
-            )
-        """)
-        
-        # Investors table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS investors (
-                id TEXT PRIMARY KEY,
-                name TEXT NOT NULL,
-                phone TEXT NOT NULL,
-                national_id TEXT NOT NULL,
-                investment_amount REAL NOT NULL,
-                profit_rate REAL NOT NULL DEFAULT 4.0,
-                total_profit REAL NOT NULL DEFAULT 0,
-                start_date TEXT NOT NULL,
-                status TEXT NOT NULL DEFAULT 'active',
-                created_at TEXT NOT NULL
-            )
-        """)
-        
-        # Investor Transactions table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS investor_transactions (
-                id TEXT PRIMARY KEY,
-                investor_id TEXT NOT NULL,
-                type TEXT NOT NULL,
-                amount REAL NOT NULL,
-                description TEXT NOT NULL,
-                date TEXT NOT NULL,
-                FOREIGN KEY (investor_id) REFERENCES investors(id)
-            )
-        """)
-        
-        # Users table for authentication
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                id TEXT PRIMARY KEY,
-                full_name TEXT NOT NULL,
-                mobile TEXT NOT NULL UNIQUE,
-                password TEXT NOT NULL,
-                created_at TEXT NOT NULL
-            )
-        """)
-        
-        # Expenses table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS expenses (
-                id TEXT PRIMARY KEY,
-                date TEXT NOT NULL,
-                type TEXT NOT NULL,
-                amount REAL NOT NULL,
-                description TEXT NOT NULL,
-                created_at TEXT NOT NULL
-            )
-        """)
-        
-        # Custom Phone Models table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS custom_phone_models (
-                id TEXT PRIMARY KEY,
-                brand TEXT NOT NULL,
-                model TEXT NOT NULL,
-                created_at TEXT NOT NULL,
-                UNIQUE(brand, model)
-            )
-        """)
-        
-        # Create indexes
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_sales_customer ON sales(customer_id)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_sales_phone ON sales(phone_id)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_installments_sale ON installments(sale_id)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_installments_status ON installments(status)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_transactions_partner ON transactions(partner_id)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_investor_transactions_investor ON investor_transactions(investor_id)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_users_mobile ON users(mobile)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_expenses_date ON expenses(date)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_expenses_type ON expenses(type)")
-        
-        conn.commit()
-        print("✅ Database initialized successfully")
+    """Bring the database schema up to date (see migrations.py)"""
+    from migrations import run_migrations
+
+    applied = run_migrations()
+    if applied:
+        print(f"✅ Database migrated to version {applied[-1].version}")
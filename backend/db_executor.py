@@ -0,0 +1,62 @@
+"""Dedicated thread pools for blocking SQLite work.
+
+Route handlers are ``async def`` on the event loop; their database round-trips
+run on these executors instead of Starlette's shared threadpool. Full-table
+report reads get their own executor so a burst of slow listings cannot starve
+quick lookups, and writes go through the single-writer queue in
+write_coordinator.py.
+"""
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from write_coordinator import writer
+
+DB_EXECUTOR_WORKERS = int(os.getenv("DB_EXECUTOR_WORKERS", "8"))
+DB_REPORT_WORKERS = int(os.getenv("DB_REPORT_WORKERS", "4"))
+
+_executors = {
+    "default": ThreadPoolExecutor(max_workers=DB_EXECUTOR_WORKERS, thread_name_prefix="db"),
+    "reports": ThreadPoolExecutor(max_workers=DB_REPORT_WORKERS, thread_name_prefix="db-report"),
+    # Mutating handlers: serialized through one connection with group commit
+    "writer": writer,
+}
+
+
+async def run_db(func: Callable, *args, executor: str = "default", **kwargs):
+    """Run a blocking database function on one of the DB executors"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executors[executor], functools.partial(func, *args, **kwargs))
+
+
+def db_task(func: Callable = None, *, executor: str = "default"):
+    """Expose a blocking handler as an ``async def`` running on a DB executor.
+
+    The wrapper keeps the original signature, so FastAPI still sees the same
+    path/query/body parameters::
+
+        @router.get("/")
+        @db_task(executor="reports")
+        def get_sales():
+            ...
+    """
+    if executor not in _executors:
+        raise ValueError(f"Unknown DB executor '{executor}'")
+
+    def decorator(handler: Callable):
+        @functools.wraps(handler)
+        async def wrapper(*args, **kwargs):
+            return await run_db(handler, *args, executor=executor, **kwargs)
+        return wrapper
+
+    if func is not None:
+        return decorator(func)
+    return decorator
+
+
+def shutdown_executors() -> None:
+    """Wait for in-flight database work and stop the executors"""
+    for pool in _executors.values():
+        pool.shutdown(wait=True)
@@ -0,0 +1,206 @@
+"""
+Partner financials: initial profit, monthly profit, used and available capital.
+
+Server-side version of ``calculateFinancialsFromData`` (src/lib/profitCalculator.ts).
+A partner gets a share of every sale made on or after the day they joined
+(initial profit, capital used) and of every paid installment due on or after
+it (monthly profit, capital returned). The share is the partner's current
+capital over the capital of all partners present at that moment (joined,
+not yet deleted).
+
+Instead of rescanning sales and installments for every partner, one
+chronological sweep merges three streams that each come sorted from an
+index: partner joins/exits, sales grouped by sale_date and paid
+installments grouped by due_date. The sweep keeps the running capital total
+and running sums of ``amount / capital_at_that_time``; a partner's result is
+their capital times (final sums - sums when they joined). Sales and paid
+installments come from the per-date summary tables (see summaries.py), so
+the cost is O(dates + partners log partners), independent of row counts.
+
+Usage:
+    python financials.py check   # compare with calculateFinancialsFromData (exit 1 if they differ)
+"""
+import heapq
+import sys
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import queries
+from money import to_toman
+
+# Indexes into the running sums
+_INITIAL, _USED, _MONTHLY, _RETURNED = range(4)
+
+# Stream order at equal instants: capital changes first (a partner joining or
+# leaving at t counts at t), then partner start marks (events at the join
+# instant belong to the partner), then sales/installments
+_CAPITAL, _JOIN, _EVENT = range(3)
+
+
+def instant(value: Optional[str]) -> Optional[float]:
+    """Milliseconds since the epoch for an ISO date/datetime, like JS ``new Date()``.
+
+    Date-only values are UTC midnight, as in JS. Datetimes without an
+    offset are read in the server's local time zone: that is the zone
+    ``datetime.now()`` wrote them in (created_at, deleted_at), and the one
+    ``new Date()`` uses in a browser in the same zone. A browser in another
+    zone places them differently by the offset between the two. Unparseable
+    or empty values give None, which never compares true, like an Invalid
+    Date.
+    """
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None and len(value) <= 10:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp() * 1000
+
+
+def _chronological(events: List[tuple]) -> List[tuple]:
+    """``events`` (already in SQL text order) in time order.
+
+    ISO strings of one format sort like their instants, so this is normally
+    a single pass; mixed formats (date-only next to full timestamps) fall
+    back to a sort.
+    """
+    if all(events[i][0] <= events[i + 1][0] for i in range(len(events) - 1)):
+        return events
+    return sorted(events, key=lambda event: event[:2])
+
+
+def _grouped(rows: Iterable, kind: str, cache: Dict[str, Optional[float]]) -> Tuple[List[tuple], List]:
+    """(timed events, rows whose date does not parse) from date-grouped rows"""
+    timed, untimed = [], []
+    for row in rows:
+        date = row[0]
+        if date not in cache:
+            cache[date] = instant(date)
+        at = cache[date]
+        if at is None:
+            untimed.append(row)
+        else:
+            timed.append((at, _EVENT, kind, row))
+    return timed, untimed
+
+
+def compute_financials(cursor) -> dict:
+    """FinancialSummary (see profitCalculator.ts) for the current snapshot"""
+    partners = [dict(row) for row in queries.execute(cursor, "financials.partners").fetchall()]
+    cache: Dict[str, Optional[float]] = {}
+
+    sales, untimed_sales = _grouped(queries.execute(cursor, "financials.sales_by_date").fetchall(), "sale", cache)
+    paid, untimed_paid = _grouped(queries.execute(cursor, "financials.paid_by_due_date").fetchall(), "paid", cache)
+
+    capital_changes, joins = [], []
+    for index, partner in enumerate(partners):
+        joined = instant(partner["created_at"])
+        if joined is None:
+            continue
+        capital_changes.append((joined, _CAPITAL, None, partner["capital"]))
+        left = instant(partner["deleted_at"])
+        if left is not None:
+            capital_changes.append((left, _CAPITAL, None, -partner["capital"]))
+        if partner["status"] == "active":
+            joins.append((joined, _JOIN, None, index))
+    capital_changes.sort(key=lambda change: change[:2])
+    joins.sort(key=lambda join: join[:2])
+
+    # Single sweep over the merged timeline
+    capital = 0
+    sums = [0.0, 0.0, 0.0, 0.0]
+    at_join: Dict[int, List[float]] = {}
+    merged = heapq.merge(
+        capital_changes, joins, _chronological(sales), _chronological(paid),
+        key=lambda item: item[:2],
+    )
+    for _, order, kind, payload in merged:
+        if order == _CAPITAL:
+            capital += payload
+        elif order == _JOIN:
+            at_join[payload] = list(sums)
+        elif capital <= 0:
+            continue
+        elif kind == "sale":
+            sums[_INITIAL] += payload["initial_profit"] / capital
+            sums[_USED] += payload["purchase_price"] / capital
+        else:
+            sums[_MONTHLY] += payload["attributed_interest"] / capital
+            sums[_RETURNED] += payload["attributed_principal"] / capital
+
+    all_sales = [event[3] for event in sales] + untimed_sales
+    all_paid = [event[3] for event in paid] + untimed_paid
+    total_purchase = sum(row["purchase_price"] for row in all_sales)
+    total_initial_profit = sum(row["initial_profit"] for row in all_sales)
+    total_paid_principal = sum(row["principal"] for row in all_paid)
+    total_monthly_profit = sum(row["interest"] for row in all_paid)
+
+    # Newest first, like GET /api/partners
+    active = [(index, partner) for index, partner in enumerate(partners) if partner["status"] == "active"]
+    total_capital = sum(partner["capital"] for _, partner in active)
+
+    partner_financials = []
+    for index, partner in active:
+        start = at_join.get(index)
+        own = [0.0, 0.0, 0.0, 0.0] if start is None else [
+            partner["capital"] * (final - before) for final, before in zip(sums, start)
+        ]
+        used = own[_USED] - own[_RETURNED]
+        initial_profit = to_toman(own[_INITIAL])
+        monthly_profit = to_toman(own[_MONTHLY])
+        partner_financials.append({
+            "partnerId": partner["id"],
+            "partnerName": partner["name"],
+            "initialCapital": partner["capital"],
+            "availableCapital": to_toman(max(0.0, partner["capital"] - used)),
+            "usedCapital": to_toman(used),
+            "share": partner["capital"] / total_capital * 100 if total_capital > 0 else 0.0,
+            "initialProfit": initial_profit,
+            "monthlyProfit": monthly_profit,
+            "totalProfit": initial_profit + monthly_profit,
+        })
+
+    return {
+        "totalCapital": total_capital,
+        "totalAvailableCapital": sum(item["availableCapital"] for item in partner_financials),
+        "totalUsedCapital": total_purchase - total_paid_principal,
+        "totalInitialProfit": total_initial_profit,
+        "totalMonthlyProfit": total_monthly_profit,
+        "totalProfit": total_initial_profit + total_monthly_profit,
+        "partnerFinancials": partner_financials,
+    }
+
+
+def check(database_path: Optional[str] = None) -> List[str]:
+    """Differences from calculateFinancialsFromData: of compute_financials and
+    of its Python port (profit_reference.py) from the TypeScript output in
+    fixtures/financials_parity.json, then of compute_financials from the port
+    on the database"""
+    import database
+    from profit_reference import compare, fixture_problems, frontend_data, reference
+
+    problems = fixture_problems()
+    conn = database.connect(database_path or database.DATABASE_URL)
+    try:
+        problems += [
+            f"database: {problem}"
+            for problem in compare(compute_financials(conn.cursor()), reference(*frontend_data(conn)))
+        ]
+    finally:
+        conn.close()
+    return problems
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "check":
+        problems = check()
+        if problems:
+            print(f"❌ {len(problems)} differences from calculateFinancialsFromData")
+            for problem in problems:
+                print(f"    {problem}")
+            sys.exit(1)
+        print("✅ Partner financials match calculateFinancialsFromData")
+    else:
+        print(__doc__)
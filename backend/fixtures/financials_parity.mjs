@@ -0,0 +1,130 @@
+#!/usr/bin/env node
+/**
+ * Writes financials_parity.json: a seeded dataset and what the browser's
+ * calculateFinancialsFromData (src/lib/profitCalculator.ts) returns for it.
+ * `python financials.py check` compares compute_financials and the Python
+ * port in profit_reference.py against these outputs.
+ *
+ * The TypeScript function itself is run: reconstructPartnerHistory and
+ * calculateFinancialsFromData are cut out of profitCalculator.ts and compiled
+ * with the `typescript` devDependency when it is installed, otherwise with
+ * only their type annotations removed (the syntax those two functions use).
+ * Every timestamp carries an offset or is a bare date, so the result does not
+ * depend on the time zone this runs in.
+ *
+ * Usage:
+ *   node backend/fixtures/financials_parity.mjs
+ */
+import { readFileSync, writeFileSync } from "node:fs";
+import { dirname, join } from "node:path";
+import { fileURLToPath } from "node:url";
+
+const here = dirname(fileURLToPath(import.meta.url));
+const SOURCE = join(here, "..", "..", "src", "lib", "profitCalculator.ts");
+const OUTPUT = join(here, "financials_parity.json");
+const SEED = 20251212;
+
+async function compile(typescriptSource) {
+  try {
+    const ts = (await import("typescript")).default;
+    return ts.transpileModule(typescriptSource, { compilerOptions: { target: ts.ScriptTarget.ES2020 } }).outputText;
+  } catch {
+    return typescriptSource
+      .replace(/\bexport\s+/g, "")
+      // Signatures: parameter and return types
+      .replace(/function (\w+)\(([^)]*)\)\s*(:[^{]+)?\{/g, (_, name, params) =>
+        `function ${name}(${params.replace(/(\w+)\??:\s*[\w<>[\] ]+/g, "$1")}) {`)
+      // Generic constructors and annotated declarations
+      .replace(/new (Map|Set)<[^>]*(>[^>(]*)?>\(\)/g, "new $1()")
+      .replace(/\b(const|let)\s+(\w+)\s*:\s*[\w<>[\], ]+=/g, "$1 $2 =");
+  }
+}
+
+async function loadCalculator() {
+  const source = readFileSync(SOURCE, "utf8");
+  const start = source.indexOf("function reconstructPartnerHistory(");
+  const end = source.indexOf("export function checkCapitalAvailability(");
+  if (start < 0 || end < 0) throw new Error(`Functions not found in ${SOURCE}`);
+  // Drop the doc comment of the next function
+  const body = source.slice(start, source.lastIndexOf("/**", end));
+  const javascript = await compile(body);
+  return new Function(`${javascript}\nreturn calculateFinancialsFromData;`)();
+}
+
+// mulberry32
+function random(seed) {
+  return () => {
+    seed = (seed + 0x6d2b79f5) | 0;
+    let t = Math.imul(seed ^ (seed >>> 15), 1 | seed);
+    t = (t + Math.imul(t ^ (t >>> 7), 61 | t)) ^ t;
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+  };
+}
+
+function dataset() {
+  const rng = random(SEED);
+  const int = (low, high) => low + Math.floor(rng() * (high - low));
+  const day = offset => new Date(Date.UTC(2024, 0, 1 + offset)).toISOString().slice(0, 10);
+  const id = (prefix, n) => `${prefix}-${String(n).padStart(4, "0")}`;
+
+  const allPartners = [];
+  for (let n = 0; n < 8; n++) {
+    const joined = day(int(0, 300));
+    let createdAt = `${joined}T${String(int(0, 24)).padStart(2, "0")}:${String(int(0, 60)).padStart(2, "0")}:00.000Z`;
+    // One partner joins at midnight of a sale day, one on a bare date
+    if (n === 0) createdAt = `${day(0)}T00:00:00.000Z`;
+    if (n === 1) createdAt = day(40);
+    const capital = int(50, 500) * 1_000_000;
+    const deletedAt = n % 4 === 3 ? `${day(int(310, 400))}T09:30:00.000Z` : null;
+    allPartners.push({
+      id: id("partner", n), name: `Partner ${n}`, capital, availableCapital: capital,
+      initialProfit: 0, monthlyProfit: 0, share: 0, createdAt,
+      status: deletedAt ? "inactive" : "active", deletedAt,
+    });
+  }
+
+  const sales = [];
+  const installments = [];
+  for (let n = 0; n < 40; n++) {
+    const saleId = id("sale", n);
+    const sold = n === 0 ? day(0) : day(int(0, 420));
+    const purchasePrice = int(100, 800) * 100_000;
+    const initialProfit = int(5, 40) * 100_000;
+    const months = [3, 6, 9, 12][int(0, 4)];
+    // Every 10th sale was deleted; its installments stay
+    if (n % 10 !== 9) {
+      sales.push({
+        id: saleId, customerId: id("customer", n % 7), phoneId: id("phone", n),
+        announcedPrice: purchasePrice + initialProfit, purchasePrice, downPayment: int(0, 10) * 100_000,
+        installmentMonths: months, profitCalculationType: "monthly", monthlyInterestRate: 0.04,
+        totalProfit: initialProfit, initialProfit, saleDate: sold, status: "active",
+      });
+    }
+    for (let month = 1; month <= months; month++) {
+      const due = new Date(`${sold}T00:00:00.000Z`);
+      due.setUTCMonth(due.getUTCMonth() + month);
+      const dueDate = due.toISOString().slice(0, 10);
+      const principalAmount = Math.floor(purchasePrice / months);
+      const interestAmount = Math.round(purchasePrice * 0.04 * (months + 1 - month) / months);
+      const paid = dueDate < day(400) && rng() < 0.8;
+      installments.push({
+        id: id(`installment-${n}`, month), saleId, installmentNumber: month, principalAmount, interestAmount,
+        totalAmount: principalAmount + interestAmount, remainingDebt: 0, dueDate,
+        paidDate: paid ? dueDate : null, status: paid ? "paid" : "pending",
+      });
+    }
+  }
+
+  // Same order as GET /api/partners (newest first) and the list endpoints
+  allPartners.sort((a, b) => (a.createdAt < b.createdAt ? 1 : a.createdAt > b.createdAt ? -1 : 0));
+  sales.sort((a, b) => (a.saleDate < b.saleDate ? 1 : a.saleDate > b.saleDate ? -1 : a.id < b.id ? 1 : -1));
+  installments.sort((a, b) => (a.dueDate < b.dueDate ? -1 : a.dueDate > b.dueDate ? 1 : a.id < b.id ? -1 : 1));
+  const partners = allPartners.filter(p => p.status === "active");
+  return { partners, sales, installments, allPartners };
+}
+
+const calculateFinancialsFromData = await loadCalculator();
+const input = dataset();
+const output = calculateFinancialsFromData(input.partners, input.sales, input.installments, input.allPartners);
+writeFileSync(OUTPUT, JSON.stringify({ seed: SEED, input, output }, null, 1) + "\n");
+console.log(`Wrote ${OUTPUT}: ${input.sales.length} sales, ${input.installments.length} installments`);
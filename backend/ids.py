@@ -0,0 +1,74 @@
+"""
+Time-ordered primary keys (UUIDv7, RFC 9562).
+
+The first 48 bits are the Unix time in milliseconds, so new ids sort after
+existing ones both as UUIDs and as the lowercase TEXT we store. Inserts land
+at the right edge of each primary-key B-tree instead of at random pages, and
+id ranges follow creation time.
+"""
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+# rand_a (12 bits) is used as a counter so ids created in the same
+# millisecond by this process stay strictly increasing
+_COUNTER_MAX = 0xFFF
+
+
+def _build(ms: int, counter: int, tail: bytes) -> uuid.UUID:
+    rand_b = int.from_bytes(tail, "big") & ((1 << 62) - 1)
+    value = (ms & ((1 << 48) - 1)) << 80
+    value |= 0x7 << 76              # version 7
+    value |= (counter & _COUNTER_MAX) << 64
+    value |= 0b10 << 62             # RFC 9562 variant
+    value |= rand_b
+    return uuid.UUID(int=value)
+
+
+def uuid7() -> uuid.UUID:
+    """New UUIDv7, monotonic within this process"""
+    global _last_ms, _counter
+    with _lock:
+        ms = time.time_ns() // 1_000_000
+        if ms > _last_ms:
+            _last_ms = ms
+            _counter = int.from_bytes(os.urandom(2), "big") & 0x7FF
+        else:
+            _counter += 1
+            if _counter > _COUNTER_MAX:
+                # Counter exhausted: borrow the next millisecond
+                _last_ms += 1
+                _counter = 0
+        ms, counter = _last_ms, _counter
+    return _build(ms, counter, os.urandom(8))
+
+
+def new_id() -> str:
+    """Primary key for a new row"""
+    return str(uuid7())
+
+
+def id_for_timestamp(value: Optional[str], sequence: int = 0) -> str:
+    """Time-ordered id for an existing row created at ``value`` (ISO 8601).
+
+    Used when re-keying old rows; ``sequence`` keeps rows with the same
+    timestamp in a stable order. Unparseable timestamps map to the epoch.
+    """
+    ms = 0
+    if value:
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            parsed = None
+        if parsed is not None:
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=timezone.utc)
+            ms = max(0, int(parsed.timestamp() * 1000))
+    return str(_build(ms, sequence, os.urandom(8)))
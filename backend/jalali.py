@@ -0,0 +1,76 @@
+"""
+Jalali (Persian) calendar dimension table.
+
+Reports group by Jalali month, while every date is stored as a Gregorian
+ISO string. Instead of converting row by row, ``calendar`` holds one row per
+Gregorian day from CALENDAR_START to CALENDAR_END with its Jalali year,
+month, day and week. Rollups join it on ``substr(date, 1, 10) = day`` and
+group by its columns in SQL.
+
+Conversion is the same arithmetic as ``gregorianToJalali`` in
+src/lib/jalali.ts, so the server and the browser agree on every date. Weeks
+start on Saturday; week 1 of a year is the one containing 1 Farvardin.
+"""
+import sqlite3
+from datetime import date, timedelta
+from typing import Iterator, Tuple
+
+# 1 Farvardin 1300 .. end of 1499 (1921-03-21 .. 2121-03-20)
+CALENDAR_START = date(1921, 3, 21)
+CALENDAR_END = date(2121, 3, 20)
+
+_DAYS_BEFORE_MONTH = (0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334)
+
+
+def gregorian_to_jalali(year: int, month: int, day: int) -> Tuple[int, int, int]:
+    """(Jalali year, month, day) of a Gregorian date"""
+    jalali_year = 0 if year <= 1600 else 979
+    year -= 621 if year <= 1600 else 1600
+    year2 = year + 1 if month > 2 else year
+    days = (365 * year + (year2 + 3) // 4 - (year2 + 99) // 100 + (year2 + 399) // 400
+            - 80 + day + _DAYS_BEFORE_MONTH[month - 1])
+    jalali_year += 33 * (days // 12053)
+    days %= 12053
+    jalali_year += 4 * (days // 1461)
+    days %= 1461
+    if days > 365:
+        jalali_year += (days - 1) // 365
+        days = (days - 1) % 365
+    if days < 186:
+        return jalali_year, 1 + days // 31, 1 + days % 31
+    return jalali_year, 7 + (days - 186) // 30, 1 + (days - 186) % 30
+
+
+def _saturday_offset(day: date) -> int:
+    """Days since the last Saturday (0 on a Saturday)"""
+    return (day.weekday() + 2) % 7
+
+
+def calendar_rows(start: date = CALENDAR_START, end: date = CALENDAR_END) -> Iterator[tuple]:
+    """(day, jalali_year, jalali_month, jalali_day, jalali_week, weekday) for each day of [start, end]"""
+    day = start
+    while day <= end:
+        year, month, day_of_month = gregorian_to_jalali(day.year, day.month, day.day)
+        # 0-based day of the Jalali year: six 31-day months, then 30-day ones
+        day_of_year = (31 * (month - 1) if month <= 7 else 186 + 30 * (month - 7)) + day_of_month - 1
+        weekday = _saturday_offset(day)
+        first_weekday = (weekday - day_of_year) % 7
+        week = (day_of_year + first_weekday) // 7 + 1
+        yield day.isoformat(), year, month, day_of_month, week, weekday
+        day += timedelta(days=1)
+
+
+def create_calendar(conn: sqlite3.Connection) -> None:
+    """Create and fill the calendar table"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS calendar (
+            day TEXT PRIMARY KEY,             -- Gregorian YYYY-MM-DD
+            jalali_year INTEGER NOT NULL,
+            jalali_month INTEGER NOT NULL,
+            jalali_day INTEGER NOT NULL,
+            jalali_week INTEGER NOT NULL,     -- week of the Jalali year, starting on Saturday
+            weekday INTEGER NOT NULL          -- 0 = Saturday .. 6 = Friday
+        ) WITHOUT ROWID
+    """)
+    conn.execute("DELETE FROM calendar")
+    conn.executemany("INSERT INTO calendar VALUES (?, ?, ?, ?, ?, ?)", calendar_rows())
@@ -3,8 +3,12 @@ from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import uvicorn
 
-from database import init_db
-from routers import partners, phones, customers, sales, installments, transactions, investors, auth, expenses, users, phone_models
+from compression import CompressionMiddleware
+from database import init_db, close_pool, get_pool_stats, get_read_db, get_storage_settings
+from db_executor import db_task, shutdown_executors
+from write_coordinator import get_writer_stats
+from queries import get_statement_cache_stats
+from routers import partners, phones, customers, sales, installments, transactions, investors, auth, expenses, users, phone_models, sync, batch, financials, dashboard, reports
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -12,7 +16,8 @@ async def lifespan(app: FastAPI):
     init_db()
     yield
     # Shutdown
-    pass
+    shutdown_executors()
+    close_pool()
 
 app = FastAPI(
     title="Mobile Installment Business API",
@@ -31,6 +36,9 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+# gzip (brotli/zstd when installed) for direct API consumers; small bodies are sent as is
+app.add_middleware(CompressionMiddleware)
+
 # Include routers
 app.include_router(partners.router, prefix="/api/partners", tags=["Partners"])
 app.include_router(phones.router, prefix="/api/phones", tags=["Phones"])
@@ -43,9 +51,14 @@ app.include_router(auth.router, prefix="/api/auth", tags=["Auth"])
 app.include_router(users.router, prefix="/api/users", tags=["Users"])
 app.include_router(expenses.router, prefix="/api/expenses", tags=["Expenses"])
 app.include_router(phone_models.router, prefix="/api/phone-models", tags=["Phone Models"])
+app.include_router(sync.router, prefix="/api/sync", tags=["Sync"])
+app.include_router(batch.router, prefix="/api/batch", tags=["Batch"])
+app.include_router(financials.router, prefix="/api/financials", tags=["Financials"])
+app.include_router(dashboard.router, prefix="/api/dashboard", tags=["Dashboard"])
+app.include_router(reports.router, prefix="/api/reports", tags=["Reports"])
 
 @app.get("/")
-def read_root():
+async def read_root():
     return {
         "message": "Mobile Installment Business API",
         "version": "1.0.0",
@@ -53,8 +66,21 @@ def read_root():
     }
 
 @app.get("/health")
-def health_check():
+async def health_check():
     return {"status": "healthy"}
 
+@app.get("/health/db")
+@db_task
+def database_health():
+    """Connection pool, writer queue, statement cache and storage settings for this worker"""
+    with get_read_db() as conn:
+        storage = get_storage_settings(conn)
+    return {
+        "pool": get_pool_stats(),
+        "writer": get_writer_stats(),
+        "statement_cache": get_statement_cache_stats(),
+        "storage": storage,
+    }
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
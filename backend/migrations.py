@@ -0,0 +1,880 @@
+#!/usr/bin/env python3
+"""
+Versioned schema migrations tracked in the schema_version table.
+
+Each migration is a function registered with @migration(version, name). On
+startup init_db() calls run_migrations(): when the stored version is already
+the latest, nothing but one SELECT runs. Otherwise consecutive pending
+migrations are applied together in one transaction, and migrations marked
+``batched=True`` (large table rewrites) copy rows in short transactions so
+they never hold the write lock for the whole table.
+
+Usage:
+    python migrations.py          # apply pending migrations
+    python migrations.py status   # show applied / pending versions
+"""
+import os
+import re
+import sqlite3
+import sys
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines: single process, no lock needed
+    fcntl = None
+
+import database
+from ids import id_for_timestamp
+from money import MONEY_COLUMNS
+
+MIGRATION_BATCH_SIZE = int(os.getenv("MIGRATION_BATCH_SIZE", "5000"))
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    apply: Callable[[sqlite3.Connection], None]
+    batched: bool = False
+
+
+MIGRATIONS: List[Migration] = []
+
+
+def migration(version: int, name: str, batched: bool = False):
+    """Register a migration function"""
+    def decorator(func: Callable[[sqlite3.Connection], None]):
+        if MIGRATIONS and version <= MIGRATIONS[-1].version:
+            raise ValueError(f"Migration {version} registered out of order")
+        MIGRATIONS.append(Migration(version, name, func, batched))
+        return func
+    return decorator
+
+
+def latest_version() -> int:
+    return MIGRATIONS[-1].version if MIGRATIONS else 0
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def table_columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})").fetchall()]
+
+
+def table_exists(conn: sqlite3.Connection, table: str) -> bool:
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone()
+    return row is not None
+
+
+def add_columns(conn: sqlite3.Connection, table: str, columns: Sequence[Tuple[str, str]]) -> None:
+    """ALTER TABLE ADD COLUMN for every column the table doesn't have yet"""
+    existing = table_columns(conn, table)
+    for name, definition in columns:
+        if name not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+
+
+def new_table_sql(conn: sqlite3.Connection, table: str) -> str:
+    """Current CREATE TABLE statement of ``table``, renamed to ``{table}__new``"""
+    current_sql = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone()[0]
+    return re.sub(r'^CREATE TABLE\s+("?)\w+\1', f"CREATE TABLE {table}__new", current_sql, count=1)
+
+
+def rewrite_table(
+    conn: sqlite3.Connection,
+    table: str,
+    create_sql: Optional[str] = None,
+    columns: Optional[Sequence[str]] = None,
+    select_exprs: Optional[Sequence[str]] = None,
+    order_by: str = "rowid",
+    indexes: Iterable[str] = (),
+    batch_size: Optional[int] = None,
+) -> None:
+    """Rebuild ``table``, copying rows in batches.
+
+    ``create_sql`` must create a table named ``{table}__new``; by default the
+    current definition is reused (for rewrites that only change values or row
+    order). ``select_exprs`` compute the new value of each of ``columns`` from
+    the old row. Rows are copied in ``order_by`` order, ``batch_size`` rows per
+    transaction, so readers and the backup job are never blocked for long.
+    The final swap (drop, rename, recreate the table's indexes and triggers
+    plus any extra ``indexes``) is one short transaction. Must be called
+    outside a transaction (``batched=True`` migrations are).
+    """
+    batch_size = batch_size or MIGRATION_BATCH_SIZE
+    new_table = f"{table}__new"
+    columns = list(columns or table_columns(conn, table))
+    select_exprs = select_exprs or columns
+    column_list = ", ".join(columns)
+    select_list = ", ".join(select_exprs)
+
+    if create_sql is None:
+        create_sql = new_table_sql(conn, table)
+    # Indexes and triggers are dropped together with the old table
+    dependents = [
+        row[0] for row in conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type IN ('index', 'trigger') AND tbl_name = ? AND sql IS NOT NULL",
+            (table,),
+        ).fetchall()
+    ]
+
+    with _transaction(conn):
+        conn.execute(f"DROP TABLE IF EXISTS {new_table}")
+        conn.execute(create_sql)
+        # Copy order is fixed up front so batches can resume by position
+        conn.execute("DROP TABLE IF EXISTS temp.rewrite_order")
+        conn.execute(
+            f"CREATE TEMP TABLE rewrite_order AS "
+            f"SELECT rowid AS src_rowid FROM {table} ORDER BY {order_by}"
+        )
+
+    position = 0
+    while True:
+        with _transaction(conn):
+            copied = conn.execute(
+                f"INSERT INTO {new_table} ({column_list}) "
+                f"SELECT {select_list} FROM temp.rewrite_order o "
+                f"JOIN {table} ON {table}.rowid = o.src_rowid "
+                f"WHERE o.rowid > ? ORDER BY o.rowid LIMIT ?",
+                (position, batch_size),
+            ).rowcount
+        if copied <= 0:
+            break
+        position += copied
+
+    with _transaction(conn):
+        conn.execute("DROP TABLE temp.rewrite_order")
+        conn.execute(f"DROP TABLE {table}")
+        conn.execute(f"ALTER TABLE {new_table} RENAME TO {table}")
+        for statement in [*dependents, *indexes]:
+            conn.execute(statement)
+
+
+@contextmanager
+def _transaction(conn: sqlite3.Connection):
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+# ---------------------------------------------------------------------------
+# Migrations
+# ---------------------------------------------------------------------------
+
+@migration(1, "baseline schema")
+def _baseline_schema(conn: sqlite3.Connection) -> None:
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS partners (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            capital REAL NOT NULL DEFAULT 0,
+            available_capital REAL NOT NULL DEFAULT 0,
+            initial_profit REAL NOT NULL DEFAULT 0,
+            monthly_profit REAL NOT NULL DEFAULT 0,
+            share REAL NOT NULL DEFAULT 0,
+            created_at TEXT NOT NULL
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS phones (
+            id TEXT PRIMARY KEY,
+            brand TEXT NOT NULL,
+            model TEXT NOT NULL,
+            imei TEXT NOT NULL UNIQUE,
+            purchase_price REAL NOT NULL,
+            selling_price REAL NOT NULL,
+            status TEXT NOT NULL DEFAULT 'available',
+            purchase_date TEXT NOT NULL
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS customers (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            phone TEXT NOT NULL,
+            national_id TEXT NOT NULL,
+            address TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS sales (
+            id TEXT PRIMARY KEY,
+            customer_id TEXT NOT NULL,
+            phone_id TEXT NOT NULL,
+            announced_price REAL NOT NULL,
+            purchase_price REAL NOT NULL,
+            down_payment REAL NOT NULL DEFAULT 0,
+            installment_months INTEGER NOT NULL,
+            monthly_interest_rate REAL NOT NULL DEFAULT 0.04,
+            initial_profit REAL NOT NULL DEFAULT 0,
+            sale_date TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'active',
+            FOREIGN KEY (customer_id) REFERENCES customers(id),
+            FOREIGN KEY (phone_id) REFERENCES phones(id)
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS installments (
+            id TEXT PRIMARY KEY,
+            sale_id TEXT NOT NULL,
+            installment_number INTEGER NOT NULL,
+            principal_amount REAL NOT NULL,
+            interest_amount REAL NOT NULL,
+            total_amount REAL NOT NULL,
+            remaining_debt REAL NOT NULL,
+            due_date TEXT NOT NULL,
+            paid_date TEXT,
+            status TEXT NOT NULL DEFAULT 'pending',
+            FOREIGN KEY (sale_id) REFERENCES sales(id)
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS transactions (
+            id TEXT PRIMARY KEY,
+            partner_id TEXT NOT NULL,
+            type TEXT NOT NULL,
+            amount REAL NOT NULL,
+            description TEXT NOT NULL,
+            profit_type TEXT,
+            date TEXT NOT NULL,
+            FOREIGN KEY (partner_id) REFERENCES partners(id)
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS investors (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            phone TEXT NOT NULL,
+            national_id TEXT NOT NULL,
+            investment_amount REAL NOT NULL,
+            profit_rate REAL NOT NULL DEFAULT 4.0,
+            total_profit REAL NOT NULL DEFAULT 0,
+            start_date TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'active',
+            created_at TEXT NOT NULL
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS investor_transactions (
+            id TEXT PRIMARY KEY,
+            investor_id TEXT NOT NULL,
+            type TEXT NOT NULL,
+            amount REAL NOT NULL,
+            description TEXT NOT NULL,
+            date TEXT NOT NULL,
+            FOREIGN KEY (investor_id) REFERENCES investors(id)
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            id TEXT PRIMARY KEY,
+            full_name TEXT NOT NULL,
+            mobile TEXT NOT NULL UNIQUE,
+            password TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS expenses (
+            id TEXT PRIMARY KEY,
+            date TEXT NOT NULL,
+            type TEXT NOT NULL,
+            amount REAL NOT NULL,
+            description TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS custom_phone_models (
+            id TEXT PRIMARY KEY,
+            brand TEXT NOT NULL,
+            model TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            UNIQUE(brand, model)
+        )
+    """)
+
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_sales_customer ON sales(customer_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_sales_phone ON sales(phone_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_installments_sale ON installments(sale_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_installments_status ON installments(status)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_transactions_partner ON transactions(partner_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_investor_transactions_investor ON investor_transactions(investor_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_users_mobile ON users(mobile)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_expenses_date ON expenses(date)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_expenses_type ON expenses(type)")
+
+
+@migration(2, "phone details columns")
+def _phone_details(conn: sqlite3.Connection) -> None:
+    add_columns(conn, "phones", [
+        ("color", "TEXT"),
+        ("storage", "TEXT"),
+        ("condition", "TEXT DEFAULT 'new'"),
+        ("purchase_source", "TEXT"),
+        ("notes", "TEXT"),
+    ])
+
+
+@migration(3, "sale profit calculation columns")
+def _sale_profit_columns(conn: sqlite3.Connection) -> None:
+    add_columns(conn, "sales", [
+        ("profit_calculation_type", "TEXT DEFAULT 'fixed_4_percent'"),
+        ("custom_profit_rate", "REAL DEFAULT 0.04"),
+        ("total_profit", "REAL DEFAULT 0"),
+    ])
+
+
+@migration(4, "partner status and soft delete")
+def _partner_status(conn: sqlite3.Connection) -> None:
+    add_columns(conn, "partners", [
+        ("status", "TEXT DEFAULT 'active'"),
+        ("deleted_at", "TEXT"),
+    ])
+    conn.execute("UPDATE partners SET status = 'active' WHERE status IS NULL")
+
+
+@migration(5, "user roles")
+def _user_roles(conn: sqlite3.Connection) -> None:
+    add_columns(conn, "users", [
+        ("role", "TEXT DEFAULT 'admin'"),
+        ("partner_id", "TEXT"),
+        ("is_active", "INTEGER DEFAULT 1"),
+    ])
+
+
+@migration(6, "partner history")
+def _partner_history(conn: sqlite3.Connection) -> None:
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS partner_history (
+            id TEXT PRIMARY KEY,
+            partner_id TEXT NOT NULL,
+            name TEXT NOT NULL,
+            capital REAL NOT NULL,
+            available_capital REAL NOT NULL DEFAULT 0,
+            initial_profit REAL NOT NULL DEFAULT 0,
+            monthly_profit REAL NOT NULL DEFAULT 0,
+            share REAL NOT NULL DEFAULT 0,
+            action TEXT NOT NULL, -- 'created', 'updated', 'deleted'
+            action_date TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_partner_history_partner_id ON partner_history(partner_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_partner_history_action_date ON partner_history(action_date)")
+
+    # Seed a 'created' record for partners that predate the history table
+    conn.execute("""
+        INSERT OR IGNORE INTO partner_history
+            (id, partner_id, name, capital, available_capital, initial_profit, monthly_profit, share,
+             action, action_date, created_at)
+        SELECT id || '_created_' || created_at, id, name, capital, available_capital, initial_profit,
+               monthly_profit, share, 'created', created_at, created_at
+        FROM partners
+    """)
+
+
+# Tables re-keyed by migration 7: (table, query returning (id, creation time)
+# in creation order, foreign-key columns -> referenced table)
+_REKEY_TABLES = [
+    ("partners", "SELECT id, created_at FROM partners ORDER BY created_at, rowid", {}),
+    ("phones", "SELECT id, purchase_date FROM phones ORDER BY purchase_date, rowid", {}),
+    ("customers", "SELECT id, created_at FROM customers ORDER BY created_at, rowid", {}),
+    ("sales", "SELECT id, sale_date FROM sales ORDER BY sale_date, rowid",
+     {"customer_id": "customers", "phone_id": "phones"}),
+    ("installments", """
+        SELECT i.id, COALESCE(s.sale_date, i.due_date)
+        FROM installments i LEFT JOIN sales s ON s.id = i.sale_id
+        ORDER BY COALESCE(s.sale_date, i.due_date), i.sale_id, i.installment_number, i.rowid
+    """, {"sale_id": "sales"}),
+    ("transactions", "SELECT id, date FROM transactions ORDER BY date, rowid", {"partner_id": "partners"}),
+    ("investors", "SELECT id, created_at FROM investors ORDER BY created_at, rowid", {}),
+    ("investor_transactions", "SELECT id, date FROM investor_transactions ORDER BY date, rowid",
+     {"investor_id": "investors"}),
+    ("expenses", "SELECT id, created_at FROM expenses ORDER BY created_at, rowid", {}),
+    ("users", "SELECT id, created_at FROM users ORDER BY created_at, rowid", {"partner_id": "partners"}),
+    ("custom_phone_models", "SELECT id, created_at FROM custom_phone_models ORDER BY created_at, rowid", {}),
+    ("partner_history", "SELECT id, action_date FROM partner_history ORDER BY action_date, rowid",
+     {"partner_id": "partners"}),
+]
+
+
+def _mapped_id(table: str, expr: str) -> str:
+    return (
+        f"COALESCE((SELECT m.new_id FROM id_rekey_map m "
+        f"WHERE m.tbl = '{table}' AND m.old_id = {expr}), {expr})"
+    )
+
+
+@migration(7, "time-ordered primary keys", batched=True)
+def _time_ordered_ids(conn: sqlite3.Connection) -> None:
+    # The old -> new id map is built once and kept until the end, so an
+    # interrupted run resumes with the same ids
+    with _transaction(conn):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS id_rekey_map (
+                tbl TEXT NOT NULL,
+                old_id TEXT NOT NULL,
+                new_id TEXT NOT NULL,
+                PRIMARY KEY (tbl, old_id)
+            ) WITHOUT ROWID
+        """)
+        if conn.execute("SELECT 1 FROM id_rekey_map LIMIT 1").fetchone() is None:
+            for table, id_query, _ in _REKEY_TABLES:
+                rows = []
+                previous, sequence = None, 0
+                for old_id, created in conn.execute(id_query):
+                    sequence = sequence + 1 if created == previous else 0
+                    previous = created
+                    rows.append((table, old_id, id_for_timestamp(created, sequence)))
+                conn.executemany("INSERT INTO id_rekey_map (tbl, old_id, new_id) VALUES (?, ?, ?)", rows)
+
+    for table, _, foreign_keys in _REKEY_TABLES:
+        columns = table_columns(conn, table)
+        select_exprs = []
+        for column in columns:
+            if column == "id":
+                select_exprs.append(_mapped_id(table, f"{table}.id"))
+            elif column in foreign_keys:
+                select_exprs.append(_mapped_id(foreign_keys[column], f"{table}.{column}"))
+            else:
+                select_exprs.append(f"{table}.{column}")
+        rewrite_table(conn, table, columns=columns, select_exprs=select_exprs,
+                      order_by=_mapped_id(table, f"{table}.id"))
+
+    with _transaction(conn):
+        conn.execute("DROP TABLE id_rekey_map")
+
+
+# Installment total when converting REAL amounts: the sum of the rounded
+# parts when the original values added up (to within rounding)
+_INSTALLMENT_TOTAL = """
+    CASE WHEN ABS(principal_amount + interest_amount - total_amount) < 1
+         THEN CAST(ROUND(principal_amount) AS INTEGER) + CAST(ROUND(interest_amount) AS INTEGER)
+         ELSE CAST(ROUND(total_amount) AS INTEGER) END
+"""
+
+
+@migration(8, "integer toman money columns", batched=True)
+def _integer_money(conn: sqlite3.Connection) -> None:
+    rewrites = []
+    for table, money_columns in MONEY_COLUMNS.items():
+        if not table_exists(conn, table):
+            continue
+        create_sql = new_table_sql(conn, table)
+        for column in money_columns:
+            create_sql = re.sub(rf"\b{column}\s+REAL\b", f"{column} INTEGER", create_sql)
+        columns = table_columns(conn, table)
+        select_exprs = [
+            f"CAST(ROUND({column}) AS INTEGER)" if column in money_columns else column
+            for column in columns
+        ]
+        if table == "installments":
+            # Total from the rounded parts, so principal + interest == total
+            select_exprs[columns.index("total_amount")] = _INSTALLMENT_TOTAL
+        rewrites.append((table, create_sql, columns, select_exprs))
+
+    # Keep every value the rewrite changes (fractions of a Toman, non-numeric
+    # text) before it is overwritten
+    with _transaction(conn):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS money_rounding_log (
+                table_name TEXT NOT NULL,
+                row_id TEXT NOT NULL,
+                column_name TEXT NOT NULL,
+                original,                      -- value before migration 8
+                stored INTEGER,                -- whole Tomans written by it
+                PRIMARY KEY (table_name, row_id, column_name)
+            )
+        """)
+        for table, _, columns, select_exprs in rewrites:
+            for column, expr in zip(columns, select_exprs):
+                if column in MONEY_COLUMNS[table]:
+                    conn.execute(
+                        f"INSERT OR IGNORE INTO money_rounding_log "
+                        f"SELECT ?, id, ?, {column}, {expr} FROM {table} "
+                        f"WHERE {column} IS NOT NULL AND {column} IS NOT {expr}",
+                        (table, column),
+                    )
+    logged, over_half = conn.execute("""
+        SELECT COUNT(*), COALESCE(SUM(typeof(original) NOT IN ('integer', 'real') OR ABS(original - stored) > 0.5), 0)
+        FROM money_rounding_log
+    """).fetchone()
+    if logged:
+        print(f"⚠️  Migration 8: {logged} money values rounded to whole Tomans "
+              f"({over_half} changed by more than 0.5); originals kept in money_rounding_log")
+
+    for table, create_sql, columns, select_exprs in rewrites:
+        rewrite_table(conn, table, create_sql=create_sql, columns=columns, select_exprs=select_exprs)
+
+
+@migration(9, "composite indexes for router queries")
+def _composite_indexes(conn: sqlite3.Connection) -> None:
+    # Single-column indexes that are prefixes of the composite ones below
+    # (idx_users_mobile duplicates the UNIQUE constraint on users.mobile)
+    for name in (
+        "idx_installments_sale",
+        "idx_installments_status",
+        "idx_transactions_partner",
+        "idx_investor_transactions_investor",
+        "idx_expenses_date",
+        "idx_users_mobile",
+    ):
+        conn.execute(f"DROP INDEX IF EXISTS {name}")
+
+    # ORDER BY columns of the list queries, so they read in index order
+    # instead of sorting in a temp B-tree (see query_audit.py)
+    for statement in (
+        "CREATE INDEX IF NOT EXISTS idx_partners_status_created ON partners(status, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_partners_created ON partners(created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_phones_purchase_date ON phones(purchase_date)",
+        "CREATE INDEX IF NOT EXISTS idx_customers_created ON customers(created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_sales_sale_date ON sales(sale_date)",
+        "CREATE INDEX IF NOT EXISTS idx_installments_due_date ON installments(due_date)",
+        "CREATE INDEX IF NOT EXISTS idx_installments_status_due ON installments(status, due_date)",
+        "CREATE INDEX IF NOT EXISTS idx_installments_sale_number ON installments(sale_id, installment_number)",
+        "CREATE INDEX IF NOT EXISTS idx_transactions_partner_date ON transactions(partner_id, date)",
+        "CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions(date)",
+        "CREATE INDEX IF NOT EXISTS idx_investors_created ON investors(created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_investor_transactions_investor_date ON investor_transactions(investor_id, date)",
+        "CREATE INDEX IF NOT EXISTS idx_investor_transactions_date ON investor_transactions(date)",
+        "CREATE INDEX IF NOT EXISTS idx_expenses_date_created ON expenses(date, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_users_created ON users(created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_users_role ON users(role)",
+    ):
+        conn.execute(statement)
+
+
+@migration(10, "keyset pagination indexes")
+def _keyset_indexes(conn: sqlite3.Connection) -> None:
+    # Sort indexes from migration 9 get ``id`` as the last column, so
+    # "(sort_key, id) < (?, ?) ORDER BY sort_key, id" is a single range seek
+    for old, statement in (
+        ("idx_sales_sale_date", "CREATE INDEX IF NOT EXISTS idx_sales_sale_date_id ON sales(sale_date, id)"),
+        ("idx_installments_due_date",
+         "CREATE INDEX IF NOT EXISTS idx_installments_due_date_id ON installments(due_date, id)"),
+        ("idx_transactions_date", "CREATE INDEX IF NOT EXISTS idx_transactions_date_id ON transactions(date, id)"),
+        ("idx_customers_created", "CREATE INDEX IF NOT EXISTS idx_customers_created_id ON customers(created_at, id)"),
+        ("idx_phones_purchase_date",
+         "CREATE INDEX IF NOT EXISTS idx_phones_purchase_date_id ON phones(purchase_date, id)"),
+        ("idx_expenses_date_created",
+         "CREATE INDEX IF NOT EXISTS idx_expenses_date_created_id ON expenses(date, created_at, id)"),
+        ("idx_investor_transactions_date",
+         "CREATE INDEX IF NOT EXISTS idx_investor_transactions_date_id ON investor_transactions(date, id)"),
+    ):
+        conn.execute(f"DROP INDEX IF EXISTS {old}")
+        conn.execute(statement)
+
+
+# Tables whose changes bump their row in table_versions (migration 11)
+VERSIONED_TABLES = (
+    "partners", "partner_history", "phones", "customers", "sales", "installments", "transactions",
+    "investors", "investor_transactions", "expenses", "users", "custom_phone_models",
+)
+
+
+@migration(11, "per-table change counters")
+def _table_versions(conn: sqlite3.Connection) -> None:
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS table_versions (
+            table_name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0,
+            updated_at TEXT NOT NULL
+        ) WITHOUT ROWID
+    """)
+    now = "strftime('%Y-%m-%dT%H:%M:%fZ', 'now')"
+    for table in VERSIONED_TABLES:
+        conn.execute(f"INSERT OR IGNORE INTO table_versions (table_name, version, updated_at) VALUES (?, 0, {now})",
+                     (table,))
+        # Triggers, not the write path, so scripts and manual fixes count too
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_{event.lower()}_version
+                AFTER {event} ON {table}
+                BEGIN
+                    UPDATE table_versions SET version = version + 1, updated_at = {now}
+                    WHERE table_name = '{table}';
+                END
+            """)
+
+
+# Tables exposed through GET /api/sync (migration 12)
+SYNC_TABLES = (
+    "partners", "phones", "customers", "sales", "installments", "transactions",
+    "investors", "investor_transactions", "expenses", "custom_phone_models",
+)
+
+
+@migration(12, "delta sync columns and tombstones")
+def _delta_sync(conn: sqlite3.Connection) -> None:
+    now = "strftime('%Y-%m-%dT%H:%M:%fZ', 'now')"
+    # One global change sequence: every insert/update/delete takes the next
+    # value, so "changed since N" is a single range over all tables
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS sync_clock (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            seq INTEGER NOT NULL
+        )
+    """)
+    conn.execute("INSERT OR IGNORE INTO sync_clock (id, seq) VALUES (1, 0)")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS tombstones (
+            seq INTEGER PRIMARY KEY,
+            table_name TEXT NOT NULL,
+            row_id TEXT NOT NULL,
+            deleted_at TEXT NOT NULL
+        )
+    """)
+
+    for table in SYNC_TABLES:
+        add_columns(conn, table, [("updated_at", "TEXT"), ("change_seq", "INTEGER NOT NULL DEFAULT 0")])
+        # Existing rows get distinct sequence numbers so a first full sync
+        # can be paged like any other
+        offset = conn.execute("SELECT seq FROM sync_clock WHERE id = 1").fetchone()[0]
+        conn.execute(f"UPDATE {table} SET change_seq = ? + rowid, updated_at = {now} WHERE change_seq = 0",
+                     (offset,))
+        conn.execute(f"UPDATE sync_clock SET seq = MAX(seq, (SELECT COALESCE(MAX(change_seq), 0) FROM {table}))")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_change_seq ON {table}(change_seq)")
+
+        stamp = f"""
+            UPDATE sync_clock SET seq = seq + 1 WHERE id = 1;
+            UPDATE {table}
+            SET change_seq = (SELECT seq FROM sync_clock WHERE id = 1), updated_at = {now}
+            WHERE rowid = NEW.rowid;
+        """
+        # The nested UPDATE does not re-fire these triggers (recursive_triggers is off)
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS trg_{table}_sync_insert AFTER INSERT ON {table} BEGIN {stamp} END")
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS trg_{table}_sync_update AFTER UPDATE ON {table} BEGIN {stamp} END")
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_sync_delete AFTER DELETE ON {table}
+            BEGIN
+                UPDATE sync_clock SET seq = seq + 1 WHERE id = 1;
+                INSERT INTO tombstones (seq, table_name, row_id, deleted_at)
+                VALUES ((SELECT seq FROM sync_clock WHERE id = 1), '{table}', OLD.id, {now});
+            END
+        """)
+
+
+@migration(13, "expense filter index")
+def _expense_filter_index(conn: sqlite3.Connection) -> None:
+    # type = ? AND date range, read in list order (date, created_at, id);
+    # idx_expenses_type is its prefix
+    conn.execute("DROP INDEX IF EXISTS idx_expenses_type")
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_expenses_type_date_created_id ON expenses(type, date, created_at, id)"
+    )
+
+
+@migration(14, "sale status index")
+def _sale_status_index(conn: sqlite3.Connection) -> None:
+    # Enriched sales filtered by status, read in list order
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_sales_status_date_id ON sales(status, sale_date, id)")
+
+
+@migration(15, "paid installment amounts index")
+def _installment_amounts_index(conn: sqlite3.Connection) -> None:
+    # Paid installments summed per due_date (financials.py) straight from the
+    # index, without a table lookup per row; idx_installments_status_due is
+    # its prefix
+    conn.execute("DROP INDEX IF EXISTS idx_installments_status_due")
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_installments_status_due_amounts "
+        "ON installments(status, due_date, sale_id, principal_amount, interest_amount)"
+    )
+
+
+@migration(16, "installment totals in amounts index")
+def _installment_totals_index(conn: sqlite3.Connection) -> None:
+    # Dashboard sums per status (receivables, past due) read total_amount
+    # from the index too
+    conn.execute("DROP INDEX IF EXISTS idx_installments_status_due_amounts")
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_installments_status_due_amounts "
+        "ON installments(status, due_date, sale_id, principal_amount, interest_amount, total_amount)"
+    )
+
+
+@migration(17, "trigger-maintained summary tables")
+def _summary_tables(conn: sqlite3.Connection) -> None:
+    # Tables, triggers and source queries live in summaries.py
+    import summaries
+
+    summaries.create_summaries(conn)
+    summaries.rebuild(conn)
+
+
+@migration(18, "partner capital timeline backfill")
+def _capital_timeline(conn: sqlite3.Connection) -> None:
+    # Partners added or deleted before the routers wrote partner_history
+    # (capital_timeline.py) get their 'created' / 'deleted' rows
+    conn.execute("""
+        INSERT OR IGNORE INTO partner_history
+            (id, partner_id, name, capital, available_capital, initial_profit, monthly_profit, share,
+             action, action_date, created_at)
+        SELECT id || '_created_' || created_at, id, name, capital, available_capital, initial_profit,
+               monthly_profit, share, 'created', created_at, created_at
+        FROM partners p
+        WHERE NOT EXISTS (SELECT 1 FROM partner_history h WHERE h.partner_id = p.id AND h.action = 'created')
+    """)
+    conn.execute("""
+        INSERT OR IGNORE INTO partner_history
+            (id, partner_id, name, capital, available_capital, initial_profit, monthly_profit, share,
+             action, action_date, created_at)
+        SELECT id || '_deleted_' || deleted_at, id, name, capital, available_capital, initial_profit,
+               monthly_profit, share, 'deleted', deleted_at, deleted_at
+        FROM partners p
+        WHERE deleted_at IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM partner_history h WHERE h.partner_id = p.id AND h.action = 'deleted')
+    """)
+
+
+@migration(19, "jalali calendar table")
+def _jalali_calendar(conn: sqlite3.Connection) -> None:
+    # One row per Gregorian day with its Jalali year/month/week (jalali.py)
+    import jalali
+
+    jalali.create_calendar(conn)
+
+
+@migration(20, "installment totals from rounded parts")
+def _installment_totals_from_parts(conn: sqlite3.Connection) -> None:
+    # Databases converted by migration 8 before it derived the total: a one
+    # Toman difference is rounding (see money.installment_total)
+    conn.execute("""
+        UPDATE installments SET total_amount = principal_amount + interest_amount
+        WHERE ABS(principal_amount + interest_amount - total_amount) = 1
+    """)
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+def current_version(conn: sqlite3.Connection) -> int:
+    try:
+        row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    except sqlite3.OperationalError:
+        return 0
+    return row[0] or 0
+
+
+def _record_version(conn: sqlite3.Connection, item: Migration) -> None:
+    conn.execute(
+        "INSERT INTO schema_version (version, name, applied_at) VALUES (?, ?, ?)",
+        (item.version, item.name, datetime.now().isoformat()),
+    )
+
+
+@contextmanager
+def _migration_lock(database_path: str):
+    """Keep several uvicorn workers from migrating the same file at once"""
+    if fcntl is None or database_path == ":memory:":
+        yield
+        return
+    with open(f"{database_path}.migrate.lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _group_pending(pending: List[Migration]) -> List[List[Migration]]:
+    """Split pending migrations into runs of plain migrations and single batched ones"""
+    groups: List[List[Migration]] = []
+    for item in pending:
+        if item.batched or not groups or groups[-1][0].batched:
+            groups.append([item])
+        else:
+            groups[-1].append(item)
+    return groups
+
+
+def run_migrations(database_path: Optional[str] = None) -> List[Migration]:
+    """Apply pending migrations; returns the migrations that were applied"""
+    database_path = database_path or database.DATABASE_URL
+    conn = database.connect(database_path)
+    conn.isolation_level = None
+    try:
+        if current_version(conn) >= latest_version():
+            return []
+
+        applied: List[Migration] = []
+        with _migration_lock(database_path):
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    applied_at TEXT NOT NULL
+                )
+            """)
+            # Another worker may have finished while we waited for the lock
+            version = current_version(conn)
+            pending = [item for item in MIGRATIONS if item.version > version]
+
+            for group in _group_pending(pending):
+                if group[0].batched:
+                    item = group[0]
+                    item.apply(conn)
+                    with _transaction(conn):
+                        _record_version(conn, item)
+                else:
+                    with _transaction(conn):
+                        for item in group:
+                            item.apply(conn)
+                            _record_version(conn, item)
+                applied.extend(group)
+        return applied
+    finally:
+        conn.close()
+
+
+def migration_status(database_path: Optional[str] = None) -> List[Tuple[int, str, Optional[str]]]:
+    """(version, name, applied_at or None) for every known migration"""
+    conn = database.connect(database_path or database.DATABASE_URL)
+    try:
+        try:
+            rows = conn.execute("SELECT version, applied_at FROM schema_version").fetchall()
+        except sqlite3.OperationalError:
+            rows = []
+        applied_at = {row[0]: row[1] for row in rows}
+        return [(item.version, item.name, applied_at.get(item.version)) for item in MIGRATIONS]
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "status":
+        for version, name, applied_at in migration_status():
+            state = f"applied {applied_at}" if applied_at else "pending"
+            print(f"{version:>4}  {name:<40} {state}")
+    else:
+        applied = run_migrations()
+        if applied:
+            for item in applied:
+                print(f"✅ {item.version}: {item.name}")
+        else:
+            print("✅ Schema is up to date")
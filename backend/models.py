@@ -1,11 +1,16 @@
-from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional, Literal
+from pydantic import BaseModel, BeforeValidator, Field, ConfigDict, model_validator
+from typing import Annotated, List, Optional, Literal
 from datetime import datetime
 
+from money import installment_total, to_toman
+
+# Amounts in whole Tomans; floats and numeric strings are rounded on input
+Money = Annotated[int, BeforeValidator(to_toman)]
+
 # Partner Models
 class PartnerBase(BaseModel):
     name: str
-    capital: float
+    capital: Money
     share: float
 
 class PartnerCreate(PartnerBase):
@@ -13,32 +18,47 @@ class PartnerCreate(PartnerBase):
 
 class PartnerUpdate(BaseModel):
     name: Optional[str] = None
-    capital: Optional[float] = None
-    available_capital: Optional[float] = Field(None, alias='availableCapital')
-    initial_profit: Optional[float] = Field(None, alias='initialProfit')
-    monthly_profit: Optional[float] = Field(None, alias='monthlyProfit')
+    capital: Optional[Money] = None
+    available_capital: Optional[Money] = Field(None, alias='availableCapital')
+    initial_profit: Optional[Money] = Field(None, alias='initialProfit')
+    monthly_profit: Optional[Money] = Field(None, alias='monthlyProfit')
     share: Optional[float] = None
 
     model_config = ConfigDict(populate_by_name=True)
 
 class Partner(PartnerBase):
     id: str
-    available_capital: float = Field(..., alias='availableCapital')
-    initial_profit: float = Field(..., alias='initialProfit')
-    monthly_profit: float = Field(..., alias='monthlyProfit')
+    available_capital: Money = Field(..., alias='availableCapital')
+    initial_profit: Money = Field(..., alias='initialProfit')
+    monthly_profit: Money = Field(..., alias='monthlyProfit')
     created_at: str = Field(..., alias='createdAt')
     status: Optional[str] = 'active'
     deleted_at: Optional[str] = Field(None, alias='deletedAt')
 
     model_config = ConfigDict(from_attributes=True, populate_by_name=True)
 
+# Partner shares of total capital at a point in time (capital_timeline.py)
+class PartnerShare(BaseModel):
+    partner_id: str = Field(..., alias='partnerId')
+    capital: int
+    share: float
+
+    model_config = ConfigDict(populate_by_name=True)
+
+class CapitalShares(BaseModel):
+    at: str
+    total_capital: int = Field(..., alias='totalCapital')
+    partners: List[PartnerShare]
+
+    model_config = ConfigDict(populate_by_name=True)
+
 # Phone Models
 class PhoneBase(BaseModel):
     brand: str
     model: str
     imei: str
-    purchase_price: float = Field(..., alias='purchasePrice')
-    selling_price: float = Field(..., alias='sellingPrice')
+    purchase_price: Money = Field(..., alias='purchasePrice')
+    selling_price: Money = Field(..., alias='sellingPrice')
 
     model_config = ConfigDict(populate_by_name=True)
 
@@ -57,8 +77,8 @@ class PhoneUpdate(BaseModel):
     brand: Optional[str] = None
     model: Optional[str] = None
     imei: Optional[str] = None
-    purchase_price: Optional[float] = Field(None, alias='purchasePrice')
-    selling_price: Optional[float] = Field(None, alias='sellingPrice')
+    purchase_price: Optional[Money] = Field(None, alias='purchasePrice')
+    selling_price: Optional[Money] = Field(None, alias='sellingPrice')
     status: Optional[Literal['available', 'sold']] = None
     purchase_date: Optional[str] = Field(None, alias='purchaseDate')
     color: Optional[str] = None
@@ -111,12 +131,12 @@ class Customer(CustomerBase):
 class SaleBase(BaseModel):
     customer_id: str = Field(..., alias='customerId')
     phone_id: str = Field(..., alias='phoneId')
-    announced_price: float = Field(..., alias='announcedPrice')
-    purchase_price: float = Field(..., alias='purchasePrice')
-    down_payment: float = Field(..., alias='downPayment')
+    announced_price: Money = Field(..., alias='announcedPrice')
+    purchase_price: Money = Field(..., alias='purchasePrice')
+    down_payment: Money = Field(..., alias='downPayment')
     installment_months: int = Field(..., alias='installmentMonths')
     monthly_interest_rate: float = Field(0.04, alias='monthlyInterestRate')
-    initial_profit: float = Field(..., alias='initialProfit')
+    initial_profit: Money = Field(..., alias='initialProfit')
 
     model_config = ConfigDict(populate_by_name=True)
 
@@ -127,13 +147,13 @@ class SaleCreate(SaleBase):
     model_config = ConfigDict(populate_by_name=True)
 
 class SaleUpdate(BaseModel):
-    announced_price: Optional[float] = None
-    down_payment: Optional[float] = None
+    announced_price: Optional[Money] = None
+    down_payment: Optional[Money] = None
     installment_months: Optional[int] = None
     profit_calculation_type: Optional[str] = None
     custom_profit_rate: Optional[float] = None
-    total_profit: Optional[float] = None
-    initial_profit: Optional[float] = None
+    total_profit: Optional[Money] = None
+    initial_profit: Optional[Money] = None
     sale_date: Optional[str] = None
     status: Optional[Literal['active', 'completed', 'defaulted']] = None
     
@@ -146,14 +166,28 @@ class Sale(SaleBase):
 
     model_config = ConfigDict(from_attributes=True, populate_by_name=True)
 
+class SaleEnriched(Sale):
+    customer_name: Optional[str] = Field(None, alias='customerName')
+    phone_brand: Optional[str] = Field(None, alias='phoneBrand')
+    phone_model: Optional[str] = Field(None, alias='phoneModel')
+    phone_imei: Optional[str] = Field(None, alias='phoneImei')
+    installment_count: int = Field(..., alias='installmentCount')
+    paid_installments: int = Field(..., alias='paidInstallments')
+    remaining_installments: int = Field(..., alias='remainingInstallments')
+    paid_amount: int = Field(..., alias='paidAmount')  # down payment + paid installments
+    outstanding_balance: int = Field(..., alias='outstandingBalance')  # unpaid installments
+    next_due_date: Optional[str] = Field(None, alias='nextDueDate')
+
+    model_config = ConfigDict(from_attributes=True, populate_by_name=True)
+
 # Installment Models
 class InstallmentBase(BaseModel):
     sale_id: str = Field(..., alias='saleId')
     installment_number: int = Field(..., alias='installmentNumber')
-    principal_amount: float = Field(..., alias='principalAmount')
-    interest_amount: float = Field(..., alias='interestAmount')
-    total_amount: float = Field(..., alias='totalAmount')
-    remaining_debt: float = Field(..., alias='remainingDebt')
+    principal_amount: Money = Field(..., alias='principalAmount')
+    interest_amount: Money = Field(..., alias='interestAmount')
+    total_amount: Money = Field(..., alias='totalAmount')
+    remaining_debt: Money = Field(..., alias='remainingDebt')
     due_date: str = Field(..., alias='dueDate')
 
     model_config = ConfigDict(populate_by_name=True)
@@ -161,6 +195,11 @@ class InstallmentBase(BaseModel):
 class InstallmentCreate(InstallmentBase):
     status: Literal['pending', 'paid', 'overdue'] = 'pending'
 
+    @model_validator(mode="after")
+    def _total_from_parts(self):
+        self.total_amount = installment_total(self.principal_amount, self.interest_amount, self.total_amount)
+        return self
+
 class InstallmentUpdate(BaseModel):
     status: Optional[Literal['pending', 'paid', 'overdue']] = None
     paid_date: Optional[str] = Field(None, alias='paidDate')
@@ -178,7 +217,7 @@ class Installment(InstallmentBase):
 class TransactionBase(BaseModel):
     partner_id: str = Field(..., alias='partnerId')
     type: Literal['capital_add', 'capital_withdraw', 'initial_profit_withdraw', 'monthly_profit_withdraw', 'profit_to_capital']
-    amount: float
+    amount: Money
     description: str
     profit_type: Optional[Literal['initial', 'monthly', 'both']] = Field(None, alias='profitType')
 
@@ -198,7 +237,7 @@ class InvestorBase(BaseModel):
     name: str
     phone: str
     national_id: str = Field(..., alias='nationalId')
-    investment_amount: float = Field(..., alias='investmentAmount')
+    investment_amount: Money = Field(..., alias='investmentAmount')
     profit_rate: float = Field(4.0, alias='profitRate')
 
     model_config = ConfigDict(populate_by_name=True)
@@ -213,9 +252,9 @@ class InvestorUpdate(BaseModel):
     name: Optional[str] = None
     phone: Optional[str] = None
     national_id: Optional[str] = Field(None, alias='nationalId')
-    investment_amount: Optional[float] = Field(None, alias='investmentAmount')
+    investment_amount: Optional[Money] = Field(None, alias='investmentAmount')
     profit_rate: Optional[float] = Field(None, alias='profitRate')
-    total_profit: Optional[float] = Field(None, alias='totalProfit')
+    total_profit: Optional[Money] = Field(None, alias='totalProfit')
     start_date: Optional[str] = Field(None, alias='startDate')
     status: Optional[Literal['active', 'inactive']] = None
 
@@ -223,7 +262,7 @@ class InvestorUpdate(BaseModel):
 
 class Investor(InvestorBase):
     id: str
-    total_profit: float = Field(..., alias='totalProfit')
+    total_profit: Money = Field(..., alias='totalProfit')
     start_date: str = Field(..., alias='startDate')
     status: str
     created_at: str = Field(..., alias='createdAt')
@@ -234,7 +273,7 @@ class Investor(InvestorBase):
 class InvestorTransactionBase(BaseModel):
     investor_id: str = Field(..., alias='investorId')
     type: Literal['profit_payment', 'investment_add', 'investment_withdraw']
-    amount: float
+    amount: Money
     description: str
 
     model_config = ConfigDict(populate_by_name=True)
@@ -289,7 +328,7 @@ class User(UserBase):
 class ExpenseBase(BaseModel):
     date: str
     type: str
-    amount: float
+    amount: Money
     description: str
 
     model_config = ConfigDict(populate_by_name=True)
@@ -300,7 +339,7 @@ class ExpenseCreate(ExpenseBase):
 class ExpenseUpdate(BaseModel):
     date: Optional[str] = None
     type: Optional[str] = None
-    amount: Optional[float] = None
+    amount: Optional[Money] = None
     description: Optional[str] = None
 
     model_config = ConfigDict(populate_by_name=True)
@@ -309,4 +348,119 @@ class Expense(ExpenseBase):
     id: str
     created_at: str = Field(..., alias='createdAt')
 
-    model_config = ConfigDict(from_attributes=True, populate_by_name=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True, populate_by_name=True)
+
+class ExpenseTotal(BaseModel):
+    count: int
+    total: int
+
+class ExpenseTypeTotal(ExpenseTotal):
+    type: str
+
+class ExpenseMonthTotal(ExpenseTotal):
+    month: str  # YYYY-MM
+
+class ExpenseSummary(ExpenseTotal):
+    by_type: List[ExpenseTypeTotal] = Field(..., alias='byType')
+    by_month: List[ExpenseMonthTotal] = Field(..., alias='byMonth')
+
+    model_config = ConfigDict(populate_by_name=True)
+
+# Partner financials (financials.py, profitCalculator.ts FinancialSummary)
+class PartnerFinancials(BaseModel):
+    partner_id: str = Field(..., alias='partnerId')
+    partner_name: str = Field(..., alias='partnerName')
+    initial_capital: int = Field(..., alias='initialCapital')
+    available_capital: int = Field(..., alias='availableCapital')
+    used_capital: int = Field(..., alias='usedCapital')
+    share: float
+    initial_profit: int = Field(..., alias='initialProfit')
+    monthly_profit: int = Field(..., alias='monthlyProfit')
+    total_profit: int = Field(..., alias='totalProfit')
+
+    model_config = ConfigDict(populate_by_name=True)
+
+class FinancialSummary(BaseModel):
+    total_capital: int = Field(..., alias='totalCapital')
+    total_available_capital: int = Field(..., alias='totalAvailableCapital')
+    total_used_capital: int = Field(..., alias='totalUsedCapital')
+    total_initial_profit: int = Field(..., alias='totalInitialProfit')
+    total_monthly_profit: int = Field(..., alias='totalMonthlyProfit')
+    total_profit: int = Field(..., alias='totalProfit')
+    partner_financials: List[PartnerFinancials] = Field(..., alias='partnerFinancials')
+
+    model_config = ConfigDict(populate_by_name=True)
+
+# Dashboard summary (routers/dashboard.py)
+class InstallmentTotal(BaseModel):
+    count: int
+    total: int
+
+class DashboardSummary(BaseModel):
+    total_sales: int = Field(..., alias='totalSales')
+    total_revenue: int = Field(..., alias='totalRevenue')
+    active_customers: int = Field(..., alias='activeCustomers')
+    total_capital: int = Field(..., alias='totalCapital')
+    partners_capital: int = Field(..., alias='partnersCapital')
+    investors_capital: int = Field(..., alias='investorsCapital')
+    used_capital: int = Field(..., alias='usedCapital')
+    receivables: InstallmentTotal
+    # Status 'overdue' plus pending installments due by today (also in receivables)
+    due_or_overdue: InstallmentTotal = Field(..., alias='dueOrOverdue')
+    collected: InstallmentTotal
+    initial_profit: int = Field(..., alias='initialProfit')
+    monthly_profit: int = Field(..., alias='monthlyProfit')
+    total_profit: int = Field(..., alias='totalProfit')
+    total_expenses: int = Field(..., alias='totalExpenses')
+    investors_profit_paid: int = Field(..., alias='investorsProfitPaid')
+    net_profit: int = Field(..., alias='netProfit')
+
+    model_config = ConfigDict(populate_by_name=True)
+
+# Balances and totals from the summary tables (summaries.py)
+class CustomerBalance(BaseModel):
+    customer_id: str = Field(..., alias='customerId')
+    sale_count: int = Field(..., alias='saleCount')
+    down_payments: int = Field(..., alias='downPayments')
+    paid_installments: int = Field(..., alias='paidInstallments')
+    total_paid: int = Field(..., alias='totalPaid')
+    outstanding_balance: int = Field(..., alias='outstandingBalance')
+
+    model_config = ConfigDict(populate_by_name=True)
+
+class CollectionMonth(BaseModel):
+    month: str  # YYYY-MM
+    count: int
+    principal: int
+    interest: int
+    total: int
+
+class TransactionTotal(BaseModel):
+    type: str
+    count: int
+    total: int
+
+# Rollups by Jalali month (routers/reports.py)
+class JalaliMonth(BaseModel):
+    year: int
+    month: int  # 1 = Farvardin .. 12 = Esfand
+    count: int
+
+class JalaliSalesMonth(JalaliMonth):
+    revenue: int
+    purchase_total: int = Field(..., alias='purchaseTotal')
+    initial_profit: int = Field(..., alias='initialProfit')
+    down_payments: int = Field(..., alias='downPayments')
+
+    model_config = ConfigDict(populate_by_name=True)
+
+class JalaliCollectionsMonth(JalaliMonth):
+    principal: int
+    interest: int
+    total: int
+
+class JalaliInterestMonth(JalaliMonth):
+    interest: int
+
+class JalaliExpensesMonth(JalaliMonth):
+    total: int
@@ -0,0 +1,105 @@
+"""
+Money amounts are stored as INTEGER whole Tomans (the unit the frontend
+shows as "تومان"; nothing is converted to rials).
+
+Integer columns make SUM/GROUP BY exact and keep rows smaller than REAL.
+API models convert incoming amounts (int, float or numeric string) to whole
+Tomans with round-half-up; everything below the model layer only ever sees
+ints.
+
+Migration 8 rounded the old REAL columns to whole Tomans; every value it
+changed is kept, with what was stored instead, in ``money_rounding_log``.
+
+An installment's total is its principal plus its interest. Rounding the
+three separately can leave them one Toman apart, so the total is derived
+from the rounded parts (``installment_total``).
+
+Usage:
+    python money.py check   # installments whose principal + interest != total (exit 1 if any)
+"""
+import sys
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Money columns per table (rates and shares stay REAL)
+MONEY_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "partners": ("capital", "available_capital", "initial_profit", "monthly_profit"),
+    "partner_history": ("capital", "available_capital", "initial_profit", "monthly_profit"),
+    "phones": ("purchase_price", "selling_price"),
+    "sales": ("announced_price", "purchase_price", "down_payment", "initial_profit", "total_profit"),
+    "installments": ("principal_amount", "interest_amount", "total_amount", "remaining_debt"),
+    "transactions": ("amount",),
+    "investors": ("investment_amount", "total_profit"),
+    "investor_transactions": ("amount",),
+    "expenses": ("amount",),
+}
+
+
+def to_toman(value) -> int:
+    """Round an amount to whole Tomans (half away from zero)"""
+    if isinstance(value, bool):
+        raise ValueError("Amount must be a number")
+    if isinstance(value, int):
+        return value
+    try:
+        amount = Decimal(str(value).strip())
+    except (InvalidOperation, ValueError):
+        raise ValueError("Amount must be a number")
+    if not amount.is_finite():
+        raise ValueError("Amount must be a finite number")
+    return int(amount.quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def allocate(amount: int, weights: Sequence[float]) -> List[int]:
+    """Split ``amount`` Tomans in proportion to ``weights``.
+
+    Uses the largest-remainder method, so the parts always add up to exactly
+    ``amount``. Zero or empty total weight splits evenly.
+    """
+    if not weights:
+        return []
+    total = sum(weights)
+    if total <= 0:
+        weights, total = [1] * len(weights), len(weights)
+    sign = -1 if amount < 0 else 1
+    magnitude = abs(amount)
+    exact = [Decimal(magnitude) * Decimal(str(weight)) / Decimal(str(total)) for weight in weights]
+    parts = [int(share) for share in exact]
+    leftover = magnitude - sum(parts)
+    by_remainder = sorted(range(len(exact)), key=lambda i: exact[i] - parts[i], reverse=True)
+    for index in by_remainder[:leftover]:
+        parts[index] += 1
+    return [sign * part for part in parts]
+
+
+def installment_total(principal: int, interest: int, total: int) -> int:
+    """``total`` reconciled with the rounded parts: off by one Toman means
+    rounding, so it becomes principal + interest; more is an error"""
+    parts = principal + interest
+    if abs(total - parts) > 1:
+        raise ValueError(f"Total {total} is not principal + interest ({parts})")
+    return parts
+
+
+def check(database_path: Optional[str] = None) -> int:
+    """Number of installments whose principal + interest != total"""
+    import database
+
+    conn = database.connect(database_path or database.DATABASE_URL)
+    try:
+        return conn.execute(
+            "SELECT COUNT(*) FROM installments WHERE principal_amount + interest_amount != total_amount"
+        ).fetchone()[0]
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "check":
+        mismatched = check()
+        if mismatched:
+            print(f"❌ {mismatched} installments with principal + interest != total")
+            sys.exit(1)
+        print("✅ Every installment total is principal + interest")
+    else:
+        print(__doc__)
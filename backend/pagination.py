@@ -0,0 +1,95 @@
+"""
+Keyset (cursor) pagination for list endpoints.
+
+Without ``limit``/``cursor`` a list endpoint returns the whole collection as
+before. With them it returns one page and, when more rows follow, an opaque
+cursor in the ``X-Next-Cursor`` response header. The cursor encodes the sort
+key of the last row, and the next page is one index range seek from there
+(see ``KEYSET_LISTINGS`` in queries.py), so every page costs the same however
+deep the client scrolls.
+"""
+import base64
+import json
+import os
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, Query, Response
+
+import queries
+from projection import Projection, execute_projected
+
+DEFAULT_PAGE_SIZE = int(os.getenv("API_DEFAULT_PAGE_SIZE", "100"))
+MAX_PAGE_SIZE = int(os.getenv("API_MAX_PAGE_SIZE", "1000"))
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Shared query parameters of paginated list endpoints
+LimitParam = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size; omit for the full list")
+CursorParam = Query(None, alias="cursor", description=f"Value of the previous page's {NEXT_CURSOR_HEADER} header")
+
+
+def encode_cursor(values: list) -> str:
+    raw = json.dumps(values, separators=(",", ":"), ensure_ascii=False).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str, size: int) -> list:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, UnicodeDecodeError):
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def fetch_page(
+    cursor,
+    listing: str,
+    limit: Optional[int],
+    page_cursor: Optional[str],
+    projection: Optional[Projection] = None,
+    params: tuple = (),
+) -> Tuple[List, Optional[str]]:
+    """Rows of ``listing`` and the cursor of the next page (None on the last one).
+
+    Without ``limit``/``page_cursor`` every row is returned. ``params`` are
+    the values of the listing's ``where`` filter, if any.
+    """
+    if limit is None and page_cursor is None:
+        execute_projected(cursor, f"{listing}.list", params, projection)
+        return cursor.fetchall(), None
+
+    spec = queries.KEYSET_LISTINGS[listing]
+    size = limit or DEFAULT_PAGE_SIZE
+    # One extra row tells whether another page follows. The sort keys are
+    # always selected: the next cursor is built from them.
+    if page_cursor is None:
+        execute_projected(cursor, f"{listing}.page", (*params, size + 1), projection, spec.row_keys)
+    else:
+        after = decode_cursor(page_cursor, len(spec.keys))
+        execute_projected(cursor, f"{listing}.page_after", (*params, *after, size + 1), projection,
+                          spec.row_keys)
+    rows = cursor.fetchall()
+
+    if len(rows) <= size:
+        return rows, None
+    rows = rows[:size]
+    return rows, encode_cursor([rows[-1][key] for key in spec.row_keys])
+
+
+def fetch_list(
+    cursor,
+    listing: str,
+    response: Response,
+    limit: Optional[int],
+    page_cursor: Optional[str],
+    projection: Optional[Projection] = None,
+    params: tuple = (),
+) -> List:
+    """``fetch_page`` for a list endpoint: the next cursor goes in the X-Next-Cursor header"""
+    rows, next_cursor = fetch_page(cursor, listing, limit, page_cursor, projection, params)
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return rows
@@ -0,0 +1,194 @@
+"""
+Python port of the browser's ``calculateFinancialsFromData``
+(src/lib/profitCalculator.ts), used to check ``financials.compute_financials``
+against it: ``python financials.py check`` on a real database and
+benchmarks/bench_financials.py on generated ones.
+
+The port itself is checked against fixtures/financials_parity.json, the
+output of the TypeScript function on a seeded dataset (written by
+fixtures/financials_parity.mjs), as is compute_financials, so a change to
+either implementation that the other does not follow shows up there.
+
+``frontend_data`` reads the rows the Dashboard fetches (the list endpoints'
+statements) and ``reference`` follows the TypeScript line by line, except
+that sales are looked up in a set instead of ``sales.find``; the results are
+the same. Dates go through ``financials.instant`` on both sides, so the time
+zone of naive timestamps is not part of the comparison (see its docstring).
+"""
+import json
+import os
+import sqlite3
+from typing import List
+
+import queries
+import summaries
+from financials import compute_financials, instant
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "financials_parity.json")
+
+# Just the columns compute_financials and frontend_data read
+SCHEMA = """
+    CREATE TABLE partners (
+        id TEXT PRIMARY KEY, name TEXT, capital INTEGER, status TEXT, created_at TEXT, deleted_at TEXT
+    );
+    CREATE INDEX idx_partners_created ON partners(created_at);
+    CREATE TABLE sales (
+        id TEXT PRIMARY KEY, announced_price INTEGER, purchase_price INTEGER, down_payment INTEGER,
+        initial_profit INTEGER, sale_date TEXT
+    );
+    CREATE TABLE installments (
+        id TEXT PRIMARY KEY, sale_id TEXT, principal_amount INTEGER, interest_amount INTEGER,
+        total_amount INTEGER, due_date TEXT, paid_date TEXT, status TEXT
+    );
+"""
+FINANCIAL_SUMMARIES = ("sales_by_date", "paid_by_due_date")
+
+
+def database_from(partners, sales, installments) -> sqlite3.Connection:
+    """In-memory database with these partners, sales and installments rows (SCHEMA column order)"""
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    conn.executemany("INSERT INTO partners VALUES (?, ?, ?, ?, ?, ?)", partners)
+    conn.executemany("INSERT INTO sales VALUES (?, ?, ?, ?, ?, ?)", sales)
+    conn.executemany("INSERT INTO installments VALUES (?, ?, ?, ?, ?, ?, ?, ?)", installments)
+    # The per-date summary tables compute_financials reads
+    summaries.create_summaries(conn, FINANCIAL_SUMMARIES)
+    summaries.rebuild(conn, FINANCIAL_SUMMARIES)
+    conn.commit()
+    return conn
+
+
+def frontend_data(conn: sqlite3.Connection):
+    """What the Dashboard passes in: active partners, all sales/installments, all partners"""
+    def partner(row):
+        return {"id": row["id"], "name": row["name"], "capital": row["capital"],
+                "createdAt": row["created_at"], "deletedAt": row["deleted_at"]}
+    cursor = conn.cursor()
+    all_partners = [partner(row) for row in queries.execute(cursor, "partners.list_all").fetchall()]
+    active = [partner(row) for row in queries.execute(cursor, "partners.list_active").fetchall()]
+    sales = [{"id": row["id"], "saleDate": row["sale_date"], "purchasePrice": row["purchase_price"],
+              "initialProfit": row["initial_profit"]} for row in queries.execute(cursor, "sales.list").fetchall()]
+    installments = [{"saleId": row["sale_id"], "dueDate": row["due_date"], "status": row["status"],
+                     "principalAmount": row["principal_amount"], "interestAmount": row["interest_amount"]}
+                    for row in queries.execute(cursor, "installments.list").fetchall()]
+    return active, sales, installments, all_partners
+
+
+def _ge(a, b) -> bool:
+    """``new Date(a) >= new Date(b)``; Invalid Date compares false"""
+    a, b = instant(a), instant(b)
+    return a is not None and b is not None and a >= b
+
+
+def reference(partners, sales, all_installments, all_partners_including_inactive=None) -> dict:
+    """Port of calculateFinancialsFromData"""
+    partners_for_history = all_partners_including_inactive or partners
+
+    # reconstructPartnerHistory
+    important_dates = {p["createdAt"] for p in partners_for_history}
+    important_dates |= {p["deletedAt"] for p in partners_for_history if p["deletedAt"]}
+    important_dates |= {s["saleDate"] for s in sales}
+    important_dates |= {i["dueDate"] for i in all_installments}
+    partner_history = {}
+    for date_str in sorted(important_dates):
+        at = instant(date_str)
+        partner_history[date_str] = [
+            p for p in partners_for_history
+            if at is not None and instant(p["createdAt"]) is not None and instant(p["createdAt"]) <= at
+            and (not p["deletedAt"] or (instant(p["deletedAt"]) is not None and instant(p["deletedAt"]) > at))
+        ]
+    capital_at = {key: sum(p["capital"] for p in value) for key, value in partner_history.items()}
+
+    total_capital = sum(p["capital"] for p in partners)
+    total_purchase_price = sum(s["purchasePrice"] or 0 for s in sales)
+    paid_installments = [i for i in all_installments if i["status"] == "paid"]
+    total_paid_principal = sum(i["principalAmount"] or 0 for i in paid_installments)
+    total_used_capital = total_purchase_price - total_paid_principal
+    total_initial_profit = sum(s["initialProfit"] or 0 for s in sales)
+    total_monthly_profit = sum(i["interestAmount"] or 0 for i in paid_installments)
+
+    sale_ids = {s["id"] for s in sales}
+    partner_financials = []
+    for partner in partners:
+        join = partner["createdAt"]
+        sales_after_join = [s for s in sales if _ge(s["saleDate"], join)]
+        installments_after_join = [
+            i for i in paid_installments if i["saleId"] in sale_ids and _ge(i["dueDate"], join)
+        ]
+        initial_profit = monthly_profit = used = returned = 0.0
+        for sale in sales_after_join:
+            capital = capital_at.get(sale["saleDate"], 0)
+            if capital > 0:
+                share = partner["capital"] / capital
+                initial_profit += (sale["initialProfit"] or 0) * share
+                used += (sale["purchasePrice"] or 0) * share
+        for inst in installments_after_join:
+            capital = capital_at.get(inst["dueDate"], 0)
+            if capital > 0:
+                share = partner["capital"] / capital
+                monthly_profit += (inst["interestAmount"] or 0) * share
+                returned += (inst["principalAmount"] or 0) * share
+        used_capital = used - returned
+        partner_financials.append({
+            "partnerId": partner["id"],
+            "partnerName": partner["name"],
+            "initialCapital": partner["capital"],
+            "availableCapital": max(0, partner["capital"] - used_capital),
+            "usedCapital": used_capital,
+            "share": (partner["capital"] / total_capital if total_capital > 0 else 0) * 100,
+            "initialProfit": initial_profit,
+            "monthlyProfit": monthly_profit,
+            "totalProfit": initial_profit + monthly_profit,
+        })
+
+    return {
+        "totalCapital": total_capital,
+        "totalAvailableCapital": sum(p["availableCapital"] for p in partner_financials),
+        "totalUsedCapital": total_used_capital,
+        "totalInitialProfit": total_initial_profit,
+        "totalMonthlyProfit": total_monthly_profit,
+        "totalProfit": total_initial_profit + total_monthly_profit,
+        "partnerFinancials": partner_financials,
+    }
+
+
+def compare(server: dict, expected: dict) -> list:
+    """Differences beyond rounding to whole Tomans; each partner adds at most 1 to the total"""
+    problems = []
+    tolerance = {"totalAvailableCapital": len(expected["partnerFinancials"])}
+    for key, value in expected.items():
+        if key != "partnerFinancials" and abs(server[key] - value) > tolerance.get(key, 0.5):
+            problems.append(f"{key}: {server[key]} != {value}")
+    if [p["partnerId"] for p in server["partnerFinancials"]] != [p["partnerId"] for p in expected["partnerFinancials"]]:
+        problems.append("partner order differs")
+    for got, want in zip(server["partnerFinancials"], expected["partnerFinancials"]):
+        for key, value in want.items():
+            limit = 1e-9 if key == "share" else 1
+            if isinstance(value, str):
+                ok = got[key] == value
+            else:
+                ok = abs(got[key] - value) <= limit
+            if not ok:
+                problems.append(f"{want['partnerName']}.{key}: {got[key]} != {value}")
+    return problems
+
+
+def fixture_problems(path: str = FIXTURE) -> List[str]:
+    """Differences of compute_financials and of ``reference`` from the TypeScript output in the fixture"""
+    with open(path, encoding="utf-8") as file:
+        fixture = json.load(file)
+    data, expected = fixture["input"], fixture["output"]
+    conn = database_from(
+        [(p["id"], p["name"], p["capital"], p["status"], p["createdAt"], p["deletedAt"]) for p in data["allPartners"]],
+        [(s["id"], s["announcedPrice"], s["purchasePrice"], s["downPayment"], s["initialProfit"], s["saleDate"])
+         for s in data["sales"]],
+        [(i["id"], i["saleId"], i["principalAmount"], i["interestAmount"], i["totalAmount"], i["dueDate"],
+          i["paidDate"], i["status"]) for i in data["installments"]],
+    )
+    try:
+        problems = [f"server: {problem}" for problem in compare(compute_financials(conn.cursor()), expected)]
+        problems += [f"profit_reference: {problem}" for problem in compare(reference(*frontend_data(conn)), expected)]
+    finally:
+        conn.close()
+    return problems
@@ -0,0 +1,92 @@
+"""
+Sparse fieldsets: ``?fields=id,status,dueDate``.
+
+The requested fields are checked against the endpoint's response model
+(API names or column names; unknown fields are a 400), pushed down into the
+SQL as a column projection, and only those fields are serialized. Without
+``fields`` endpoints return full objects as before.
+"""
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple, Type
+
+from fastapi import HTTPException, Query, Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+import queries
+from serialization import json_response
+
+FieldsParam = Query(None, description="Comma-separated fields to return, e.g. `id,status,dueDate`")
+
+
+class Projection(NamedTuple):
+    """Requested API field names (in model order) and their model field names"""
+    fields: Tuple[str, ...]
+    names: Tuple[str, ...]
+
+    def columns(self, available: Sequence[str]) -> List[Tuple[str, str]]:
+        """(result column, API field) pairs for a statement with ``available`` columns"""
+        pairs = []
+        for field, name in zip(self.fields, self.names):
+            pairs.append((field if field in available else name, field))
+        return pairs
+
+
+def _field_names(model: Type[BaseModel]) -> Dict[str, Tuple[str, str]]:
+    """Accepted spelling -> (API field, model field name)"""
+    accepted = {}
+    for name, info in model.model_fields.items():
+        field = info.alias or name
+        accepted[name] = accepted[field] = (field, name)
+    return accepted
+
+
+def parse_fields(fields: Optional[str], model: Type[BaseModel]) -> Optional[Projection]:
+    """Projection for a ``fields`` query parameter, None for full objects"""
+    if fields is None:
+        return None
+    accepted = _field_names(model)
+    requested = [part.strip() for part in fields.split(",") if part.strip()]
+    unknown = [part for part in requested if part not in accepted]
+    if unknown or not requested:
+        allowed = ", ".join(info.alias or name for name, info in model.model_fields.items())
+        detail = f"Unknown fields: {', '.join(unknown)}" if unknown else "No fields requested"
+        raise HTTPException(status_code=400, detail=f"{detail}. Allowed: {allowed}")
+    chosen = {accepted[part][0] for part in requested}
+    pairs = [pair for pair in dict.fromkeys(accepted.values()) if pair[0] in chosen]
+    return Projection(tuple(field for field, _ in pairs), tuple(name for _, name in pairs))
+
+
+def select_columns(cursor, name: str, projection: Projection, extra: Sequence[str] = ()) -> List[str]:
+    """Result columns of statement ``name`` to read: the projection plus ``extra``"""
+    available = queries.statement_columns(cursor, name)
+    selected = [column for column, _ in projection.columns(available)]
+    return list(dict.fromkeys([*selected, *extra]))
+
+
+def execute_projected(cursor, name: str, params=(), projection: Optional[Projection] = None, extra: Sequence[str] = ()):
+    """``queries.execute`` with the projection (if any) pushed into the SELECT"""
+    columns = select_columns(cursor, name, projection, extra) if projection else None
+    return queries.execute(cursor, name, params, columns)
+
+
+def output_columns(description, model: Type[BaseModel]) -> List[Tuple[int, str]]:
+    """(column index, API field name) for the result columns the model exposes"""
+    aliases = {}
+    for name, field in model.model_fields.items():
+        aliases[name] = field.alias or name
+        aliases[field.alias or name] = field.alias or name
+    return [(index, aliases[column[0]]) for index, column in enumerate(description) if column[0] in aliases]
+
+
+def render(rows, projection: Projection) -> List[dict]:
+    """Projected rows as API dicts"""
+    if not rows:
+        return []
+    pairs = projection.columns(rows[0].keys())
+    return [{field: row[column] for column, field in pairs} for row in rows]
+
+
+def projected_response(content, response: Optional[Response] = None) -> JSONResponse:
+    """Serialize projected content directly (the full response model would
+    reject the missing fields), keeping headers set on ``response``"""
+    return json_response(content, response)
@@ -0,0 +1,530 @@
+"""
+Named, parameterized SQL statements used by the routers.
+
+Keeping every statement text in one place means each connection only ever
+compiles a fixed set of statements, which then stay in sqlite3's per-connection
+statement cache (DB_STATEMENT_CACHE_SIZE).
+
+Two kinds of statement text depend on the request, one text per distinct
+column set (built once, in a bounded LRU):
+
+- partial updates (``update``) set only the columns the client sent, so
+  ``AFTER UPDATE OF`` triggers and indexes on the other columns (summary
+  tables, UNIQUE imei) are left alone;
+- projections (``fields=``) wrap the statement as ``SELECT cols FROM (...)``.
+  This is a deliberate exception to the fixed set: every field combination
+  in use is its own statement and competes for the same per-connection
+  cache.
+"""
+import threading
+from functools import lru_cache
+from typing import Dict, Iterable, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+from database import DB_STATEMENT_CACHE_SIZE
+from migrations import SYNC_TABLES
+
+# Column-set dependent statement texts kept (partial updates, projections)
+VARIANT_STATEMENT_CACHE_SIZE = 256
+
+# Columns that PUT endpoints may change, in table order
+PARTIAL_UPDATE_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "partners": ("name", "capital", "available_capital", "initial_profit", "monthly_profit", "share"),
+    "phones": ("brand", "model", "imei", "purchase_price", "selling_price", "status", "purchase_date",
+               "color", "storage", "condition", "purchase_source", "notes"),
+    "customers": ("name", "phone", "national_id", "address"),
+    "sales": ("announced_price", "down_payment", "installment_months", "initial_profit", "sale_date", "status",
+              "profit_calculation_type", "custom_profit_rate", "total_profit"),
+    "installments": ("paid_date", "status"),
+    "investors": ("name", "phone", "national_id", "investment_amount", "profit_rate", "total_profit",
+                  "start_date", "status"),
+    "expenses": ("date", "type", "amount", "description"),
+    "users": ("full_name", "mobile", "password", "role", "partner_id", "is_active"),
+}
+
+
+INVESTOR_COLUMNS = """
+    id, name, phone, national_id as nationalId,
+    investment_amount as investmentAmount, profit_rate as profitRate,
+    total_profit as totalProfit, start_date as startDate,
+    status, created_at as createdAt
+"""
+
+INVESTOR_TRANSACTION_COLUMNS = "id, investor_id as investorId, type, amount, description, date"
+
+EXPENSE_COLUMNS = "id, date, type, amount, description, created_at as createdAt"
+
+USER_COLUMNS = "id, full_name, mobile, role, partner_id, is_active, created_at"
+
+QUERIES: Dict[str, str] = {
+    # Partners
+    "partners.list_active": "SELECT * FROM partners WHERE status = 'active' ORDER BY created_at DESC",
+    "partners.list_all": "SELECT * FROM partners ORDER BY created_at DESC",
+    "partners.get": "SELECT * FROM partners WHERE id = ?",
+    "partners.exists": "SELECT id FROM partners WHERE id = ?",
+    "partners.capitals": "SELECT id, capital FROM partners",
+    "partners.insert": """
+        INSERT INTO partners (id, name, capital, available_capital, initial_profit, monthly_profit, share, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """,
+    "partners.add_capital": """
+        UPDATE partners
+        SET capital = capital + ?,
+            available_capital = available_capital + ?
+        WHERE id = ?
+    """,
+    "partners.soft_delete": """
+        UPDATE partners
+        SET status = 'inactive', deleted_at = ?
+        WHERE id = ? AND status = 'active'
+    """,
+
+    # Partner capital timeline (capital_timeline.py)
+    "partner_history.record": """
+        INSERT INTO partner_history (id, partner_id, name, capital, available_capital, initial_profit,
+                                     monthly_profit, share, action, action_date, created_at)
+        SELECT ?, id, name, capital, available_capital, initial_profit, monthly_profit, share, ?, ?, ?
+        FROM partners WHERE id = ?
+    """,
+    "partner_history.timeline": """
+        SELECT partner_id, capital, action, action_date FROM partner_history ORDER BY action_date, rowid
+    """,
+
+    # Phones
+    "phones.list": "SELECT * FROM phones ORDER BY purchase_date DESC, id DESC",
+    "phones.get": "SELECT * FROM phones WHERE id = ?",
+    "phones.by_imei": "SELECT id FROM phones WHERE imei = ?",
+    "phones.insert": """
+        INSERT INTO phones (id, brand, model, imei, purchase_price, selling_price, status, purchase_date,
+                          color, storage, condition, purchase_source, notes)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """,
+    "phones.mark_sold": "UPDATE phones SET status = 'sold' WHERE id = ?",
+    "phones.delete": "DELETE FROM phones WHERE id = ?",
+
+    # Customers
+    "customers.list": "SELECT * FROM customers ORDER BY created_at DESC, id DESC",
+    "customers.get": "SELECT * FROM customers WHERE id = ?",
+    # Balances from the summary tables (summaries.py); zeros for a customer without sales
+    "customers.balance": """
+        SELECT c.id AS customer_id,
+            COALESCE(b.sale_count, 0) AS sale_count,
+            COALESCE(b.down_payments, 0) AS down_payments,
+            COALESCE(b.paid_total, 0) AS paid_installments,
+            COALESCE(b.down_payments + b.paid_total, 0) AS total_paid,
+            COALESCE(b.outstanding_total, 0) AS outstanding_balance
+        FROM customers c LEFT JOIN customer_balances b ON b.customer_id = c.id
+        WHERE c.id = ?
+    """,
+    "customers.insert": """
+        INSERT INTO customers (id, name, phone, national_id, address, created_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """,
+    "customers.delete": "DELETE FROM customers WHERE id = ?",
+
+    # Sales
+    "sales.list": "SELECT * FROM sales ORDER BY sale_date DESC, id DESC",
+    "sales.get": "SELECT * FROM sales WHERE id = ?",
+    "sales.insert": """
+        INSERT INTO sales (id, customer_id, phone_id, announced_price, purchase_price, down_payment,
+                         installment_months, monthly_interest_rate, initial_profit, sale_date, status)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'active')
+    """,
+    "sales.delete": "DELETE FROM sales WHERE id = ?",
+
+    # Installments
+    "installments.list": "SELECT * FROM installments ORDER BY due_date ASC, id ASC",
+    "installments.by_sale": "SELECT * FROM installments WHERE sale_id = ? ORDER BY installment_number ASC",
+    # Paid installments per month collected (summaries.collections_by_day)
+    "installments.collections_by_month": """
+        SELECT substr(day, 1, 7) AS month, SUM(count) AS count,
+            SUM(principal) AS principal, SUM(interest) AS interest, SUM(total) AS total
+        FROM collections_by_day
+        WHERE day >= ? AND day < ?
+        GROUP BY month
+        ORDER BY month
+    """,
+    "installments.get": "SELECT * FROM installments WHERE id = ?",
+    "installments.insert": """
+        INSERT INTO installments (id, sale_id, installment_number, principal_amount, interest_amount,
+                                total_amount, remaining_debt, due_date, status)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'pending')
+    """,
+    "installments.delete": "DELETE FROM installments WHERE id = ?",
+
+    # Partner transactions
+    "transactions.list": "SELECT * FROM transactions ORDER BY date DESC, id DESC",
+    "transactions.by_partner": "SELECT * FROM transactions WHERE partner_id = ? ORDER BY date DESC",
+    "transactions.totals_by_partner": "SELECT type, count, total FROM partner_transaction_totals WHERE partner_id = ?",
+    "transactions.get": "SELECT * FROM transactions WHERE id = ?",
+    "transactions.insert": """
+        INSERT INTO transactions (id, partner_id, type, amount, description, profit_type, date)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """,
+    "transactions.delete": "DELETE FROM transactions WHERE id = ?",
+
+    # Investors
+    "investors.list": f"SELECT {INVESTOR_COLUMNS} FROM investors ORDER BY created_at DESC",
+    "investors.get": f"SELECT {INVESTOR_COLUMNS} FROM investors WHERE id = ?",
+    "investors.amount": "SELECT investment_amount FROM investors WHERE id = ?",
+    "investors.insert": """
+        INSERT INTO investors (
+            id, name, phone, national_id, investment_amount, profit_rate,
+            total_profit, start_date, status, created_at
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """,
+    "investors.set_amount": "UPDATE investors SET investment_amount = ? WHERE id = ?",
+    "investors.delete": "DELETE FROM investors WHERE id = ?",
+
+    # Investor transactions
+    "investor_transactions.list": f"""
+        SELECT {INVESTOR_TRANSACTION_COLUMNS}
+        FROM investor_transactions
+        ORDER BY date DESC, id DESC
+    """,
+    "investor_transactions.by_investor": f"""
+        SELECT {INVESTOR_TRANSACTION_COLUMNS}
+        FROM investor_transactions
+        WHERE investor_id = ?
+        ORDER BY date DESC
+    """,
+    "investor_transactions.insert": """
+        INSERT INTO investor_transactions (
+            id, investor_id, type, amount, description, date
+        ) VALUES (?, ?, ?, ?, ?, ?)
+    """,
+    "investor_transactions.delete_by_investor": "DELETE FROM investor_transactions WHERE investor_id = ?",
+    "investor_transactions.totals_by_investor": """
+        SELECT type, count, total FROM investor_transaction_totals WHERE investor_id = ?
+    """,
+
+    # Expenses
+    "expenses.list": f"SELECT {EXPENSE_COLUMNS} FROM expenses ORDER BY date DESC, created_at DESC, id DESC",
+    "expenses.get": f"SELECT {EXPENSE_COLUMNS} FROM expenses WHERE id = ?",
+    "expenses.insert": """
+        INSERT INTO expenses (id, date, type, amount, description, created_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """,
+    "expenses.delete": "DELETE FROM expenses WHERE id = ?",
+
+    # Users
+    "users.list": f"SELECT {USER_COLUMNS} FROM users ORDER BY created_at DESC",
+    "users.get": f"SELECT {USER_COLUMNS} FROM users WHERE id = ?",
+    "users.role": "SELECT role FROM users WHERE id = ?",
+    "users.login": """
+        SELECT id, full_name, mobile, password, role, partner_id, is_active, created_at
+        FROM users
+        WHERE mobile = ?
+    """,
+    "users.by_mobile": "SELECT id FROM users WHERE mobile = ?",
+    "users.by_mobile_other": "SELECT id FROM users WHERE mobile = ? AND id != ?",
+    "users.admin_count": "SELECT COUNT(*) as count FROM users WHERE role = 'admin'",
+    "users.insert": """
+        INSERT INTO users (id, full_name, mobile, password, role, partner_id, is_active, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, 1, ?)
+    """,
+    "users.delete": "DELETE FROM users WHERE id = ?",
+
+    # Custom phone models
+    "phone_models.list": "SELECT * FROM custom_phone_models ORDER BY brand, model",
+    "phone_models.by_brand": "SELECT model FROM custom_phone_models WHERE brand = ? ORDER BY model",
+    "phone_models.find": "SELECT id FROM custom_phone_models WHERE brand = ? AND model = ?",
+    "phone_models.get": "SELECT * FROM custom_phone_models WHERE id = ?",
+    "phone_models.insert": """
+        INSERT INTO custom_phone_models (id, brand, model, created_at)
+        VALUES (?, ?, ?, ?)
+    """,
+    "phone_models.delete": "DELETE FROM custom_phone_models WHERE id = ?",
+
+    # Partner financials (financials.py): every partner, newest first, and
+    # sales / paid installments summed per date (summaries.py) in date order
+    "financials.partners": """
+        SELECT id, name, capital, status, created_at, deleted_at FROM partners ORDER BY created_at DESC
+    """,
+    "financials.sales_by_date": """
+        SELECT sale_date, initial_profit, purchase_total AS purchase_price FROM sales_by_date ORDER BY sale_date
+    """,
+    # Installments whose sale was deleted still count in the totals but are
+    # not attributed to partners (profitCalculator.ts skips them too)
+    "financials.paid_by_due_date": """
+        SELECT due_date, interest, principal, attributed_interest, attributed_principal
+        FROM paid_by_due_date
+        ORDER BY due_date
+    """,
+
+    # Dashboard summary (routers/dashboard.py): totals of the small tables
+    # and of the per-date / per-status summary tables in one statement, plus
+    # the pending installments already past due
+    "dashboard.totals": """
+        SELECT *
+        FROM (SELECT COALESCE(SUM(count), 0) AS sale_count, COALESCE(SUM(revenue), 0) AS revenue,
+                  COALESCE(SUM(purchase_total), 0) AS purchase_total, COALESCE(SUM(initial_profit), 0) AS initial_profit
+              FROM sales_by_date),
+             (SELECT COUNT(*) AS customer_count FROM customers),
+             (SELECT COALESCE(SUM(capital), 0) AS partners_capital FROM partners WHERE status = 'active'),
+             (SELECT COALESCE(SUM(investment_amount), 0) AS investors_capital FROM investors),
+             (SELECT COALESCE(SUM(total), 0) AS investors_profit_paid
+              FROM investor_transaction_totals WHERE type = 'profit_payment'),
+             (SELECT COALESCE(SUM(amount), 0) AS expenses_total FROM expenses)
+    """,
+    "dashboard.installments_by_status": """
+        SELECT status, count, principal, interest, total FROM installment_totals
+    """,
+    "dashboard.past_due": """
+        SELECT COUNT(*) AS count, COALESCE(SUM(total_amount), 0) AS total
+        FROM installments
+        WHERE status = 'pending' AND due_date < ?
+    """,
+
+    # Rollups by Jalali month (routers/reports.py): per-day rows (summary
+    # tables, expenses) joined to the calendar table (jalali.py) and grouped
+    # on its columns; parameters are the [from, to] date range. CROSS JOIN
+    # keeps the dated rows outer, one calendar lookup each
+    "jalali_months.sales": """
+        SELECT c.jalali_year AS year, c.jalali_month AS month, SUM(s.count) AS count,
+            SUM(s.revenue) AS revenue, SUM(s.purchase_total) AS purchase_total,
+            SUM(s.initial_profit) AS initial_profit, SUM(s.down_payments) AS down_payments
+        FROM sales_by_date s CROSS JOIN calendar c ON c.day = substr(s.sale_date, 1, 10)
+        WHERE s.sale_date >= ? AND s.sale_date < ?
+        GROUP BY c.jalali_year, c.jalali_month
+        ORDER BY c.jalali_year, c.jalali_month
+    """,
+    "jalali_months.collections": """
+        SELECT c.jalali_year AS year, c.jalali_month AS month, SUM(k.count) AS count,
+            SUM(k.principal) AS principal, SUM(k.interest) AS interest, SUM(k.total) AS total
+        FROM collections_by_day k CROSS JOIN calendar c ON c.day = k.day
+        WHERE k.day >= ? AND k.day < ?
+        GROUP BY c.jalali_year, c.jalali_month
+        ORDER BY c.jalali_year, c.jalali_month
+    """,
+    # Interest of paid installments by month due, like monthly profit in
+    # financials.py
+    "jalali_months.interest": """
+        SELECT c.jalali_year AS year, c.jalali_month AS month, SUM(p.count) AS count,
+            SUM(p.interest) AS interest
+        FROM paid_by_due_date p CROSS JOIN calendar c ON c.day = substr(p.due_date, 1, 10)
+        WHERE p.due_date >= ? AND p.due_date < ?
+        GROUP BY c.jalali_year, c.jalali_month
+        ORDER BY c.jalali_year, c.jalali_month
+    """,
+    "jalali_months.expenses": """
+        SELECT c.jalali_year AS year, c.jalali_month AS month, COUNT(*) AS count, SUM(e.amount) AS total
+        FROM expenses e CROSS JOIN calendar c ON c.day = substr(e.date, 1, 10)
+        WHERE e.date >= ? AND e.date < ?
+        GROUP BY c.jalali_year, c.jalali_month
+        ORDER BY c.jalali_year, c.jalali_month
+    """,
+
+    # Per-table change counters (maintained by triggers)
+    "table_versions.get": "SELECT version, updated_at FROM table_versions WHERE table_name = ?",
+
+    # Delta sync
+    "sync_clock.get": "SELECT seq FROM sync_clock WHERE id = 1",
+    "tombstones.since": """
+        SELECT seq, table_name, row_id, deleted_at
+        FROM tombstones
+        WHERE seq > ? AND seq <= ?
+        ORDER BY seq
+        LIMIT ?
+    """,
+}
+
+# Rows changed in a sync window: "<table>.changed_since"
+for _table in SYNC_TABLES:
+    QUERIES[f"{_table}.changed_since"] = (
+        f"SELECT * FROM {_table} WHERE change_seq > ? AND change_seq <= ? ORDER BY change_seq LIMIT ?"
+    )
+
+class KeysetListing(NamedTuple):
+    """A list endpoint that can be read page by page.
+
+    ``keys`` are the sort columns (unique together, ``id`` last) and
+    ``row_keys`` the names they have in the selected row. ``where`` is an
+    optional filter; its parameters come before the cursor's.
+    """
+    select: str
+    keys: Tuple[str, ...]
+    row_keys: Tuple[str, ...]
+    descending: bool
+    where: str = ""
+
+
+KEYSET_LISTINGS: Dict[str, KeysetListing] = {
+    "sales": KeysetListing("SELECT * FROM sales", ("sale_date", "id"), ("sale_date", "id"), True),
+    "installments": KeysetListing("SELECT * FROM installments", ("due_date", "id"), ("due_date", "id"), False),
+    "transactions": KeysetListing("SELECT * FROM transactions", ("date", "id"), ("date", "id"), True),
+    "customers": KeysetListing("SELECT * FROM customers", ("created_at", "id"), ("created_at", "id"), True),
+    "phones": KeysetListing("SELECT * FROM phones", ("purchase_date", "id"), ("purchase_date", "id"), True),
+    "expenses": KeysetListing(
+        f"SELECT {EXPENSE_COLUMNS} FROM expenses",
+        ("date", "created_at", "id"), ("date", "createdAt", "id"), True,
+    ),
+    "investor_transactions": KeysetListing(
+        f"SELECT {INVESTOR_TRANSACTION_COLUMNS} FROM investor_transactions",
+        ("date", "id"), ("date", "id"), True,
+    ),
+}
+
+# Expense filters of GET /api/expenses and /api/expenses/summary, with the
+# ``>= ? AND < ?`` bounds of routers.expenses.date_bounds: unset bounds are
+# "" / "\uffff" and "to" gets the sentinel appended, so the statement text
+# never changes and the date range is always an index range.
+EXPENSE_FILTERS: Dict[str, str] = {
+    "expenses_by_date": "date >= ? AND date < ?",
+    "expenses_by_type": "type = ? AND date >= ? AND date < ?",
+}
+
+for _name, _where in EXPENSE_FILTERS.items():
+    KEYSET_LISTINGS[_name] = KEYSET_LISTINGS["expenses"]._replace(where=_where)
+    QUERIES[f"{_name}.total"] = (
+        f"SELECT COUNT(*) AS count, COALESCE(SUM(amount), 0) AS total FROM expenses WHERE {_where}"
+    )
+    QUERIES[f"{_name}.totals_by_type"] = (
+        f"SELECT type, COUNT(*) AS count, SUM(amount) AS total FROM expenses WHERE {_where} "
+        f"GROUP BY type ORDER BY type"
+    )
+    QUERIES[f"{_name}.totals_by_month"] = (
+        f"SELECT substr(date, 1, 7) AS month, COUNT(*) AS count, SUM(amount) AS total FROM expenses "
+        f"WHERE {_where} GROUP BY month ORDER BY month"
+    )
+
+# Sales with customer, phone and repayment progress (GET /api/sales/enriched):
+# sales are read in (sale_date, id) order and each one is joined to its
+# sale_balances row (summaries.py, no GROUP BY over installments); the next
+# due date is one seek on idx_installments_sale_number, so a page costs a
+# few index lookups per sale whatever the size of the installments table
+SALE_ENRICHED_SELECT = """
+    SELECT s.*,
+        c.name AS customer_name,
+        p.brand AS phone_brand, p.model AS phone_model, p.imei AS phone_imei,
+        COALESCE(b.installment_count, 0) AS installment_count,
+        COALESCE(b.paid_count, 0) AS paid_installments,
+        COALESCE(b.installment_count - b.paid_count, 0) AS remaining_installments,
+        s.down_payment + COALESCE(b.paid_total, 0) AS paid_amount,
+        COALESCE(b.outstanding_total, 0) AS outstanding_balance,
+        (SELECT MIN(due_date) FROM installments WHERE sale_id = s.id AND status != 'paid') AS next_due_date
+    FROM sales s
+    LEFT JOIN customers c ON c.id = s.customer_id
+    LEFT JOIN phones p ON p.id = s.phone_id
+    LEFT JOIN sale_balances b ON b.sale_id = s.id
+"""
+
+KEYSET_LISTINGS["sales_enriched"] = KeysetListing(SALE_ENRICHED_SELECT, ("s.sale_date", "s.id"), ("sale_date", "id"), True)
+KEYSET_LISTINGS["sales_enriched_by_status"] = KEYSET_LISTINGS["sales_enriched"]._replace(where="s.status = ?")
+
+
+def _keyset_sql(listing: KeysetListing, after: bool, limit: bool = True) -> str:
+    direction = "DESC" if listing.descending else "ASC"
+    order = ", ".join(f"{key} {direction}" for key in listing.keys)
+    conditions = [listing.where] if listing.where else []
+    if after:
+        # Row-value comparison: one index range seek on the composite sort index
+        keys = ", ".join(listing.keys)
+        marks = ", ".join("?" for _ in listing.keys)
+        conditions.append(f"({keys}) {'<' if listing.descending else '>'} ({marks})")
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    return f"{listing.select.strip()}{where} ORDER BY {order}{' LIMIT ?' if limit else ''}"
+
+
+# Keyset pages: "<listing>.page" (first page) and "<listing>.page_after";
+# listings without a hand-written "<listing>.list" get a generated one
+for _name, _listing in KEYSET_LISTINGS.items():
+    QUERIES[f"{_name}.page"] = _keyset_sql(_listing, after=False)
+    QUERIES[f"{_name}.page_after"] = _keyset_sql(_listing, after=True)
+    QUERIES.setdefault(f"{_name}.list", _keyset_sql(_listing, after=False, limit=False))
+
+
+# ---------------------------------------------------------------------------
+# Statement-cache accounting
+# ---------------------------------------------------------------------------
+
+_stats_lock = threading.Lock()
+_hits = 0
+_misses = 0
+
+
+def _track(conn, sql: str) -> None:
+    """Mirror sqlite3's per-connection LRU to count statement-cache hits/misses"""
+    global _hits, _misses
+    seen = getattr(conn, "seen_statements", None)
+    if seen is None:
+        return
+    if sql in seen:
+        seen.move_to_end(sql)
+        hit = True
+    else:
+        seen[sql] = None
+        if len(seen) > DB_STATEMENT_CACHE_SIZE:
+            seen.popitem(last=False)
+        hit = False
+    with _stats_lock:
+        if hit:
+            _hits += 1
+        else:
+            _misses += 1
+
+
+@lru_cache(maxsize=VARIANT_STATEMENT_CACHE_SIZE)
+def _projected_sql(name: str, columns: Tuple[str, ...]) -> str:
+    return f"SELECT {', '.join(columns)} FROM ({QUERIES[name]})"
+
+
+def execute(cursor, name: str, params: Iterable = (), columns: Optional[Sequence[str]] = None):
+    """Execute the registered statement ``name`` on ``cursor``.
+
+    ``columns`` (names from ``statement_columns``) projects a SELECT down to
+    those result columns; SQLite flattens the wrapper, so only they are read.
+    """
+    sql = QUERIES[name] if columns is None else _projected_sql(name, tuple(columns))
+    _track(cursor.connection, sql)
+    return cursor.execute(sql, tuple(params))
+
+
+# Partial-update statements, built on first use per (table, column set)
+@lru_cache(maxsize=VARIANT_STATEMENT_CACHE_SIZE)
+def _update_sql(table: str, columns: Tuple[str, ...]) -> str:
+    assignments = ", ".join(f"{column} = ?" for column in columns)
+    return f"UPDATE {table} SET {assignments} WHERE id = ?"
+
+
+def update(cursor, table: str, values: Mapping[str, object], row_id: str):
+    """Set the columns present in ``values`` (``None`` sets NULL) of row ``row_id``.
+
+    Only those columns are in the SET list, in table order, so each column
+    set has one statement text.
+    """
+    allowed = PARTIAL_UPDATE_COLUMNS[table]
+    unknown = set(values) - set(allowed)
+    if unknown:
+        raise ValueError(f"Cannot update {table} columns: {', '.join(sorted(unknown))}")
+    columns = tuple(column for column in allowed if column in values)
+    if not columns:
+        raise ValueError(f"No {table} columns to update")
+    sql = _update_sql(table, columns)
+    _track(cursor.connection, sql)
+    return cursor.execute(sql, (*(values[column] for column in columns), row_id))
+
+
+_statement_columns: Dict[str, Tuple[str, ...]] = {}
+
+
+def statement_columns(cursor, name: str) -> Tuple[str, ...]:
+    """Result column names of the registered SELECT ``name``"""
+    columns = _statement_columns.get(name)
+    if columns is None:
+        sql = QUERIES[name]
+        cursor.execute(f"SELECT * FROM ({sql}) LIMIT 0", (None,) * sql.count("?"))
+        columns = tuple(column[0] for column in cursor.description)
+        _statement_columns[name] = columns
+    return columns
+
+
+def get_statement_cache_stats() -> dict:
+    with _stats_lock:
+        total = _hits + _misses
+        return {
+            "cache_size": DB_STATEMENT_CACHE_SIZE,
+            "registered_statements": len(QUERIES),
+            "hits": _hits,
+            "misses": _misses,
+            "hit_ratio": round(_hits / total, 4) if total else 0.0,
+        }
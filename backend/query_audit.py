@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+EXPLAIN QUERY PLAN audit of every statement in the query registry.
+
+Flags full table scans (``SCAN <table>`` without an index) and temp B-tree
+sorts (``USE TEMP B-TREE``). Statements that read a whole table on purpose
+are listed in EXPECTED_SCANS, grouped aggregates over a range in
+EXPECTED_GROUP_SORTS. Exits with status 1 when something is flagged,
+so it can run in CI after adding a query.
+
+Usage:
+    python query_audit.py          # flagged statements only
+    python query_audit.py --all    # plan of every statement
+"""
+import re
+import sys
+from typing import Dict, List, Tuple
+
+import database
+import migrations
+import queries
+
+# Statements that need every row regardless of indexes
+EXPECTED_SCANS = {
+    "partners.capitals",  # capital split across all partners
+    "dashboard.totals",  # whole-table totals of small tables
+    # Summary tables (summaries.py) read whole: one row per date or status
+    "dashboard.installments_by_status",
+    "financials.sales_by_date",
+    "financials.paid_by_due_date",
+}
+
+# Aggregates that group an index range by something the index is not
+# ordered by; only the rows in the range go through the sorter
+EXPECTED_GROUP_SORTS = {
+    "expenses_by_date.totals_by_type",
+    "expenses_by_date.totals_by_month",
+    "expenses_by_type.totals_by_month",
+    "installments.collections_by_month",
+    # Dated rows in a range grouped by Jalali month (calendar table)
+    "jalali_months.sales",
+    "jalali_months.collections",
+    "jalali_months.interest",
+    "jalali_months.expenses",
+}
+
+_FULL_SCAN = re.compile(r"^SCAN \w+$")
+
+
+def explain(conn, sql: str) -> List[str]:
+    """Plan lines of ``sql`` (every parameter bound to NULL)"""
+    params = (None,) * sql.count("?")
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()]
+
+
+def problems(name: str, plan: List[str]) -> List[str]:
+    found = []
+    for line in plan:
+        if _FULL_SCAN.match(line) and name not in EXPECTED_SCANS:
+            found.append(f"full scan: {line}")
+        elif "USE TEMP B-TREE FOR GROUP BY" in line and name in EXPECTED_GROUP_SORTS:
+            continue
+        elif "USE TEMP B-TREE" in line:
+            found.append(f"temp sort: {line}")
+    return found
+
+
+def audit(database_path: str = None) -> Dict[str, Tuple[List[str], List[str]]]:
+    """{statement name: (plan lines, problems)} for the whole registry"""
+    conn = database.connect(database_path or database.DATABASE_URL)
+    try:
+        version = migrations.current_version(conn)
+        if version < migrations.latest_version():
+            raise SystemExit(
+                f"Schema is at version {version}, latest is {migrations.latest_version()}: "
+                f"run `python migrations.py` first"
+            )
+        report = {}
+        for name, sql in queries.QUERIES.items():
+            plan = explain(conn, sql)
+            report[name] = (plan, problems(name, plan))
+        return report
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    show_all = "--all" in sys.argv[1:]
+    report = audit()
+    flagged = 0
+    for name, (plan, found) in report.items():
+        if found:
+            flagged += 1
+        if not (found or show_all):
+            continue
+        print(f"{'⚠️ ' if found else '✅'} {name}")
+        for line in plan:
+            print(f"      {line}")
+        for problem in found:
+            print(f"      -> {problem}")
+    print(f"\n{len(report)} statements, {flagged} flagged")
+    sys.exit(1 if flagged else 0)
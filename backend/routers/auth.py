@@ -3,7 +3,9 @@ import uuid
 import bcrypt
 from datetime import datetime
 
-from database import get_db
+from database import get_read_db
+from db_executor import db_task
+import queries
 from models import User, UserLogin
 
 router = APIRouter()
@@ -19,18 +21,15 @@ def verify_password(password: str, hashed_password: str) -> bool:
 # Register endpoint removed - only admin can create users
 
 @router.post("/login", response_model=User)
+@db_task
 def login(credentials: UserLogin):
     """Login user"""
     if not credentials.mobile or not credentials.password:
         raise HTTPException(status_code=400, detail="لطفاً شماره موبایل و رمز عبور را وارد کنید")
     
-    with get_db() as conn:
+    with get_read_db() as conn:
         cursor = conn.cursor()
-        cursor.execute("""
-            SELECT id, full_name, mobile, password, role, partner_id, is_active, created_at
-            FROM users
-            WHERE mobile = ?
-        """, (credentials.mobile,))
+        queries.execute(cursor, "users.login", (credentials.mobile,))
         
         row = cursor.fetchone()
         if not row:
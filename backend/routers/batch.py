@@ -0,0 +1,154 @@
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, Type
+import os
+
+from database import get_read_db
+from db_executor import db_task
+from financials import compute_financials
+from pagination import MAX_PAGE_SIZE, fetch_page
+from projection import execute_projected, parse_fields
+from serialization import json_response, rows_to_api
+from models import (
+    Customer, Expense, Installment, Investor, InvestorTransaction, JalaliCollectionsMonth, JalaliExpensesMonth,
+    JalaliInterestMonth, JalaliSalesMonth, Partner, Phone, Sale, SaleEnriched, Transaction,
+)
+from routers.dashboard import dashboard_summary
+from routers.expenses import DATE_PATTERN, expense_listing, expense_summary
+from routers.phone_models import CustomPhoneModel
+from routers.reports import jalali_rollup
+from routers.sales import sales_enriched_listing
+
+BATCH_MAX_QUERIES = int(os.getenv("BATCH_MAX_QUERIES", "20"))
+
+class BatchQuery(BaseModel):
+    resource: str
+    key: Optional[str] = Field(None, description="Name of this result in the response; defaults to `resource`")
+    limit: Optional[int] = Field(None, ge=1, le=MAX_PAGE_SIZE)
+    cursor: Optional[str] = None
+    fields: Optional[str] = None
+    status: Optional[str] = None
+    date_from: Optional[str] = Field(None, alias="from", pattern=DATE_PATTERN)
+    date_to: Optional[str] = Field(None, alias="to", pattern=DATE_PATTERN)
+    type: Optional[str] = None
+
+    model_config = ConfigDict(populate_by_name=True)
+
+    def filters(self) -> Dict[str, str]:
+        values = {"status": self.status, "from": self.date_from, "to": self.date_to, "type": self.type}
+        return {name: value for name, value in values.items() if value is not None}
+
+class BatchRequest(BaseModel):
+    queries: List[BatchQuery] = Field(..., min_length=1, max_length=BATCH_MAX_QUERIES)
+
+class BatchResource(NamedTuple):
+    """A readable resource: ``read(cursor, query)`` returns its result"""
+    read: Callable[..., dict]
+    filters: Tuple[str, ...] = ()
+    paginated: bool = False
+    # Accepts ``fields`` (row lists of a response model)
+    projected: bool = False
+
+def _keyset(model: Type[BaseModel], listing_for: Callable[[BatchQuery], Tuple[str, tuple]]) -> Callable[..., dict]:
+    def read(cursor, query: BatchQuery) -> dict:
+        projection = parse_fields(query.fields, model)
+        listing, params = listing_for(query)
+        rows, next_cursor = fetch_page(cursor, listing, query.limit, query.cursor, projection, params)
+        return {"data": rows_to_api(rows, model, projection.fields if projection else None), "nextCursor": next_cursor}
+    return read
+
+def _statement(model: Type[BaseModel], name: str) -> Callable[..., dict]:
+    def read(cursor, query: BatchQuery) -> dict:
+        projection = parse_fields(query.fields, model)
+        execute_projected(cursor, name, (), projection)
+        return {"data": rows_to_api(cursor.fetchall(), model, projection.fields if projection else None)}
+    return read
+
+def _jalali_months(model: Type[BaseModel], name: str) -> Callable[..., dict]:
+    def read(cursor, query: BatchQuery) -> dict:
+        return {"data": rows_to_api(jalali_rollup(cursor, name, query.date_from, query.date_to), model)}
+    return read
+
+def _listing(name: str) -> Callable[[BatchQuery], Tuple[str, tuple]]:
+    return lambda query: (name, ())
+
+# Resource name -> how to read it; names match the frontend stores
+RESOURCES: Dict[str, BatchResource] = {
+    "partners": BatchResource(_statement(Partner, "partners.list_active"), projected=True),
+    "partnersAll": BatchResource(_statement(Partner, "partners.list_all"), projected=True),
+    "phones": BatchResource(_keyset(Phone, _listing("phones")), paginated=True, projected=True),
+    "customers": BatchResource(_keyset(Customer, _listing("customers")), paginated=True, projected=True),
+    "sales": BatchResource(_keyset(Sale, _listing("sales")), paginated=True, projected=True),
+    "salesEnriched": BatchResource(
+        _keyset(SaleEnriched, lambda query: sales_enriched_listing(query.status)), ("status",),
+        paginated=True, projected=True,
+    ),
+    "installments": BatchResource(_keyset(Installment, _listing("installments")), paginated=True, projected=True),
+    "transactions": BatchResource(_keyset(Transaction, _listing("transactions")), paginated=True, projected=True),
+    "investors": BatchResource(_statement(Investor, "investors.list"), projected=True),
+    "investorTransactions": BatchResource(
+        _keyset(InvestorTransaction, _listing("investor_transactions")), paginated=True, projected=True,
+    ),
+    "expenses": BatchResource(
+        _keyset(Expense, lambda query: expense_listing(query.date_from, query.date_to, query.type)),
+        ("from", "to", "type"), paginated=True, projected=True,
+    ),
+    "expensesSummary": BatchResource(
+        lambda cursor, query: {"data": expense_summary(cursor, query.date_from, query.date_to, query.type)},
+        ("from", "to", "type"),
+    ),
+    "phoneModels": BatchResource(_statement(CustomPhoneModel, "phone_models.list"), projected=True),
+    "financials": BatchResource(lambda cursor, query: {"data": compute_financials(cursor)}),
+    "dashboardSummary": BatchResource(lambda cursor, query: {"data": dashboard_summary(cursor)}),
+    "jalaliSales": BatchResource(_jalali_months(JalaliSalesMonth, "sales"), ("from", "to")),
+    "jalaliCollections": BatchResource(_jalali_months(JalaliCollectionsMonth, "collections"), ("from", "to")),
+    "jalaliInterest": BatchResource(_jalali_months(JalaliInterestMonth, "interest"), ("from", "to")),
+    "jalaliExpenses": BatchResource(_jalali_months(JalaliExpensesMonth, "expenses"), ("from", "to")),
+}
+
+router = APIRouter()
+
+def _check(index: int, query: BatchQuery) -> BatchResource:
+    """Resource of a query, or a 400 naming the offending query"""
+    resource = RESOURCES.get(query.resource)
+    if resource is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"queries[{index}]: unknown resource '{query.resource}'. Allowed: {', '.join(RESOURCES)}",
+        )
+    unsupported = [name for name in query.filters() if name not in resource.filters]
+    if unsupported:
+        raise HTTPException(
+            status_code=400,
+            detail=f"queries[{index}]: '{query.resource}' does not filter by {', '.join(unsupported)}",
+        )
+    if not resource.paginated and (query.limit is not None or query.cursor is not None):
+        raise HTTPException(status_code=400, detail=f"queries[{index}]: '{query.resource}' is not paginated")
+    if not resource.projected and query.fields is not None:
+        raise HTTPException(status_code=400, detail=f"queries[{index}]: '{query.resource}' does not accept fields")
+    return resource
+
+@router.post("/")
+@db_task(executor="reports")
+def batch(body: BatchRequest):
+    """Run several reads in one request, on one connection and one read snapshot.
+
+    Each query names a resource (a list endpoint, with its usual `limit`,
+    `cursor`, `fields` and filters); results are returned under the query's
+    `key` as `{"data": ..., "nextCursor": ...}`. All of them see the same
+    committed state.
+    """
+    checked = []
+    for index, query in enumerate(body.queries):
+        checked.append((query.key or query.resource, _check(index, query), query))
+    keys = [key for key, _, _ in checked]
+    duplicates = sorted({key for key in keys if keys.count(key) > 1})
+    if duplicates:
+        raise HTTPException(status_code=400, detail=f"Duplicate keys: {', '.join(duplicates)}; set `key` to tell them apart")
+
+    results = {}
+    with get_read_db() as conn:
+        cursor = conn.cursor()
+        for key, resource, query in checked:
+            results[key] = resource.read(cursor, query)
+    return json_response({"results": results})
@@ -1,62 +1,89 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
-import uuid
+from fastapi import APIRouter, HTTPException, Request, Response
+from typing import List, Optional
 from datetime import datetime
 
-from database import get_db
-from models import Customer, CustomerCreate, CustomerUpdate
+from conditional import conditional_response
+from database import get_read_db, get_write_db
+from db_executor import db_task
+from ids import new_id
+from pagination import CursorParam, LimitParam, fetch_list
+from projection import FieldsParam, parse_fields
+from streaming import stream_format, stream_list
+from serialization import json_rows
+import queries
+from models import Customer, CustomerBalance, CustomerCreate, CustomerUpdate
 
 router = APIRouter()
 
 @router.get("/", response_model=List[Customer])
-def get_customers():
-    with get_db() as conn:
+@db_task(executor="reports")
+def get_customers(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = LimitParam,
+    page_cursor: Optional[str] = CursorParam,
+    fields: Optional[str] = FieldsParam,
+):
+    projection = parse_fields(fields, Customer)
+    media_type = stream_format(request)
+    if media_type:
+        return stream_list("customers", Customer, media_type, projection)
+    with get_read_db() as conn:
         cursor = conn.cursor()
-        cursor.execute("SELECT * FROM customers ORDER BY created_at DESC")
-        return [dict(row) for row in cursor.fetchall()]
+        not_modified = conditional_response(request, response, cursor, "customers")
+        if not_modified:
+            return not_modified
+        rows = fetch_list(cursor, "customers", response, limit, page_cursor, projection)
+        return json_rows(rows, Customer, response, fields=projection.fields if projection else None)
 
 @router.post("/", response_model=Customer)
+@db_task(executor="writer")
 def create_customer(customer: CustomerCreate):
-    with get_db() as conn:
+    with get_write_db() as conn:
         cursor = conn.cursor()
-        customer_id = str(uuid.uuid4())
+        customer_id = new_id()
         created_at = datetime.now().isoformat()
         
-        cursor.execute("""
-            INSERT INTO customers (id, name, phone, national_id, address, created_at)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (customer_id, customer.name, customer.phone, customer.national_id, customer.address, created_at))
+        queries.execute(cursor, "customers.insert", (customer_id, customer.name, customer.phone, customer.national_id, customer.address, created_at))
         
-        cursor.execute("SELECT * FROM customers WHERE id = ?", (customer_id,))
+        queries.execute(cursor, "customers.get", (customer_id,))
         return dict(cursor.fetchone())
 
+@router.get("/{customer_id}/balance", response_model=CustomerBalance)
+@db_task
+def get_customer_balance(customer_id: str):
+    """Sales, down payments, paid installments and outstanding debt of a customer"""
+    with get_read_db() as conn:
+        cursor = conn.cursor()
+        queries.execute(cursor, "customers.balance", (customer_id,))
+        row = cursor.fetchone()
+        if not row:
+            raise HTTPException(status_code=404, detail="Customer not found")
+        return dict(row)
+
 @router.put("/{customer_id}", response_model=Customer)
+@db_task(executor="writer")
 def update_customer(customer_id: str, customer: CustomerUpdate):
-    with get_db() as conn:
+    with get_write_db() as conn:
         cursor = conn.cursor()
-        updates = []
-        values = []
-        for field, value in customer.model_dump(exclude_unset=True).items():
-            updates.append(f"{field} = ?")
-            values.append(value)
-        
-        if not updates:
+        values = customer.model_dump(exclude_unset=True)
+        if not values:
             raise HTTPException(status_code=400, detail="No fields to update")
         
-        values.append(customer_id)
-        cursor.execute(f"UPDATE customers SET {', '.join(updates)} WHERE id = ?", values)
+        queries.update(cursor, "customers", values, customer_id)
         
         if cursor.rowcount == 0:
             raise HTTPException(status_code=404, detail="Customer not found")
         
-        cursor.execute("SELECT * FROM customers WHERE id = ?", (customer_id,))
+        queries.execute(cursor, "customers.get", (customer_id,))
         return dict(cursor.fetchone())
 
 @router.delete("/{customer_id}")
+@db_task(executor="writer")
 def delete_customer(customer_id: str):
-    with get_db() as conn:
+    with get_write_db() as conn:
         cursor = conn.cursor()
-        cursor.execute("DELETE FROM customers WHERE id = ?", (customer_id,))
+        queries.execute(cursor, "customers.delete", (customer_id,))
         if cursor.rowcount == 0:
             raise HTTPException(status_code=404, detail="Customer not found")
         return {"message": "Customer deleted successfully"}
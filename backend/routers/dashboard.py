@@ -0,0 +1,72 @@
+from fastapi import APIRouter
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+
+from conditional import table_state
+from database import get_read_db
+from db_executor import db_task
+import queries
+from models import DashboardSummary
+
+router = APIRouter()
+
+# Tables the summary reads; a change to any of them invalidates the cached copy
+SUMMARY_TABLES = ("sales", "customers", "partners", "investors", "investor_transactions", "expenses", "installments")
+
+# (table versions, day) -> summary of the last computed snapshot
+_last: Optional[Tuple[tuple, dict]] = None
+
+# Installment sums of a status with no rows
+_NO_INSTALLMENTS = {"count": 0, "principal": 0, "interest": 0, "total": 0}
+
+def dashboard_summary(cursor, today: Optional[str] = None) -> dict:
+    """Dashboard totals for the current snapshot, from a few aggregate queries.
+
+    ``dueOrOverdue`` is the installments with status 'overdue' plus the
+    pending ones due on or before ``today`` (UTC date by default), like the
+    Installments page marks them; those pending ones are also part of
+    ``receivables``. The result is reused until one of SUMMARY_TABLES
+    changes or the day rolls over.
+    """
+    global _last
+    today = today or datetime.now(timezone.utc).date().isoformat()
+    key = (*table_state(cursor, SUMMARY_TABLES), today)
+    last = _last
+    if last is not None and last[0] == key:
+        return last[1]
+
+    totals = queries.execute(cursor, "dashboard.totals").fetchone()
+    by_status = {row["status"]: dict(row) for row in queries.execute(cursor, "dashboard.installments_by_status")}
+    # "\uffff" sorts after any ISO date, so installments due today are included
+    past_due = queries.execute(cursor, "dashboard.past_due", (today + "\uffff",)).fetchone()
+
+    paid, pending, overdue = (by_status.get(status, _NO_INSTALLMENTS) for status in ("paid", "pending", "overdue"))
+    total_profit = totals["initial_profit"] + paid["interest"]
+
+    summary = {
+        "totalSales": totals["sale_count"],
+        "totalRevenue": totals["revenue"],
+        "activeCustomers": totals["customer_count"],
+        "totalCapital": totals["partners_capital"] + totals["investors_capital"],
+        "partnersCapital": totals["partners_capital"],
+        "investorsCapital": totals["investors_capital"],
+        "usedCapital": totals["purchase_total"] - paid["principal"],
+        "receivables": {"count": pending["count"] + overdue["count"], "total": pending["total"] + overdue["total"]},
+        "dueOrOverdue": {"count": overdue["count"] + past_due["count"], "total": overdue["total"] + past_due["total"]},
+        "collected": {"count": paid["count"], "total": paid["total"]},
+        "initialProfit": totals["initial_profit"],
+        "monthlyProfit": paid["interest"],
+        "totalProfit": total_profit,
+        "totalExpenses": totals["expenses_total"],
+        "investorsProfitPaid": totals["investors_profit_paid"],
+        "netProfit": total_profit - totals["expenses_total"] - totals["investors_profit_paid"],
+    }
+    _last = (key, summary)
+    return summary
+
+@router.get("/summary", response_model=DashboardSummary)
+@db_task(executor="reports")
+def get_dashboard_summary():
+    """Capital, used capital, receivables, due/overdue amounts, profit and expenses in one small object"""
+    with get_read_db() as conn:
+        return dashboard_summary(conn.cursor())
@@ -1,55 +1,126 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
-import uuid
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from typing import List, Optional, Tuple
 from datetime import datetime
 
-from database import get_db
-from models import Expense, ExpenseCreate, ExpenseUpdate
+from conditional import conditional_response
+from database import get_read_db, get_write_db
+from db_executor import db_task
+from ids import new_id
+from pagination import CursorParam, LimitParam, fetch_list
+from projection import FieldsParam, Projection, execute_projected, parse_fields, projected_response
+from streaming import stream_format, stream_list
+from serialization import json_rows
+import queries
+from models import Expense, ExpenseCreate, ExpenseSummary, ExpenseUpdate
 
 router = APIRouter()
 
+# Filters shared by the list and the summary; dates compare as ISO strings
+DATE_PATTERN = r"^\d{4}-\d{2}-\d{2}"
+FromParam = Query(None, alias="from", pattern=DATE_PATTERN, description="First date (inclusive)")
+ToParam = Query(None, alias="to", pattern=DATE_PATTERN, description="Last date (inclusive)")
+TypeParam = Query(None, alias="type", description="Expense type")
+
+def date_bounds(date_from: Optional[str], date_to: Optional[str]) -> Tuple[str, str]:
+    """``>= ? AND < ?`` parameters for an optional [from, to] date range"""
+    # "\uffff" sorts after any ISO date, so "to" covers the whole day
+    return date_from or "", (date_to or "") + "\uffff"
+
+def _expense_filter(date_from: Optional[str], date_to: Optional[str], expense_type: Optional[str]) -> Tuple[str, tuple]:
+    """Statement prefix (see queries.EXPENSE_FILTERS) and its parameters"""
+    bounds = date_bounds(date_from, date_to)
+    if expense_type is not None:
+        return "expenses_by_type", (expense_type, *bounds)
+    return "expenses_by_date", bounds
+
+def expense_listing(date_from: Optional[str], date_to: Optional[str], expense_type: Optional[str]) -> Tuple[str, tuple]:
+    """Keyset listing (see queries.KEYSET_LISTINGS) and parameters for the filters"""
+    if date_from or date_to or expense_type is not None:
+        return _expense_filter(date_from, date_to, expense_type)
+    return "expenses", ()
+
+def expense_summary(cursor, date_from: Optional[str], date_to: Optional[str], expense_type: Optional[str]) -> dict:
+    """Total, totals by type and totals by month of the filtered expenses"""
+    prefix, params = _expense_filter(date_from, date_to, expense_type)
+    summary = dict(queries.execute(cursor, f"{prefix}.total", params).fetchone())
+    summary["byType"] = [dict(row) for row in queries.execute(cursor, f"{prefix}.totals_by_type", params)]
+    summary["byMonth"] = [dict(row) for row in queries.execute(cursor, f"{prefix}.totals_by_month", params)]
+    return summary
+
 @router.get("/", response_model=List[Expense])
-def get_expenses():
-    """Get all expenses"""
-    with get_db() as conn:
+@db_task(executor="reports")
+def get_expenses(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = LimitParam,
+    page_cursor: Optional[str] = CursorParam,
+    fields: Optional[str] = FieldsParam,
+    date_from: Optional[str] = FromParam,
+    date_to: Optional[str] = ToParam,
+    expense_type: Optional[str] = TypeParam,
+):
+    """Get all expenses, optionally filtered by date range and type"""
+    listing, params = expense_listing(date_from, date_to, expense_type)
+    projection = parse_fields(fields, Expense)
+    media_type = stream_format(request)
+    if media_type:
+        return stream_list(listing, Expense, media_type, projection, params, filename="expenses")
+    with get_read_db() as conn:
         cursor = conn.cursor()
-        cursor.execute("""
-            SELECT id, date, type, amount, description, created_at as createdAt
-            FROM expenses
-            ORDER BY date DESC, created_at DESC
-        """)
-        rows = cursor.fetchall()
-        return [dict(row) for row in rows]
+        not_modified = conditional_response(request, response, cursor, "expenses")
+        if not_modified:
+            return not_modified
+        rows = fetch_list(cursor, listing, response, limit, page_cursor, projection, params)
+        return json_rows(rows, Expense, response, fields=projection.fields if projection else None)
+
+@router.get("/summary", response_model=ExpenseSummary)
+@db_task(executor="reports")
+def get_expense_summary(
+    request: Request,
+    response: Response,
+    date_from: Optional[str] = FromParam,
+    date_to: Optional[str] = ToParam,
+    expense_type: Optional[str] = TypeParam,
+):
+    """Total, totals by type and totals by month (YYYY-MM) of the filtered expenses"""
+    with get_read_db() as conn:
+        cursor = conn.cursor()
+        not_modified = conditional_response(request, response, cursor, "expenses")
+        if not_modified:
+            return not_modified
+        return expense_summary(cursor, date_from, date_to, expense_type)
+
+def _fetch_expense(cursor, expense_id: str, projection: Optional[Projection] = None) -> dict:
+    """Load one expense on an already open cursor"""
+    execute_projected(cursor, "expenses.get", (expense_id,), projection)
+    row = cursor.fetchone()
+    
+    if not row:
+        raise HTTPException(status_code=404, detail="Expense not found")
+    
+    return dict(row)
 
 @router.get("/{expense_id}", response_model=Expense)
-def get_expense(expense_id: str):
+@db_task
+def get_expense(expense_id: str, fields: Optional[str] = FieldsParam):
     """Get a specific expense"""
-    with get_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT id, date, type, amount, description, created_at as createdAt
-            FROM expenses
-            WHERE id = ?
-        """, (expense_id,))
-        row = cursor.fetchone()
-        
-        if not row:
-            raise HTTPException(status_code=404, detail="Expense not found")
-        
-        return dict(row)
+    projection = parse_fields(fields, Expense)
+    with get_read_db() as conn:
+        expense = _fetch_expense(conn.cursor(), expense_id, projection)
+        if projection:
+            return projected_response(expense)
+        return expense
 
 @router.post("/", response_model=Expense)
+@db_task(executor="writer")
 def create_expense(expense: ExpenseCreate):
     """Create a new expense"""
-    expense_id = str(uuid.uuid4())
+    expense_id = new_id()
     created_at = datetime.now().isoformat()
     
-    with get_db() as conn:
+    with get_write_db() as conn:
         cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO expenses (id, date, type, amount, description, created_at)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (
+        queries.execute(cursor, "expenses.insert", (
             expense_id,
             expense.date,
             expense.type,
@@ -68,48 +139,31 @@ def create_expense(expense: ExpenseCreate):
         }
 
 @router.put("/{expense_id}", response_model=Expense)
+@db_task(executor="writer")
 def update_expense(expense_id: str, expense: ExpenseUpdate):
     """Update an expense"""
-    with get_db() as conn:
+    with get_write_db() as conn:
         cursor = conn.cursor()
         
-        # Build update query dynamically
-        updates = []
-        values = []
-        
-        if expense.date is not None:
-            updates.append("date = ?")
-            values.append(expense.date)
-        if expense.type is not None:
-            updates.append("type = ?")
-            values.append(expense.type)
-        if expense.amount is not None:
-            updates.append("amount = ?")
-            values.append(expense.amount)
-        if expense.description is not None:
-            updates.append("description = ?")
-            values.append(expense.description)
-        
-        if not updates:
+        values = expense.model_dump(exclude_none=True)
+        if not values:
             raise HTTPException(status_code=400, detail="No fields to update")
         
-        values.append(expense_id)
-        query = f"UPDATE expenses SET {', '.join(updates)} WHERE id = ?"
-        
-        cursor.execute(query, values)
+        queries.update(cursor, "expenses", values, expense_id)
         
         if cursor.rowcount == 0:
             raise HTTPException(status_code=404, detail="Expense not found")
         
         # Return updated expense
-        return get_expense(expense_id)
+        return _fetch_expense(cursor, expense_id)
 
 @router.delete("/{expense_id}")
+@db_task(executor="writer")
 def delete_expense(expense_id: str):
     """Delete an expense"""
-    with get_db() as conn:
+    with get_write_db() as conn:
         cursor = conn.cursor()
-        cursor.execute("DELETE FROM expenses WHERE id = ?", (expense_id,))
+        queries.execute(cursor, "expenses.delete", (expense_id,))
         
         if cursor.rowcount == 0:
             raise HTTPException(status_code=404, detail="Expense not found")
@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Request, Response
+
+from conditional import conditional_response
+from database import get_read_db
+from db_executor import db_task
+from financials import compute_financials
+from models import FinancialSummary
+
+router = APIRouter()
+
+@router.get("/", response_model=FinancialSummary)
+@db_task(executor="reports")
+def get_financials(request: Request, response: Response):
+    """Capital, profit and per-partner shares (same result as calculateFinancialsFromData)"""
+    with get_read_db() as conn:
+        cursor = conn.cursor()
+        not_modified = conditional_response(request, response, cursor, "partners", "sales", "installments")
+        if not_modified:
+            return not_modified
+        return compute_financials(cursor)
@@ -1,69 +1,102 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
-import uuid
+from fastapi import APIRouter, HTTPException, Request, Response
+from typing import List, Optional
 
-from database import get_db
-from models import Installment, InstallmentCreate, InstallmentUpdate
+from conditional import conditional_response
+from database import get_read_db, get_write_db
+from db_executor import db_task
+from ids import new_id
+from pagination import CursorParam, LimitParam, fetch_list
+from projection import FieldsParam, parse_fields
+from streaming import stream_format, stream_list
+from serialization import json_rows
+import queries
+from routers.expenses import FromParam, ToParam, date_bounds
+from models import CollectionMonth, Installment, InstallmentCreate, InstallmentUpdate
 
 router = APIRouter()
 
 @router.get("/", response_model=List[Installment])
-def get_installments():
-    with get_db() as conn:
+@db_task(executor="reports")
+def get_installments(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = LimitParam,
+    page_cursor: Optional[str] = CursorParam,
+    fields: Optional[str] = FieldsParam,
+):
+    projection = parse_fields(fields, Installment)
+    media_type = stream_format(request)
+    if media_type:
+        return stream_list("installments", Installment, media_type, projection)
+    with get_read_db() as conn:
         cursor = conn.cursor()
-        cursor.execute("SELECT * FROM installments ORDER BY due_date ASC")
-        return [dict(row) for row in cursor.fetchall()]
+        not_modified = conditional_response(request, response, cursor, "installments")
+        if not_modified:
+            return not_modified
+        rows = fetch_list(cursor, "installments", response, limit, page_cursor, projection)
+        return json_rows(rows, Installment, response, fields=projection.fields if projection else None)
 
 @router.get("/sale/{sale_id}", response_model=List[Installment])
+@db_task
 def get_installments_by_sale(sale_id: str):
-    with get_db() as conn:
+    with get_read_db() as conn:
         cursor = conn.cursor()
-        cursor.execute("SELECT * FROM installments WHERE sale_id = ? ORDER BY installment_number ASC", (sale_id,))
-        return [dict(row) for row in cursor.fetchall()]
+        queries.execute(cursor, "installments.by_sale", (sale_id,))
+        return json_rows(cursor.fetchall(), Installment)
+
+@router.get("/collections", response_model=List[CollectionMonth])
+@db_task(executor="reports")
+def get_collections(
+    request: Request,
+    response: Response,
+    date_from: Optional[str] = FromParam,
+    date_to: Optional[str] = ToParam,
+):
+    """Paid installments per month (YYYY-MM) of payment, optionally within a date range"""
+    with get_read_db() as conn:
+        cursor = conn.cursor()
+        not_modified = conditional_response(request, response, cursor, "installments")
+        if not_modified:
+            return not_modified
+        queries.execute(cursor, "installments.collections_by_month", date_bounds(date_from, date_to))
+        return json_rows(cursor.fetchall(), CollectionMonth, response)
 
 @router.post("/", response_model=Installment)
+@db_task(executor="writer")
 def create_installment(installment: InstallmentCreate):
-    with get_db() as conn:
+    with get_write_db() as conn:
         cursor = conn.cursor()
-        installment_id = str(uuid.uuid4())
+        installment_id = new_id()
         
-        cursor.execute("""
-            INSERT INTO installments (id, sale_id, installment_number, principal_amount, interest_amount,
-                                    total_amount, remaining_debt, due_date, status)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'pending')
-        """, (installment_id, installment.sale_id, installment.installment_number, installment.principal_amount,
+        queries.execute(cursor, "installments.insert", (installment_id, installment.sale_id, installment.installment_number, installment.principal_amount,
               installment.interest_amount, installment.total_amount, installment.remaining_debt, installment.due_date))
         
-        cursor.execute("SELECT * FROM installments WHERE id = ?", (installment_id,))
+        queries.execute(cursor, "installments.get", (installment_id,))
         return dict(cursor.fetchone())
 
 @router.put("/{installment_id}", response_model=Installment)
+@db_task(executor="writer")
 def update_installment(installment_id: str, installment: InstallmentUpdate):
-    with get_db() as conn:
+    with get_write_db() as conn:
         cursor = conn.cursor()
-        updates = []
-        values = []
-        for field, value in installment.model_dump(exclude_unset=True).items():
-            updates.append(f"{field} = ?")
-            values.append(value)
-        
-        if not updates:
+        values = installment.model_dump(exclude_unset=True)
+        if not values:
             raise HTTPException(status_code=400, detail="No fields to update")
         
-        values.append(installment_id)
-        cursor.execute(f"UPDATE installments SET {', '.join(updates)} WHERE id = ?", values)
+        queries.update(cursor, "installments", values, installment_id)
         
         if cursor.rowcount == 0:
             raise HTTPException(status_code=404, detail="Installment not found")
         
-        cursor.execute("SELECT * FROM installments WHERE id = ?", (installment_id,))
+        queries.execute(cursor, "installments.get", (installment_id,))
         return dict(cursor.fetchone())
 
 @router.delete("/{installment_id}")
+@db_task(executor="writer")
 def delete_installment(installment_id: str):
-    with get_db() as conn:
+    with get_write_db() as conn:
         cursor = conn.cursor()
-        cursor.execute("DELETE FROM installments WHERE id = ?", (installment_id,))
+        queries.execute(cursor, "installments.delete", (installment_id,))
         if cursor.rowcount == 0:
             raise HTTPException(status_code=404, detail="Installment not found")
         return {"message": "Installment deleted successfully"}
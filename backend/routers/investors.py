@@ -1,61 +1,65 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi import APIRouter, HTTPException, Request, Response
+from typing import List, Optional
 from pydantic import BaseModel
-import uuid
 from datetime import datetime
 
-from database import get_db
+import capital_timeline
+from conditional import conditional_response
+from database import get_read_db, get_write_db
+from db_executor import db_task
+from ids import new_id
+from money import allocate
+from pagination import CursorParam, LimitParam, fetch_list
+from projection import FieldsParam, Projection, execute_projected, parse_fields, projected_response
+from streaming import stream_format, stream_list
+from serialization import json_rows
+import queries
 from models import (
+    Money,
     Investor,
     InvestorCreate,
     InvestorUpdate,
     InvestorTransaction,
-    InvestorTransactionCreate
+    InvestorTransactionCreate,
+    TransactionTotal,
 )
 
 class CapitalAdjustRequest(BaseModel):
-    amount: float
+    amount: Money
     description: str = ""
 
 router = APIRouter()
 
 @router.get("/", response_model=List[Investor])
-def get_investors():
+@db_task(executor="reports")
+def get_investors(request: Request, response: Response):
     """Get all investors"""
-    with get_db() as conn:
+    with get_read_db() as conn:
         cursor = conn.cursor()
-        cursor.execute("""
-            SELECT id, name, phone, national_id as nationalId, 
-                   investment_amount as investmentAmount, profit_rate as profitRate,
-                   total_profit as totalProfit, start_date as startDate,
-                   status, created_at as createdAt
-            FROM investors
-            ORDER BY created_at DESC
-        """)
+        not_modified = conditional_response(request, response, cursor, "investors")
+        if not_modified:
+            return not_modified
+        queries.execute(cursor, "investors.list")
         rows = cursor.fetchall()
-        return [dict(row) for row in rows]
+        return json_rows(rows, Investor, response)
 
 @router.post("/", response_model=Investor)
+@db_task(executor="writer")
 def create_investor(investor: InvestorCreate):
     """Create a new investor"""
-    investor_id = str(uuid.uuid4())
+    investor_id = new_id()
     created_at = datetime.now().isoformat()
     
-    with get_db() as conn:
+    with get_write_db() as conn:
         cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO investors (
-                id, name, phone, national_id, investment_amount, profit_rate,
-                total_profit, start_date, status, created_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+        queries.execute(cursor, "investors.insert", (
             investor_id,
             investor.name,
             investor.phone,
             investor.national_id,
             investor.investment_amount,
             investor.profit_rate,
-            0.0,  # total_profit starts at 0
+            0,  # total_profit starts at 0
             investor.start_date,
             investor.status,
             created_at
@@ -68,137 +72,120 @@ def create_investor(investor: InvestorCreate):
             "nationalId": investor.national_id,
             "investmentAmount": investor.investment_amount,
             "profitRate": investor.profit_rate,
-            "totalProfit": 0.0,
+            "totalProfit": 0,
             "startDate": investor.start_date,
             "status": investor.status,
             "createdAt": created_at
         }
 
+def _fetch_investor(cursor, investor_id: str, projection: Optional[Projection] = None) -> dict:
+    """Load one investor on an already open cursor"""
+    execute_projected(cursor, "investors.get", (investor_id,), projection)
+    row = cursor.fetchone()
+    
+    if not row:
+        raise HTTPException(status_code=404, detail="Investor not found")
+    
+    return dict(row)
+
 @router.get("/{investor_id}", response_model=Investor)
-def get_investor(investor_id: str):
+@db_task
+def get_investor(investor_id: str, fields: Optional[str] = FieldsParam):
     """Get a specific investor"""
-    with get_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT id, name, phone, national_id as nationalId,
-                   investment_amount as investmentAmount, profit_rate as profitRate,
-                   total_profit as totalProfit, start_date as startDate,
-                   status, created_at as createdAt
-            FROM investors
-            WHERE id = ?
-        """, (investor_id,))
-        row = cursor.fetchone()
-        
-        if not row:
-            raise HTTPException(status_code=404, detail="Investor not found")
-        
-        return dict(row)
+    projection = parse_fields(fields, Investor)
+    with get_read_db() as conn:
+        investor = _fetch_investor(conn.cursor(), investor_id, projection)
+        if projection:
+            return projected_response(investor)
+        return investor
 
 @router.put("/{investor_id}", response_model=Investor)
+@db_task(executor="writer")
 def update_investor(investor_id: str, investor: InvestorUpdate):
     """Update an investor"""
-    with get_db() as conn:
+    with get_write_db() as conn:
         cursor = conn.cursor()
         
-        # Build update query dynamically
-        updates = []
-        values = []
-        
-        if investor.name is not None:
-            updates.append("name = ?")
-            values.append(investor.name)
-        if investor.phone is not None:
-            updates.append("phone = ?")
-            values.append(investor.phone)
-        if investor.national_id is not None:
-            updates.append("national_id = ?")
-            values.append(investor.national_id)
-        if investor.investment_amount is not None:
-            updates.append("investment_amount = ?")
-            values.append(investor.investment_amount)
-        if investor.profit_rate is not None:
-            updates.append("profit_rate = ?")
-            values.append(investor.profit_rate)
-        if investor.total_profit is not None:
-            updates.append("total_profit = ?")
-            values.append(investor.total_profit)
-        if investor.start_date is not None:
-            updates.append("start_date = ?")
-            values.append(investor.start_date)
-        if investor.status is not None:
-            updates.append("status = ?")
-            values.append(investor.status)
-        
-        if not updates:
+        values = investor.model_dump(exclude_none=True)
+        if not values:
             raise HTTPException(status_code=400, detail="No fields to update")
         
-        values.append(investor_id)
-        query = f"UPDATE investors SET {', '.join(updates)} WHERE id = ?"
-        
-        cursor.execute(query, values)
+        queries.update(cursor, "investors", values, investor_id)
         
         if cursor.rowcount == 0:
             raise HTTPException(status_code=404, detail="Investor not found")
         
         # Return updated investor
-        return get_investor(investor_id)
+        return _fetch_investor(cursor, investor_id)
 
 @router.delete("/{investor_id}")
+@db_task(executor="writer")
 def delete_investor(investor_id: str):
     """Delete an investor"""
-    with get_db() as conn:
+    with get_write_db() as conn:
         cursor = conn.cursor()
-        cursor.execute("DELETE FROM investors WHERE id = ?", (investor_id,))
+        queries.execute(cursor, "investors.delete", (investor_id,))
         
         if cursor.rowcount == 0:
             raise HTTPException(status_code=404, detail="Investor not found")
         
         # Also delete related transactions
-        cursor.execute("DELETE FROM investor_transactions WHERE investor_id = ?", (investor_id,))
+        queries.execute(cursor, "investor_transactions.delete_by_investor", (investor_id,))
         
         return {"message": "Investor deleted successfully"}
 
 # Investor Transactions endpoints
 @router.get("/transactions/all", response_model=List[InvestorTransaction])
-def get_all_investor_transactions():
+@db_task(executor="reports")
+def get_all_investor_transactions(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = LimitParam,
+    page_cursor: Optional[str] = CursorParam,
+    fields: Optional[str] = FieldsParam,
+):
     """Get all investor transactions"""
-    with get_db() as conn:
+    projection = parse_fields(fields, InvestorTransaction)
+    media_type = stream_format(request)
+    if media_type:
+        return stream_list("investor_transactions", InvestorTransaction, media_type, projection)
+    with get_read_db() as conn:
         cursor = conn.cursor()
-        cursor.execute("""
-            SELECT id, investor_id as investorId, type, amount, description, date
-            FROM investor_transactions
-            ORDER BY date DESC
-        """)
-        rows = cursor.fetchall()
-        return [dict(row) for row in rows]
+        not_modified = conditional_response(request, response, cursor, "investor_transactions")
+        if not_modified:
+            return not_modified
+        rows = fetch_list(cursor, "investor_transactions", response, limit, page_cursor, projection)
+        return json_rows(rows, InvestorTransaction, response, fields=projection.fields if projection else None)
 
 @router.get("/{investor_id}/transactions", response_model=List[InvestorTransaction])
+@db_task
 def get_investor_transactions(investor_id: str):
     """Get transactions for a specific investor"""
-    with get_db() as conn:
+    with get_read_db() as conn:
         cursor = conn.cursor()
-        cursor.execute("""
-            SELECT id, investor_id as investorId, type, amount, description, date
-            FROM investor_transactions
-            WHERE investor_id = ?
-            ORDER BY date DESC
-        """, (investor_id,))
+        queries.execute(cursor, "investor_transactions.by_investor", (investor_id,))
         rows = cursor.fetchall()
-        return [dict(row) for row in rows]
+        return json_rows(rows, InvestorTransaction)
+
+@router.get("/{investor_id}/totals", response_model=List[TransactionTotal])
+@db_task
+def get_investor_transaction_totals(investor_id: str):
+    """Count and sum of an investor's transactions per type"""
+    with get_read_db() as conn:
+        cursor = conn.cursor()
+        queries.execute(cursor, "investor_transactions.totals_by_investor", (investor_id,))
+        return json_rows(cursor.fetchall(), TransactionTotal)
 
 @router.post("/transactions/", response_model=InvestorTransaction)
+@db_task(executor="writer")
 def create_investor_transaction(transaction: InvestorTransactionCreate):
     """Create a new investor transaction"""
-    transaction_id = str(uuid.uuid4())
+    transaction_id = new_id()
     date = datetime.now().isoformat()
     
-    with get_db() as conn:
+    with get_write_db() as conn:
         cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO investor_transactions (
-                id, investor_id, type, amount, description, date
-            ) VALUES (?, ?, ?, ?, ?, ?)
-        """, (
+        queries.execute(cursor, "investor_transactions.insert", (
             transaction_id,
             transaction.investor_id,
             transaction.type,
@@ -217,17 +204,14 @@ def create_investor_transaction(transaction: InvestorTransactionCreate):
         }
 
 @router.post("/{investor_id}/capital/adjust", response_model=Investor)
+@db_task(executor="writer")
 def adjust_investor_capital(investor_id: str, request: CapitalAdjustRequest):
     """Add or withdraw capital from an investor and update total capital in partners"""
-    with get_db() as conn:
+    with get_write_db() as conn:
         cursor = conn.cursor()
         
         # Get current investor
-        cursor.execute("""
-            SELECT investment_amount
-            FROM investors
-            WHERE id = ?
-        """, (investor_id,))
+        queries.execute(cursor, "investors.amount", (investor_id,))
         row = cursor.fetchone()
         
         if not row:
@@ -240,47 +224,31 @@ def adjust_investor_capital(investor_id: str, request: CapitalAdjustRequest):
             raise HTTPException(status_code=400, detail="Capital cannot be negative")
         
         # Update investor capital
-        cursor.execute("""
-            UPDATE investors
-            SET investment_amount = ?
-            WHERE id = ?
-        """, (new_amount, investor_id))
+        queries.execute(cursor, "investors.set_amount", (new_amount, investor_id))
         
         # اضافه کردن سرمایه به سرمایه کل شرکا
         # سرمایه سرمایه‌گذار به صورت متناسب بین شرکا توزیع می‌شود
-        cursor.execute("SELECT id, capital FROM partners")
+        queries.execute(cursor, "partners.capitals")
         partners = cursor.fetchall()
         
-        if partners:
-            total_capital = sum(p['capital'] for p in partners)
-            
-            for partner in partners:
-                # محاسبه سهم هر شریک
-                share = partner['capital'] / total_capital if total_capital > 0 else 1.0 / len(partners)
-                capital_change = request.amount * share
-                
-                # آپدیت سرمایه شریک
-                cursor.execute("""
-                    UPDATE partners
-                    SET capital = capital + ?,
-                        available_capital = available_capital + ?
-                    WHERE id = ?
-                """, (capital_change, capital_change, partner['id']))
+        # تقسیم به تومان صحیح: جمع سهم‌ها دقیقاً برابر مبلغ است
+        changes = allocate(request.amount, [max(p['capital'], 0) for p in partners])
+        transaction_date = datetime.now().isoformat()
+        for partner, capital_change in zip(partners, changes):
+            # آپدیت سرمایه شریک
+            queries.execute(cursor, "partners.add_capital", (capital_change, capital_change, partner['id']))
+            if capital_change:
+                capital_timeline.record(cursor, partner['id'], "capital_adjusted", transaction_date)
         
         # Create transaction
-        transaction_id = str(uuid.uuid4())
-        transaction_date = datetime.now().isoformat()
+        transaction_id = new_id()
         transaction_type = 'investment_add' if request.amount > 0 else 'investment_withdraw'
         transaction_description = request.description or (
             f"افزایش سرمایه {request.amount:,.0f} تومان" if request.amount > 0 
             else f"برداشت سرمایه {abs(request.amount):,.0f} تومان"
         )
         
-        cursor.execute("""
-            INSERT INTO investor_transactions (
-                id, investor_id, type, amount, description, date
-            ) VALUES (?, ?, ?, ?, ?, ?)
-        """, (
+        queries.execute(cursor, "investor_transactions.insert", (
             transaction_id,
             investor_id,
             transaction_type,
@@ -289,7 +257,5 @@ def adjust_investor_capital(investor_id: str, request: CapitalAdjustRequest):
             transaction_date
         ))
         
-        conn.commit()
-        
         # Return updated investor
-        return get_investor(investor_id)
+        return _fetch_investor(cursor, investor_id)
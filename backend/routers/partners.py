@@ -1,100 +1,129 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
-import uuid
+from fastapi import APIRouter, HTTPException, Request, Response
+from typing import List, Optional
 from datetime import datetime
 
-from database import get_db
-from models import Partner, PartnerCreate, PartnerUpdate
+import capital_timeline
+from conditional import conditional_response
+from database import get_read_db, get_write_db
+from db_executor import db_task
+from financials import instant
+from ids import new_id
+from projection import FieldsParam, execute_projected, parse_fields, projected_response, render
+from serialization import json_rows
+import queries
+from models import CapitalShares, Partner, PartnerCreate, PartnerUpdate
 
 router = APIRouter()
 
 @router.get("/", response_model=List[Partner])
-def get_partners():
+@db_task
+def get_partners(request: Request, response: Response):
     """Get all active partners"""
-    with get_db() as conn:
+    with get_read_db() as conn:
         cursor = conn.cursor()
-        cursor.execute("SELECT * FROM partners WHERE status = 'active' ORDER BY created_at DESC")
+        not_modified = conditional_response(request, response, cursor, "partners")
+        if not_modified:
+            return not_modified
+        queries.execute(cursor, "partners.list_active")
         rows = cursor.fetchall()
-        return [dict(row) for row in rows]
+        return json_rows(rows, Partner, response)
 
 @router.get("/all", response_model=List[Partner])
-def get_all_partners():
+@db_task(executor="reports")
+def get_all_partners(request: Request, response: Response):
     """Get all partners including inactive ones (for calculations)"""
-    with get_db() as conn:
+    with get_read_db() as conn:
         cursor = conn.cursor()
-        cursor.execute("SELECT * FROM partners ORDER BY created_at DESC")
+        not_modified = conditional_response(request, response, cursor, "partners")
+        if not_modified:
+            return not_modified
+        queries.execute(cursor, "partners.list_all")
         rows = cursor.fetchall()
-        return [dict(row) for row in rows]
+        return json_rows(rows, Partner, response)
 
 @router.post("/", response_model=Partner)
+@db_task(executor="writer")
 def create_partner(partner: PartnerCreate):
     """Create a new partner"""
-    with get_db() as conn:
+    with get_write_db() as conn:
         cursor = conn.cursor()
-        partner_id = str(uuid.uuid4())
+        partner_id = new_id()
         # استفاده از تاریخ ارسال شده یا تاریخ فعلی
         created_at = partner.join_date if partner.join_date else datetime.now().isoformat()
         
-        cursor.execute("""
-            INSERT INTO partners (id, name, capital, available_capital, initial_profit, monthly_profit, share, created_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (partner_id, partner.name, partner.capital, partner.capital, 0, 0, partner.share, created_at))
+        queries.execute(cursor, "partners.insert", (partner_id, partner.name, partner.capital, partner.capital, 0, 0, partner.share, created_at))
+        capital_timeline.record(cursor, partner_id, "created", created_at)
         
-        cursor.execute("SELECT * FROM partners WHERE id = ?", (partner_id,))
+        queries.execute(cursor, "partners.get", (partner_id,))
         row = cursor.fetchone()
         return dict(row)
 
+@router.get("/shares", response_model=CapitalShares)
+@db_task(executor="reports")
+def get_capital_shares(at: Optional[str] = None):
+    """Each partner's capital and share of total capital at ``at`` (ISO date/time, default now)"""
+    at = at or datetime.now().isoformat()
+    moment = instant(at)
+    if moment is None:
+        raise HTTPException(status_code=400, detail="Invalid date")
+    with get_read_db() as conn:
+        total, shares = capital_timeline.capital_index(conn.cursor()).shares_at(moment)
+    return {
+        "at": at,
+        "totalCapital": total,
+        "partners": [
+            {"partnerId": partner_id, "capital": capital, "share": share}
+            for partner_id, (capital, share) in shares.items()
+        ],
+    }
+
 @router.get("/{partner_id}", response_model=Partner)
-def get_partner(partner_id: str):
+@db_task
+def get_partner(partner_id: str, fields: Optional[str] = FieldsParam):
     """Get a specific partner"""
-    with get_db() as conn:
+    projection = parse_fields(fields, Partner)
+    with get_read_db() as conn:
         cursor = conn.cursor()
-        cursor.execute("SELECT * FROM partners WHERE id = ?", (partner_id,))
+        execute_projected(cursor, "partners.get", (partner_id,), projection)
         row = cursor.fetchone()
         if not row:
             raise HTTPException(status_code=404, detail="Partner not found")
+        if projection:
+            return projected_response(render([row], projection)[0])
         return dict(row)
 
 @router.put("/{partner_id}", response_model=Partner)
+@db_task(executor="writer")
 def update_partner(partner_id: str, partner: PartnerUpdate):
     """Update a partner"""
-    with get_db() as conn:
+    with get_write_db() as conn:
         cursor = conn.cursor()
         
-        # Build update query dynamically
-        updates = []
-        values = []
-        for field, value in partner.model_dump(exclude_unset=True).items():
-            updates.append(f"{field} = ?")
-            values.append(value)
-        
-        if not updates:
+        values = partner.model_dump(exclude_unset=True)
+        if not values:
             raise HTTPException(status_code=400, detail="No fields to update")
         
-        values.append(partner_id)
-        query = f"UPDATE partners SET {', '.join(updates)} WHERE id = ?"
-        cursor.execute(query, values)
+        queries.update(cursor, "partners", values, partner_id)
         
         if cursor.rowcount == 0:
             raise HTTPException(status_code=404, detail="Partner not found")
+        capital_timeline.record(cursor, partner_id, "updated")
         
-        cursor.execute("SELECT * FROM partners WHERE id = ?", (partner_id,))
+        queries.execute(cursor, "partners.get", (partner_id,))
         row = cursor.fetchone()
         return dict(row)
 
 @router.delete("/{partner_id}")
+@db_task(executor="writer")
 def delete_partner(partner_id: str):
     """Soft delete a partner (mark as inactive)"""
-    with get_db() as conn:
+    with get_write_db() as conn:
         cursor = conn.cursor()
         deleted_at = datetime.now().isoformat()
         
-        cursor.execute("""
-            UPDATE partners 
-            SET status = 'inactive', deleted_at = ? 
-            WHERE id = ? AND status = 'active'
-        """, (deleted_at, partner_id))
+        queries.execute(cursor, "partners.soft_delete", (deleted_at, partner_id))
         
         if cursor.rowcount == 0:
             raise HTTPException(status_code=404, detail="Partner not found or already deleted")
+        capital_timeline.record(cursor, partner_id, "deleted", deleted_at)
         return {"message": "Partner deleted successfully"}
@@ -1,9 +1,11 @@
 from fastapi import APIRouter, HTTPException
 from typing import List
-import uuid
 from datetime import datetime
 
-from database import get_db
+from database import get_read_db, get_write_db
+from db_executor import db_task
+from ids import new_id
+import queries
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -19,53 +21,51 @@ class CustomPhoneModelCreate(BaseModel):
     model: str
 
 @router.get("/", response_model=List[CustomPhoneModel])
+@db_task
 def get_custom_models():
-    with get_db() as conn:
+    with get_read_db() as conn:
         cursor = conn.cursor()
-        cursor.execute("SELECT * FROM custom_phone_models ORDER BY brand, model")
+        queries.execute(cursor, "phone_models.list")
         return [dict(row) for row in cursor.fetchall()]
 
 @router.get("/{brand}", response_model=List[str])
+@db_task
 def get_models_by_brand(brand: str):
-    with get_db() as conn:
+    with get_read_db() as conn:
         cursor = conn.cursor()
-        cursor.execute("SELECT model FROM custom_phone_models WHERE brand = ? ORDER BY model", (brand,))
+        queries.execute(cursor, "phone_models.by_brand", (brand,))
         return [row['model'] for row in cursor.fetchall()]
 
 @router.post("/", response_model=CustomPhoneModel)
+@db_task(executor="writer")
 def add_custom_model(model_data: CustomPhoneModelCreate):
-    with get_db() as conn:
+    with get_write_db() as conn:
         cursor = conn.cursor()
         
         # چک کردن اینکه مدل قبلا وجود نداشته باشه
-        cursor.execute(
-            "SELECT id FROM custom_phone_models WHERE brand = ? AND model = ?",
-            (model_data.brand, model_data.model)
-        )
+        queries.execute(cursor, "phone_models.find", (model_data.brand, model_data.model))
         existing = cursor.fetchone()
         
         if existing:
             # اگر وجود داشت، همون رو برگردون
-            cursor.execute("SELECT * FROM custom_phone_models WHERE id = ?", (existing['id'],))
+            queries.execute(cursor, "phone_models.get", (existing['id'],))
             return dict(cursor.fetchone())
         
         # اضافه کردن مدل جدید
-        model_id = str(uuid.uuid4())
+        model_id = new_id()
         created_at = datetime.now().isoformat()
         
-        cursor.execute("""
-            INSERT INTO custom_phone_models (id, brand, model, created_at)
-            VALUES (?, ?, ?, ?)
-        """, (model_id, model_data.brand, model_data.model, created_at))
+        queries.execute(cursor, "phone_models.insert", (model_id, model_data.brand, model_data.model, created_at))
         
-        cursor.execute("SELECT * FROM custom_phone_models WHERE id = ?", (model_id,))
+        queries.execute(cursor, "phone_models.get", (model_id,))
         return dict(cursor.fetchone())
 
 @router.delete("/{model_id}")
+@db_task(executor="writer")
 def delete_custom_model(model_id: str):
-    with get_db() as conn:
+    with get_write_db() as conn:
         cursor = conn.cursor()
-        cursor.execute("DELETE FROM custom_phone_models WHERE id = ?", (model_id,))
+        queries.execute(cursor, "phone_models.delete", (model_id,))
         if cursor.rowcount == 0:
             raise HTTPException(status_code=404, detail="Model not found")
         return {"message": "Model deleted successfully"}
@@ -1,71 +1,85 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
-import uuid
+from fastapi import APIRouter, HTTPException, Request, Response
+from typing import List, Optional
 from datetime import datetime
 
-from database import get_db
+from conditional import conditional_response
+from database import get_read_db, get_write_db
+from db_executor import db_task
+from ids import new_id
+from pagination import CursorParam, LimitParam, fetch_list
+from projection import FieldsParam, parse_fields
+from streaming import stream_format, stream_list
+from serialization import json_rows
+import queries
 from models import Phone, PhoneCreate, PhoneUpdate
 
 router = APIRouter()
 
 @router.get("/", response_model=List[Phone])
-def get_phones():
-    with get_db() as conn:
+@db_task(executor="reports")
+def get_phones(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = LimitParam,
+    page_cursor: Optional[str] = CursorParam,
+    fields: Optional[str] = FieldsParam,
+):
+    projection = parse_fields(fields, Phone)
+    media_type = stream_format(request)
+    if media_type:
+        return stream_list("phones", Phone, media_type, projection)
+    with get_read_db() as conn:
         cursor = conn.cursor()
-        cursor.execute("SELECT * FROM phones ORDER BY purchase_date DESC")
-        return [dict(row) for row in cursor.fetchall()]
+        not_modified = conditional_response(request, response, cursor, "phones")
+        if not_modified:
+            return not_modified
+        rows = fetch_list(cursor, "phones", response, limit, page_cursor, projection)
+        return json_rows(rows, Phone, response, fields=projection.fields if projection else None)
 
 @router.post("/", response_model=Phone)
+@db_task(executor="writer")
 def create_phone(phone: PhoneCreate):
-    with get_db() as conn:
+    with get_write_db() as conn:
         cursor = conn.cursor()
         
         # Check if IMEI already exists
-        cursor.execute("SELECT id FROM phones WHERE imei = ?", (phone.imei,))
+        queries.execute(cursor, "phones.by_imei", (phone.imei,))
         if cursor.fetchone():
             raise HTTPException(status_code=400, detail=f"گوشی با IMEI {phone.imei} قبلاً ثبت شده است")
         
-        phone_id = str(uuid.uuid4())
+        phone_id = new_id()
         purchase_date = phone.purchase_date if phone.purchase_date else datetime.now().isoformat()
         
-        cursor.execute("""
-            INSERT INTO phones (id, brand, model, imei, purchase_price, selling_price, status, purchase_date, 
-                              color, storage, condition, purchase_source, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (phone_id, phone.brand, phone.model, phone.imei, phone.purchase_price, phone.selling_price, 
+        queries.execute(cursor, "phones.insert", (phone_id, phone.brand, phone.model, phone.imei, phone.purchase_price, phone.selling_price, 
               phone.status, purchase_date, phone.color, phone.storage, phone.condition, 
               phone.purchase_source, phone.notes))
         
-        cursor.execute("SELECT * FROM phones WHERE id = ?", (phone_id,))
+        queries.execute(cursor, "phones.get", (phone_id,))
         return dict(cursor.fetchone())
 
 @router.put("/{phone_id}", response_model=Phone)
+@db_task(executor="writer")
 def update_phone(phone_id: str, phone: PhoneUpdate):
-    with get_db() as conn:
+    with get_write_db() as conn:
         cursor = conn.cursor()
-        updates = []
-        values = []
-        for field, value in phone.model_dump(exclude_unset=True).items():
-            updates.append(f"{field} = ?")
-            values.append(value)
-        
-        if not updates:
+        values = phone.model_dump(exclude_unset=True)
+        if not values:
             raise HTTPException(status_code=400, detail="No fields to update")
         
-        values.append(phone_id)
-        cursor.execute(f"UPDATE phones SET {', '.join(updates)} WHERE id = ?", values)
+        queries.update(cursor, "phones", values, phone_id)
         
         if cursor.rowcount == 0:
             raise HTTPException(status_code=404, detail="Phone not found")
         
-        cursor.execute("SELECT * FROM phones WHERE id = ?", (phone_id,))
+        queries.execute(cursor, "phones.get", (phone_id,))
         return dict(cursor.fetchone())
 
 @router.delete("/{phone_id}")
+@db_task(executor="writer")
 def delete_phone(phone_id: str):
-    with get_db() as conn:
+    with get_write_db() as conn:
         cursor = conn.cursor()
-        cursor.execute("DELETE FROM phones WHERE id = ?", (phone_id,))
+        queries.execute(cursor, "phones.delete", (phone_id,))
         if cursor.rowcount == 0:
             raise HTTPException(status_code=404, detail="Phone not found")
         return {"message": "Phone deleted successfully"}
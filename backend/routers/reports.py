@@ -0,0 +1,68 @@
+from fastapi import APIRouter, Request, Response
+from typing import List, Optional
+
+from conditional import conditional_response
+from database import get_read_db
+from db_executor import db_task
+from serialization import json_rows
+import queries
+from models import JalaliCollectionsMonth, JalaliExpensesMonth, JalaliInterestMonth, JalaliSalesMonth
+from routers.expenses import FromParam, ToParam, date_bounds
+
+router = APIRouter()
+
+def jalali_rollup(cursor, name: str, date_from: Optional[str], date_to: Optional[str]) -> list:
+    """Rows of the jalali_months.<name> rollup over [from, to] (Gregorian dates)"""
+    return queries.execute(cursor, f"jalali_months.{name}", date_bounds(date_from, date_to)).fetchall()
+
+def _rollup(request: Request, response: Response, name: str, table: str, model, date_from, date_to):
+    with get_read_db() as conn:
+        cursor = conn.cursor()
+        not_modified = conditional_response(request, response, cursor, table)
+        if not_modified:
+            return not_modified
+        return json_rows(jalali_rollup(cursor, name, date_from, date_to), model, response)
+
+@router.get("/jalali-months/sales", response_model=List[JalaliSalesMonth])
+@db_task(executor="reports")
+def get_sales_by_jalali_month(
+    request: Request,
+    response: Response,
+    date_from: Optional[str] = FromParam,
+    date_to: Optional[str] = ToParam,
+):
+    """Sales count, revenue, purchase total, initial profit and down payments per Jalali month of sale"""
+    return _rollup(request, response, "sales", "sales", JalaliSalesMonth, date_from, date_to)
+
+@router.get("/jalali-months/collections", response_model=List[JalaliCollectionsMonth])
+@db_task(executor="reports")
+def get_collections_by_jalali_month(
+    request: Request,
+    response: Response,
+    date_from: Optional[str] = FromParam,
+    date_to: Optional[str] = ToParam,
+):
+    """Paid installments per Jalali month of payment"""
+    return _rollup(request, response, "collections", "installments", JalaliCollectionsMonth, date_from, date_to)
+
+@router.get("/jalali-months/interest", response_model=List[JalaliInterestMonth])
+@db_task(executor="reports")
+def get_interest_by_jalali_month(
+    request: Request,
+    response: Response,
+    date_from: Optional[str] = FromParam,
+    date_to: Optional[str] = ToParam,
+):
+    """Interest income of paid installments per Jalali month of due date"""
+    return _rollup(request, response, "interest", "installments", JalaliInterestMonth, date_from, date_to)
+
+@router.get("/jalali-months/expenses", response_model=List[JalaliExpensesMonth])
+@db_task(executor="reports")
+def get_expenses_by_jalali_month(
+    request: Request,
+    response: Response,
+    date_from: Optional[str] = FromParam,
+    date_to: Optional[str] = ToParam,
+):
+    """Expense count and total per Jalali month"""
+    return _rollup(request, response, "expenses", "expenses", JalaliExpensesMonth, date_from, date_to)
@@ -1,11 +1,18 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
-import uuid
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from typing import List, Optional, Tuple
 from datetime import datetime
 import calendar
 
-from database import get_db
-from models import Sale, SaleCreate, SaleUpdate
+from conditional import conditional_response
+from database import get_read_db, get_write_db
+from db_executor import db_task
+from ids import new_id
+from pagination import CursorParam, LimitParam, fetch_list
+from projection import FieldsParam, parse_fields
+from streaming import stream_format, stream_list
+from serialization import json_rows
+import queries
+from models import Sale, SaleCreate, SaleEnriched, SaleUpdate
 
 def add_months_to_date(date: datetime, months: int) -> datetime:
     """Add months to a date properly handling month boundaries"""
@@ -32,60 +39,97 @@ def add_months_to_date(date: datetime, months: int) -> datetime:
 router = APIRouter()
 
 @router.get("/", response_model=List[Sale])
-def get_sales():
-    with get_db() as conn:
+@db_task(executor="reports")
+def get_sales(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = LimitParam,
+    page_cursor: Optional[str] = CursorParam,
+    fields: Optional[str] = FieldsParam,
+):
+    projection = parse_fields(fields, Sale)
+    media_type = stream_format(request)
+    if media_type:
+        return stream_list("sales", Sale, media_type, projection)
+    with get_read_db() as conn:
         cursor = conn.cursor()
-        cursor.execute("SELECT * FROM sales ORDER BY sale_date DESC")
-        return [dict(row) for row in cursor.fetchall()]
+        not_modified = conditional_response(request, response, cursor, "sales")
+        if not_modified:
+            return not_modified
+        rows = fetch_list(cursor, "sales", response, limit, page_cursor, projection)
+        return json_rows(rows, Sale, response, fields=projection.fields if projection else None)
+
+def sales_enriched_listing(status: Optional[str]) -> Tuple[str, tuple]:
+    """Keyset listing (see queries.KEYSET_LISTINGS) and parameters for the status filter"""
+    if status is not None:
+        return "sales_enriched_by_status", (status,)
+    return "sales_enriched", ()
+
+@router.get("/enriched", response_model=List[SaleEnriched])
+@db_task(executor="reports")
+def get_sales_enriched(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = LimitParam,
+    page_cursor: Optional[str] = CursorParam,
+    fields: Optional[str] = FieldsParam,
+    status: Optional[str] = Query(None, description="Sale status: active, completed or defaulted"),
+):
+    """Sales with customer name, phone and repayment progress, in one query"""
+    listing, params = sales_enriched_listing(status)
+    projection = parse_fields(fields, SaleEnriched)
+    media_type = stream_format(request)
+    if media_type:
+        return stream_list(listing, SaleEnriched, media_type, projection, params, filename="sales")
+    with get_read_db() as conn:
+        cursor = conn.cursor()
+        not_modified = conditional_response(request, response, cursor, "sales", "customers", "phones", "installments")
+        if not_modified:
+            return not_modified
+        rows = fetch_list(cursor, listing, response, limit, page_cursor, projection, params)
+        return json_rows(rows, SaleEnriched, response, fields=projection.fields if projection else None)
 
 @router.post("/", response_model=Sale)
+@db_task(executor="writer")
 def create_sale(sale: SaleCreate):
-    with get_db() as conn:
+    with get_write_db() as conn:
         cursor = conn.cursor()
-        sale_id = str(uuid.uuid4())
+        sale_id = new_id()
         # استفاده از تاریخ ارسال شده از frontend یا تاریخ امروز اگر ارسال نشده
         sale_date = sale.sale_date if sale.sale_date else datetime.now().isoformat()
         
-        cursor.execute("""
-            INSERT INTO sales (id, customer_id, phone_id, announced_price, purchase_price, down_payment,
-                             installment_months, monthly_interest_rate, initial_profit, sale_date, status)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'active')
-        """, (sale_id, sale.customer_id, sale.phone_id, sale.announced_price, sale.purchase_price,
+        queries.execute(cursor, "sales.insert", (sale_id, sale.customer_id, sale.phone_id, sale.announced_price, sale.purchase_price,
               sale.down_payment, sale.installment_months, sale.monthly_interest_rate, sale.initial_profit, sale_date))
         
         # Update phone status to sold
-        cursor.execute("UPDATE phones SET status = 'sold' WHERE id = ?", (sale.phone_id,))
+        queries.execute(cursor, "phones.mark_sold", (sale.phone_id,))
         
-        cursor.execute("SELECT * FROM sales WHERE id = ?", (sale_id,))
+        queries.execute(cursor, "sales.get", (sale_id,))
         return dict(cursor.fetchone())
 
 @router.put("/{sale_id}", response_model=Sale)
+@db_task(executor="writer")
 def update_sale(sale_id: str, sale: SaleUpdate):
-    with get_db() as conn:
+    with get_write_db() as conn:
         cursor = conn.cursor()
-        updates = []
-        values = []
-        for field, value in sale.model_dump(exclude_unset=True).items():
-            updates.append(f"{field} = ?")
-            values.append(value)
-        
-        if not updates:
+        values = sale.model_dump(exclude_unset=True)
+        if not values:
             raise HTTPException(status_code=400, detail="No fields to update")
         
-        values.append(sale_id)
-        cursor.execute(f"UPDATE sales SET {', '.join(updates)} WHERE id = ?", values)
+        queries.update(cursor, "sales", values, sale_id)
         
         if cursor.rowcount == 0:
             raise HTTPException(status_code=404, detail="Sale not found")
         
-        cursor.execute("SELECT * FROM sales WHERE id = ?", (sale_id,))
+        queries.execute(cursor, "sales.get", (sale_id,))
         return dict(cursor.fetchone())
 
 @router.delete("/{sale_id}")
+@db_task(executor="writer")
 def delete_sale(sale_id: str):
-    with get_db() as conn:
+    with get_write_db() as conn:
         cursor = conn.cursor()
-        cursor.execute("DELETE FROM sales WHERE id = ?", (sale_id,))
+        queries.execute(cursor, "sales.delete", (sale_id,))
         if cursor.rowcount == 0:
             raise HTTPException(status_code=404, detail="Sale not found")
         return {"message": "Sale deleted successfully"}
@@ -0,0 +1,94 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+import os
+
+from database import get_read_db
+from db_executor import db_task
+from migrations import SYNC_TABLES
+from pagination import decode_cursor, encode_cursor
+from projection import output_columns
+import queries
+from models import Customer, Expense, Installment, Investor, InvestorTransaction, Partner, Phone, Sale, Transaction
+from routers.phone_models import CustomPhoneModel
+
+SYNC_PAGE_SIZE = int(os.getenv("SYNC_PAGE_SIZE", "1000"))
+
+# Table -> (entity name in the response, response model)
+SYNC_ENTITIES = {
+    "partners": ("partners", Partner),
+    "phones": ("phones", Phone),
+    "customers": ("customers", Customer),
+    "sales": ("sales", Sale),
+    "installments": ("installments", Installment),
+    "transactions": ("transactions", Transaction),
+    "investors": ("investors", Investor),
+    "investor_transactions": ("investorTransactions", InvestorTransaction),
+    "expenses": ("expenses", Expense),
+    "custom_phone_models": ("phoneModels", CustomPhoneModel),
+}
+
+router = APIRouter()
+
+def _since_seq(since: Optional[str]) -> int:
+    if not since:
+        return 0
+    seq = decode_cursor(since, 1)[0]
+    if not isinstance(seq, int) or seq < 0:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return seq
+
+@router.get("/")
+@db_task(executor="reports")
+def sync(
+    since: Optional[str] = Query(None, description="`next` from the previous sync; omit for a full sync"),
+    limit: int = Query(SYNC_PAGE_SIZE, ge=1, le=10 * SYNC_PAGE_SIZE, description="Maximum rows per entity"),
+):
+    """Rows changed and deleted since the cursor, across all entities.
+
+    Every insert/update/delete takes the next value of one global change
+    sequence, so the response covers a window (since, next] exactly. When
+    ``hasMore`` is true, call again with ``next`` right away.
+    """
+    after = _since_seq(since)
+    with get_read_db() as conn:
+        cursor = conn.cursor()
+        queries.execute(cursor, "sync_clock.get")
+        latest = cursor.fetchone()["seq"]
+        upto = latest
+
+        # Fetch up to limit+1 rows per entity; when one overflows, the window
+        # is cut at its last returned row so every entity is complete up to it
+        fetched = {}
+        for table in SYNC_TABLES:
+            queries.execute(cursor, f"{table}.changed_since", (after, upto, limit + 1))
+            rows = cursor.fetchall()
+            fetched[table] = (cursor.description, rows)
+            if len(rows) > limit:
+                upto = min(upto, rows[limit - 1]["change_seq"])
+
+        queries.execute(cursor, "tombstones.since", (after, upto, limit + 1))
+        tombstones = cursor.fetchall()
+        if len(tombstones) > limit:
+            upto = min(upto, tombstones[limit - 1]["seq"])
+
+    changes = {}
+    for table, (description, rows) in fetched.items():
+        entity, model = SYNC_ENTITIES[table]
+        columns = output_columns(description, model)
+        changes[entity] = [
+            {**{field: row[index] for index, field in columns}, "updatedAt": row["updated_at"]}
+            for row in rows
+            if row["change_seq"] <= upto
+        ]
+
+    deleted = {entity: [] for entity, _ in SYNC_ENTITIES.values()}
+    for tombstone in tombstones:
+        if tombstone["seq"] <= upto:
+            deleted[SYNC_ENTITIES[tombstone["table_name"]][0]].append(tombstone["row_id"])
+
+    return {
+        "next": encode_cursor([upto]),
+        "hasMore": upto < latest,
+        "changes": changes,
+        "deleted": deleted,
+    }
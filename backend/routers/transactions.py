@@ -1,48 +1,78 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
-import uuid
+from fastapi import APIRouter, HTTPException, Request, Response
+from typing import List, Optional
 from datetime import datetime
 
-from database import get_db
-from models import Transaction, TransactionCreate
+from conditional import conditional_response
+from database import get_read_db, get_write_db
+from db_executor import db_task
+from ids import new_id
+from pagination import CursorParam, LimitParam, fetch_list
+from projection import FieldsParam, parse_fields
+from streaming import stream_format, stream_list
+from serialization import json_rows
+import queries
+from models import Transaction, TransactionCreate, TransactionTotal
 
 router = APIRouter()
 
 @router.get("/", response_model=List[Transaction])
-def get_transactions():
-    with get_db() as conn:
+@db_task(executor="reports")
+def get_transactions(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = LimitParam,
+    page_cursor: Optional[str] = CursorParam,
+    fields: Optional[str] = FieldsParam,
+):
+    projection = parse_fields(fields, Transaction)
+    media_type = stream_format(request)
+    if media_type:
+        return stream_list("transactions", Transaction, media_type, projection)
+    with get_read_db() as conn:
         cursor = conn.cursor()
-        cursor.execute("SELECT * FROM transactions ORDER BY date DESC")
-        return [dict(row) for row in cursor.fetchall()]
+        not_modified = conditional_response(request, response, cursor, "transactions")
+        if not_modified:
+            return not_modified
+        rows = fetch_list(cursor, "transactions", response, limit, page_cursor, projection)
+        return json_rows(rows, Transaction, response, fields=projection.fields if projection else None)
 
 @router.get("/partner/{partner_id}", response_model=List[Transaction])
+@db_task
 def get_transactions_by_partner(partner_id: str):
-    with get_db() as conn:
+    with get_read_db() as conn:
         cursor = conn.cursor()
-        cursor.execute("SELECT * FROM transactions WHERE partner_id = ? ORDER BY date DESC", (partner_id,))
-        return [dict(row) for row in cursor.fetchall()]
+        queries.execute(cursor, "transactions.by_partner", (partner_id,))
+        return json_rows(cursor.fetchall(), Transaction)
+
+@router.get("/partner/{partner_id}/totals", response_model=List[TransactionTotal])
+@db_task
+def get_transaction_totals_by_partner(partner_id: str):
+    """Count and sum of a partner's transactions per type"""
+    with get_read_db() as conn:
+        cursor = conn.cursor()
+        queries.execute(cursor, "transactions.totals_by_partner", (partner_id,))
+        return json_rows(cursor.fetchall(), TransactionTotal)
 
 @router.post("/", response_model=Transaction)
+@db_task(executor="writer")
 def create_transaction(transaction: TransactionCreate):
-    with get_db() as conn:
+    with get_write_db() as conn:
         cursor = conn.cursor()
-        transaction_id = str(uuid.uuid4())
+        transaction_id = new_id()
         date = datetime.now().isoformat()
         
-        cursor.execute("""
-            INSERT INTO transactions (id, partner_id, type, amount, description, profit_type, date)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (transaction_id, transaction.partner_id, transaction.type, transaction.amount,
+        queries.execute(cursor, "transactions.insert", (transaction_id, transaction.partner_id, transaction.type, transaction.amount,
               transaction.description, transaction.profit_type, date))
         
-        cursor.execute("SELECT * FROM transactions WHERE id = ?", (transaction_id,))
+        queries.execute(cursor, "transactions.get", (transaction_id,))
         return dict(cursor.fetchone())
 
 @router.delete("/{transaction_id}")
+@db_task(executor="writer")
 def delete_transaction(transaction_id: str):
-    with get_db() as conn:
+    with get_write_db() as conn:
         cursor = conn.cursor()
-        cursor.execute("DELETE FROM transactions WHERE id = ?", (transaction_id,))
+        queries.execute(cursor, "transactions.delete", (transaction_id,))
         if cursor.rowcount == 0:
             raise HTTPException(status_code=404, detail="Transaction not found")
         return {"message": "Transaction deleted successfully"}
@@ -1,10 +1,13 @@
 from fastapi import APIRouter, HTTPException
-from typing import List
-import uuid
+from typing import List, Optional
 import bcrypt
 from datetime import datetime
 
-from database import get_db
+from database import get_read_db, get_write_db
+from db_executor import db_task, run_db
+from ids import new_id
+from serialization import json_rows
+import queries
 from models import User, UserCreate, UserUpdate
 
 router = APIRouter()
@@ -14,20 +17,20 @@ def hash_password(password: str) -> str:
     return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
 
 @router.get("/", response_model=List[User])
+@db_task(executor="reports")
 def get_users():
     """Get all users (admin only)"""
-    with get_db() as conn:
+    with get_read_db() as conn:
         cursor = conn.cursor()
-        cursor.execute("""
-            SELECT id, full_name, mobile, role, partner_id, is_active, created_at
-            FROM users
-            ORDER BY created_at DESC
-        """)
+        queries.execute(cursor, "users.list")
         rows = cursor.fetchall()
-        return [dict(row) for row in rows]
+        return json_rows(rows, User)
 
+# create/update hash passwords with bcrypt (~0.2s) on the default executor
+# first; only the INSERT/UPDATE is submitted to the single writer queue, so
+# the hash doesn't stall every other write behind it
 @router.post("/", response_model=User)
-def create_user(user_data: UserCreate):
+async def create_user(user_data: UserCreate):
     """Create a new user (admin only)"""
     # Validation
     if len(user_data.full_name.strip()) < 3:
@@ -43,29 +46,29 @@ def create_user(user_data: UserCreate):
     if user_data.role == 'partner' and not user_data.partner_id:
         raise HTTPException(status_code=400, detail="برای کاربر شریک باید شریک مرتبط را انتخاب کنید")
     
-    with get_db() as conn:
+    hashed_password = await run_db(hash_password, user_data.password)
+    return await run_db(_insert_user, user_data, hashed_password, executor="writer")
+
+def _insert_user(user_data: UserCreate, hashed_password: str) -> dict:
+    with get_write_db() as conn:
         cursor = conn.cursor()
         
         # Check if mobile already exists
-        cursor.execute("SELECT id FROM users WHERE mobile = ?", (user_data.mobile,))
+        queries.execute(cursor, "users.by_mobile", (user_data.mobile,))
         if cursor.fetchone():
             raise HTTPException(status_code=400, detail="این شماره موبایل قبلاً ثبت شده است")
         
         # If partner_id provided, verify it exists
         if user_data.partner_id:
-            cursor.execute("SELECT id FROM partners WHERE id = ?", (user_data.partner_id,))
+            queries.execute(cursor, "partners.exists", (user_data.partner_id,))
             if not cursor.fetchone():
                 raise HTTPException(status_code=404, detail="شریک مورد نظر یافت نشد")
         
         # Create new user
-        user_id = str(uuid.uuid4())
+        user_id = new_id()
         created_at = datetime.now().isoformat()
-        hashed_password = hash_password(user_data.password)
         
-        cursor.execute("""
-            INSERT INTO users (id, full_name, mobile, password, role, partner_id, is_active, created_at)
-            VALUES (?, ?, ?, ?, ?, ?, 1, ?)
-        """, (user_id, user_data.full_name.strip(), user_data.mobile, hashed_password, 
+        queries.execute(cursor, "users.insert", (user_id, user_data.full_name.strip(), user_data.mobile, hashed_password, 
               user_data.role, user_data.partner_id, created_at))
         
         return {
@@ -79,69 +82,67 @@ def create_user(user_data: UserCreate):
         }
 
 @router.put("/{user_id}", response_model=User)
-def update_user(user_id: str, user_data: UserUpdate):
+async def update_user(user_id: str, user_data: UserUpdate):
     """Update user (admin only)"""
-    with get_db() as conn:
+    if user_data.full_name is not None and len(user_data.full_name.strip()) < 3:
+        raise HTTPException(status_code=400, detail="نام و نام خانوادگی باید حداقل ۳ کاراکتر باشد")
+    
+    if user_data.mobile is not None and (not user_data.mobile.startswith('09') or len(user_data.mobile) != 11):
+        raise HTTPException(status_code=400, detail="شماره موبایل نامعتبر است")
+    
+    hashed_password = None
+    if user_data.password is not None:
+        if len(user_data.password) < 4:
+            raise HTTPException(status_code=400, detail="رمز عبور باید حداقل ۴ کاراکتر باشد")
+        hashed_password = await run_db(hash_password, user_data.password)
+    
+    return await run_db(_update_user, user_id, user_data, hashed_password, executor="writer")
+
+def _update_user(user_id: str, user_data: UserUpdate, hashed_password: Optional[str]) -> dict:
+    with get_write_db() as conn:
         cursor = conn.cursor()
         
         # Check if user exists
-        cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
+        queries.execute(cursor, "users.get", (user_id,))
         existing_user = cursor.fetchone()
         if not existing_user:
             raise HTTPException(status_code=404, detail="کاربر یافت نشد")
         
-        updates = []
-        values = []
+        values = {}
         
         if user_data.full_name is not None:
-            if len(user_data.full_name.strip()) < 3:
-                raise HTTPException(status_code=400, detail="نام و نام خانوادگی باید حداقل ۳ کاراکتر باشد")
-            updates.append("full_name = ?")
-            values.append(user_data.full_name.strip())
+            values["full_name"] = user_data.full_name.strip()
         
         if user_data.mobile is not None:
-            if not user_data.mobile.startswith('09') or len(user_data.mobile) != 11:
-                raise HTTPException(status_code=400, detail="شماره موبایل نامعتبر است")
             # Check if mobile already exists for another user
-            cursor.execute("SELECT id FROM users WHERE mobile = ? AND id != ?", (user_data.mobile, user_id))
+            queries.execute(cursor, "users.by_mobile_other", (user_data.mobile, user_id))
             if cursor.fetchone():
                 raise HTTPException(status_code=400, detail="این شماره موبایل قبلاً ثبت شده است")
-            updates.append("mobile = ?")
-            values.append(user_data.mobile)
+            values["mobile"] = user_data.mobile
         
-        if user_data.password is not None:
-            if len(user_data.password) < 4:
-                raise HTTPException(status_code=400, detail="رمز عبور باید حداقل ۴ کاراکتر باشد")
-            updates.append("password = ?")
-            values.append(hash_password(user_data.password))
+        if hashed_password is not None:
+            values["password"] = hashed_password
         
         if user_data.role is not None:
-            updates.append("role = ?")
-            values.append(user_data.role)
+            values["role"] = user_data.role
         
         if user_data.partner_id is not None:
             # Verify partner exists
-            cursor.execute("SELECT id FROM partners WHERE id = ?", (user_data.partner_id,))
+            queries.execute(cursor, "partners.exists", (user_data.partner_id,))
             if not cursor.fetchone():
                 raise HTTPException(status_code=404, detail="شریک مورد نظر یافت نشد")
-            updates.append("partner_id = ?")
-            values.append(user_data.partner_id)
+            values["partner_id"] = user_data.partner_id
         
         if user_data.is_active is not None:
-            updates.append("is_active = ?")
-            values.append(1 if user_data.is_active else 0)
+            values["is_active"] = 1 if user_data.is_active else 0
         
-        if not updates:
+        if not values:
             raise HTTPException(status_code=400, detail="هیچ فیلدی برای بروزرسانی ارسال نشده است")
         
-        values.append(user_id)
-        cursor.execute(f"UPDATE users SET {', '.join(updates)} WHERE id = ?", values)
+        queries.update(cursor, "users", values, user_id)
         
         # Get updated user
-        cursor.execute("""
-            SELECT id, full_name, mobile, role, partner_id, is_active, created_at
-            FROM users WHERE id = ?
-        """, (user_id,))
+        queries.execute(cursor, "users.get", (user_id,))
         updated_user = dict(cursor.fetchone())
         
         return {
@@ -155,25 +156,26 @@ def update_user(user_id: str, user_data: UserUpdate):
         }
 
 @router.delete("/{user_id}")
+@db_task(executor="writer")
 def delete_user(user_id: str):
     """Delete user (admin only)"""
-    with get_db() as conn:
+    with get_write_db() as conn:
         cursor = conn.cursor()
         
         # Check if user exists
-        cursor.execute("SELECT role FROM users WHERE id = ?", (user_id,))
+        queries.execute(cursor, "users.role", (user_id,))
         user = cursor.fetchone()
         if not user:
             raise HTTPException(status_code=404, detail="کاربر یافت نشد")
         
         # Prevent deleting the last admin
         if dict(user)['role'] == 'admin':
-            cursor.execute("SELECT COUNT(*) as count FROM users WHERE role = 'admin'")
+            queries.execute(cursor, "users.admin_count")
             admin_count = dict(cursor.fetchone())['count']
             if admin_count <= 1:
                 raise HTTPException(status_code=400, detail="نمی‌توانید آخرین ادمین را حذف کنید")
         
-        cursor.execute("DELETE FROM users WHERE id = ?", (user_id,))
+        queries.execute(cursor, "users.delete", (user_id,))
         
         if cursor.rowcount == 0:
             raise HTTPException(status_code=404, detail="کاربر یافت نشد")
@@ -0,0 +1,96 @@
+"""
+Fast JSON path for list responses.
+
+Rows from our own SQL already have the right types, so list endpoints skip
+FastAPI's per-row response_model validation and alias mapping: the
+column -> API field mapping is worked out once per result set from the
+model, rows become dicts with ``dict(zip(...))``, and the list is encoded in
+one call with orjson (stdlib json if orjson is not installed). The wire
+format is the same camelCase JSON as the validated path; ``response_model``
+stays on the routes for the OpenAPI schema.
+"""
+import json
+from operator import itemgetter
+from typing import Any, List, Optional, Sequence, Type, get_args
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def json_response(content: Any, response: Optional[Response] = None) -> FastJSONResponse:
+    """Encode ``content`` as is, keeping headers already set on ``response``"""
+    headers = {}
+    if response is not None:
+        headers = {key: value for key, value in response.headers.items() if key != "content-length"}
+    return FastJSONResponse(content=content, headers=headers)
+
+
+def _is_bool(annotation) -> bool:
+    return annotation is bool or bool in get_args(annotation)
+
+
+def row_mapper(columns: Sequence[str], model: Type[BaseModel], fields: Optional[Sequence[str]] = None):
+    """Function turning a result row into an API dict.
+
+    ``columns`` are the result column names; each one matching a model field
+    (by name or alias) is emitted under the API name, others are dropped.
+    ``fields`` restricts the output to those API names.
+    """
+    by_column = {}
+    for name, info in model.model_fields.items():
+        field = info.alias or name
+        by_column[name] = by_column[field] = (field, _is_bool(info.annotation))
+
+    indexes, names, flags = [], [], []
+    for index, column in enumerate(columns):
+        if column in by_column and (fields is None or by_column[column][0] in fields):
+            field, is_bool = by_column[column]
+            indexes.append(index)
+            names.append(field)
+            flags.append(is_bool)
+
+    if any(flags):
+        # SQLite stores booleans as 0/1
+        pairs = list(zip(indexes, names, flags))
+        return lambda row: {field: (bool(row[i]) if flag and row[i] is not None else row[i]) for i, field, flag in pairs}
+    if indexes == list(range(len(columns))):
+        return lambda row: dict(zip(names, row))
+    if len(indexes) == 1:
+        index, field = indexes[0], names[0]
+        return lambda row: {field: row[index]}
+    getter = itemgetter(*indexes)
+    return lambda row: dict(zip(names, getter(row)))
+
+
+def rows_to_api(rows: Sequence, model: Type[BaseModel], fields: Optional[Sequence[str]] = None) -> List[dict]:
+    if not rows:
+        return []
+    mapper = row_mapper(rows[0].keys(), model, fields)
+    return [mapper(row) for row in rows]
+
+
+def json_rows(
+    rows: Sequence,
+    model: Type[BaseModel],
+    response: Optional[Response] = None,
+    fields: Optional[Sequence[str]] = None,
+) -> FastJSONResponse:
+    """List response for ``rows`` without per-row model validation"""
+    return json_response(rows_to_api(rows, model, fields), response)
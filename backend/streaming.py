@@ -0,0 +1,95 @@
+"""
+Streaming NDJSON / CSV exports of list endpoints.
+
+When the client sends ``Accept: application/x-ndjson`` or ``Accept: text/csv``
+a list endpoint streams the whole collection instead of building one JSON
+array. Rows are read with ``fetchmany`` in chunks of STREAM_CHUNK_ROWS on the
+reports executor and written out as they arrive, so memory stays flat and
+the first bytes go out right after the first chunk, whatever the table size.
+The export reads one snapshot, like a normal list request. NDJSON lines go
+through the same row mapping and encoder (``serialization``, orjson when
+installed) as the JSON list responses, so both give the same values.
+"""
+import csv
+import io
+import os
+from typing import AsyncIterator, Optional, Type, Union
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from database import get_read_db
+from db_executor import run_db
+from projection import Projection, execute_projected, output_columns
+from serialization import dumps, row_mapper
+
+STREAM_CHUNK_ROWS = int(os.getenv("STREAM_CHUNK_ROWS", "500"))
+
+NDJSON = "application/x-ndjson"
+CSV = "text/csv"
+
+
+def stream_format(request: Request) -> Optional[str]:
+    """NDJSON or CSV when the Accept header asks for it, else None (JSON)"""
+    accept = request.headers.get("accept", "")
+    media_types = [part.split(";")[0].strip().lower() for part in accept.split(",")]
+    for media_type in media_types:
+        if media_type in (NDJSON, CSV):
+            return media_type
+    return None
+
+
+async def _stream_rows(
+    name: str,
+    params: tuple,
+    model: Type[BaseModel],
+    media_type: str,
+    projection: Optional[Projection],
+) -> AsyncIterator[Union[str, bytes]]:
+    context = get_read_db()
+    conn = await run_db(context.__enter__, executor="reports")
+    try:
+        cursor = conn.cursor()
+        await run_db(execute_projected, cursor, name, params, projection, executor="reports")
+        columns = output_columns(cursor.description, model)
+        to_api = row_mapper([column[0] for column in cursor.description], model)
+
+        if media_type == CSV:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow([field for _, field in columns])
+            yield buffer.getvalue()
+
+        while True:
+            rows = await run_db(cursor.fetchmany, STREAM_CHUNK_ROWS, executor="reports")
+            if not rows:
+                break
+            if media_type == CSV:
+                buffer.seek(0)
+                buffer.truncate()
+                writer.writerows([row[index] for index, _ in columns] for row in rows)
+                yield buffer.getvalue()
+            else:
+                yield b"".join(dumps(to_api(row)) + b"\n" for row in rows)
+    finally:
+        await run_db(context.__exit__, None, None, None, executor="reports")
+
+
+def stream_list(
+    listing: str,
+    model: Type[BaseModel],
+    media_type: str,
+    projection: Optional[Projection] = None,
+    params: tuple = (),
+    filename: Optional[str] = None,
+) -> StreamingResponse:
+    """Stream every row of ``<listing>.list`` (optionally projected) as NDJSON or CSV"""
+    headers = {}
+    if media_type == CSV:
+        headers["Content-Disposition"] = f'attachment; filename="{filename or listing}.csv"'
+    return StreamingResponse(
+        _stream_rows(f"{listing}.list", params, model, media_type, projection),
+        media_type=f"{media_type}; charset=utf-8",
+        headers=headers,
+    )
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Summary tables kept up to date by triggers.
+
+Balances and totals that used to be recomputed from every installment are
+stored per entity (sale, customer, status, day, partner, investor) and
+adjusted on each write: an AFTER INSERT trigger adds the new row's
+contribution, AFTER DELETE subtracts the old one, AFTER UPDATE of the
+columns involved does both. Triggers rather than the routers, so scripts
+and manual fixes keep the tables right too, and the change happens inside
+the same transaction as the write.
+
+Per-partner profit has no table of its own. A partner's share of a sale or
+paid installment is their capital over the capital of every partner present
+on that date, so one capital change or a partner leaving would rewrite the
+profit of every other partner and no row-local trigger could keep it right.
+The financials sweep (financials.py) instead reads the per-date tables
+below, sales_by_date and paid_by_due_date: O(dates + partners), whatever
+the number of sales and installments.
+
+Every summary is also defined as a plain GROUP BY over the source rows
+(``Summary.source``), used to fill the table from scratch and to check it:
+
+Usage:
+    python summaries.py check     # compare every table with its source (exit 1 on drift)
+    python summaries.py rebuild   # recompute every table from its source
+"""
+import sqlite3
+import sys
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import database
+
+
+class Summary(NamedTuple):
+    table: str
+    keys: Tuple[str, ...]
+    values: Tuple[str, ...]
+    # SELECT of every row (keys then values) computed from the source tables
+    source: str
+
+
+class Contribution(NamedTuple):
+    """What one row of ``source_table`` adds to ``summary``.
+
+    Expressions use ``{row}`` for the NEW/OLD row; ``values`` follow the
+    summary's value columns. Rows for which ``when`` is false add nothing.
+    """
+    summary: str
+    source_table: str
+    keys: Tuple[str, ...]
+    values: Tuple[str, ...]
+    when: str = "1"
+    # Columns whose update changes the contribution (AFTER UPDATE OF ...)
+    watched: Tuple[str, ...] = ()
+
+
+def _paid(row: str) -> str:
+    return f"{row}.status = 'paid'"
+
+
+def _if(condition: str, value: str) -> str:
+    return f"CASE WHEN {condition} THEN {value} ELSE 0 END"
+
+
+def _sale_exists(row: str) -> str:
+    return f"EXISTS (SELECT 1 FROM sales WHERE id = {row}.sale_id)"
+
+
+SUMMARIES: Dict[str, Summary] = {summary.table: summary for summary in (
+    # Installments per status (dashboard receivables, collections)
+    Summary("installment_totals", ("status",), ("count", "principal", "interest", "total"), """
+        SELECT status, COUNT(*), SUM(principal_amount), SUM(interest_amount), SUM(total_amount)
+        FROM installments GROUP BY status
+    """),
+    # Outstanding debt and payments per sale
+    Summary("sale_balances", ("sale_id",),
+            ("installment_count", "paid_count", "paid_principal", "paid_interest", "paid_total", "outstanding_total"), """
+        SELECT sale_id, COUNT(*),
+            SUM(status = 'paid'),
+            SUM(CASE WHEN status = 'paid' THEN principal_amount ELSE 0 END),
+            SUM(CASE WHEN status = 'paid' THEN interest_amount ELSE 0 END),
+            SUM(CASE WHEN status = 'paid' THEN total_amount ELSE 0 END),
+            SUM(CASE WHEN status = 'paid' THEN 0 ELSE total_amount END)
+        FROM installments GROUP BY sale_id
+    """),
+    # Sales, down payments, payments and outstanding debt per customer
+    Summary("customer_balances", ("customer_id",), ("sale_count", "down_payments", "paid_total", "outstanding_total"), """
+        SELECT s.customer_id, COUNT(*), SUM(s.down_payment),
+            COALESCE(SUM(b.paid_total), 0), COALESCE(SUM(b.outstanding_total), 0)
+        FROM sales s LEFT JOIN sale_balances b ON b.sale_id = s.id
+        GROUP BY s.customer_id
+    """),
+    # Sales per sale_date (financials sweep, dashboard totals)
+    Summary("sales_by_date", ("sale_date",),
+            ("count", "revenue", "purchase_total", "initial_profit", "down_payments"), """
+        SELECT sale_date, COUNT(*), SUM(announced_price), SUM(purchase_price), SUM(initial_profit), SUM(down_payment)
+        FROM sales GROUP BY sale_date
+    """),
+    # Paid installments per due_date; "attributed" leaves out installments
+    # whose sale was deleted (financials sweep)
+    Summary("paid_by_due_date", ("due_date",),
+            ("count", "principal", "interest", "attributed_principal", "attributed_interest"), """
+        SELECT i.due_date, COUNT(*), SUM(i.principal_amount), SUM(i.interest_amount),
+            SUM(CASE WHEN s.id IS NOT NULL THEN i.principal_amount ELSE 0 END),
+            SUM(CASE WHEN s.id IS NOT NULL THEN i.interest_amount ELSE 0 END)
+        FROM installments i LEFT JOIN sales s ON s.id = i.sale_id
+        WHERE i.status = 'paid'
+        GROUP BY i.due_date
+    """),
+    # Collections per day paid (due date when paid_date is missing)
+    Summary("collections_by_day", ("day",), ("count", "principal", "interest", "total"), """
+        SELECT substr(COALESCE(paid_date, due_date), 1, 10), COUNT(*),
+            SUM(principal_amount), SUM(interest_amount), SUM(total_amount)
+        FROM installments WHERE status = 'paid'
+        GROUP BY 1
+    """),
+    # Partner transactions per partner and type (withdrawals, capital added)
+    Summary("partner_transaction_totals", ("partner_id", "type"), ("count", "total"), """
+        SELECT partner_id, type, COUNT(*), SUM(amount) FROM transactions GROUP BY partner_id, type
+    """),
+    # Investor transactions per investor and type (profit paid, investments)
+    Summary("investor_transaction_totals", ("investor_id", "type"), ("count", "total"), """
+        SELECT investor_id, type, COUNT(*), SUM(amount) FROM investor_transactions GROUP BY investor_id, type
+    """),
+)}
+
+_INSTALLMENT_AMOUNTS = ("status", "principal_amount", "interest_amount", "total_amount")
+
+CONTRIBUTIONS: List[Contribution] = [
+    Contribution("installment_totals", "installments", ("{row}.status",),
+                 ("1", "{row}.principal_amount", "{row}.interest_amount", "{row}.total_amount"),
+                 watched=_INSTALLMENT_AMOUNTS),
+    Contribution("sale_balances", "installments", ("{row}.sale_id",), (
+        "1",
+        _if(_paid("{row}"), "1"),
+        _if(_paid("{row}"), "{row}.principal_amount"),
+        _if(_paid("{row}"), "{row}.interest_amount"),
+        _if(_paid("{row}"), "{row}.total_amount"),
+        _if(f"NOT {_paid('{row}')}", "{row}.total_amount"),
+    ), watched=("sale_id", *_INSTALLMENT_AMOUNTS)),
+    # A customer's balance is their sales plus those sales' balances
+    Contribution("customer_balances", "sales", ("{row}.customer_id",), (
+        "1",
+        "{row}.down_payment",
+        "COALESCE((SELECT paid_total FROM sale_balances WHERE sale_id = {row}.id), 0)",
+        "COALESCE((SELECT outstanding_total FROM sale_balances WHERE sale_id = {row}.id), 0)",
+    ), watched=("id", "customer_id", "down_payment")),
+    Contribution("customer_balances", "sale_balances", ("(SELECT customer_id FROM sales WHERE id = {row}.sale_id)",),
+                 ("0", "0", "{row}.paid_total", "{row}.outstanding_total"),
+                 when="EXISTS (SELECT 1 FROM sales WHERE id = {row}.sale_id)",
+                 watched=("sale_id", "paid_total", "outstanding_total")),
+    Contribution("sales_by_date", "sales", ("{row}.sale_date",), (
+        "1", "{row}.announced_price", "{row}.purchase_price", "{row}.initial_profit", "{row}.down_payment",
+    ), watched=("sale_date", "announced_price", "purchase_price", "initial_profit", "down_payment")),
+    Contribution("paid_by_due_date", "installments", ("{row}.due_date",), (
+        "1", "{row}.principal_amount", "{row}.interest_amount",
+        _if(_sale_exists("{row}"), "{row}.principal_amount"),
+        _if(_sale_exists("{row}"), "{row}.interest_amount"),
+    ), when=_paid("{row}"), watched=("sale_id", "due_date", *_INSTALLMENT_AMOUNTS)),
+    Contribution("collections_by_day", "installments", ("substr(COALESCE({row}.paid_date, {row}.due_date), 1, 10)",),
+                 ("1", "{row}.principal_amount", "{row}.interest_amount", "{row}.total_amount"),
+                 when=_paid("{row}"), watched=("due_date", "paid_date", *_INSTALLMENT_AMOUNTS)),
+    Contribution("partner_transaction_totals", "transactions", ("{row}.partner_id", "{row}.type"),
+                 ("1", "{row}.amount"), watched=("partner_id", "type", "amount")),
+    Contribution("investor_transaction_totals", "investor_transactions", ("{row}.investor_id", "{row}.type"),
+                 ("1", "{row}.amount"), watched=("investor_id", "type", "amount")),
+]
+
+
+def _attribution(row: str, sign: str) -> str:
+    """Move a sale's paid installments in or out of the attributed sums"""
+    return f"""
+        UPDATE paid_by_due_date SET
+            attributed_principal = attributed_principal {sign} (
+                SELECT SUM(principal_amount) FROM installments
+                WHERE sale_id = {row}.id AND status = 'paid' AND due_date = paid_by_due_date.due_date),
+            attributed_interest = attributed_interest {sign} (
+                SELECT SUM(interest_amount) FROM installments
+                WHERE sale_id = {row}.id AND status = 'paid' AND due_date = paid_by_due_date.due_date)
+        WHERE due_date IN (SELECT due_date FROM installments WHERE sale_id = {row}.id AND status = 'paid');
+    """
+
+
+def _add(contribution: Contribution, row: str) -> str:
+    summary = SUMMARIES[contribution.summary]
+    expressions = [expr.format(row=row) for expr in (*contribution.keys, *contribution.values)]
+    updates = ", ".join(f"{column} = {column} + excluded.{column}" for column in summary.values)
+    return f"""
+        INSERT INTO {summary.table} ({", ".join((*summary.keys, *summary.values))})
+        SELECT {", ".join(expressions)} WHERE {contribution.when.format(row=row)}
+        ON CONFLICT ({", ".join(summary.keys)}) DO UPDATE SET {updates};
+    """
+
+
+def _subtract(contribution: Contribution, row: str) -> str:
+    summary = SUMMARIES[contribution.summary]
+    match = " AND ".join(f"{key} = {expr.format(row=row)}" for key, expr in zip(summary.keys, contribution.keys))
+    updates = ", ".join(
+        f"{column} = {column} - ({expr.format(row=row)})" for column, expr in zip(summary.values, contribution.values)
+    )
+    # The first value column counts source rows; a group with none left goes away
+    return f"""
+        UPDATE {summary.table} SET {updates} WHERE {match} AND {contribution.when.format(row=row)};
+        DELETE FROM {summary.table} WHERE {match} AND {summary.values[0]} = 0;
+    """
+
+
+def _trigger_sql(tables: Sequence[str]) -> List[str]:
+    statements = []
+    for contribution in CONTRIBUTIONS:
+        if contribution.summary not in tables:
+            continue
+        name = f"trg_{contribution.summary}_from_{contribution.source_table}"
+        source = contribution.source_table
+        statements.append(
+            f"CREATE TRIGGER IF NOT EXISTS {name}_insert AFTER INSERT ON {source} "
+            f"BEGIN {_add(contribution, 'NEW')} END"
+        )
+        statements.append(
+            f"CREATE TRIGGER IF NOT EXISTS {name}_delete AFTER DELETE ON {source} "
+            f"BEGIN {_subtract(contribution, 'OLD')} END"
+        )
+        # Only the columns that matter, so the change_seq stamp of the sync
+        # triggers does not re-apply every contribution
+        statements.append(
+            f"CREATE TRIGGER IF NOT EXISTS {name}_update AFTER UPDATE OF {', '.join(contribution.watched)} ON {source} "
+            f"BEGIN {_subtract(contribution, 'OLD')} {_add(contribution, 'NEW')} END"
+        )
+    if "paid_by_due_date" not in tables:
+        return statements
+    # Installments of a deleted (or re-inserted) sale change attribution
+    statements.append(
+        f"CREATE TRIGGER IF NOT EXISTS trg_paid_by_due_date_sale_insert AFTER INSERT ON sales "
+        f"BEGIN {_attribution('NEW', '+')} END"
+    )
+    statements.append(
+        f"CREATE TRIGGER IF NOT EXISTS trg_paid_by_due_date_sale_delete AFTER DELETE ON sales "
+        f"BEGIN {_attribution('OLD', '-')} END"
+    )
+    return statements
+
+
+def create_summaries(conn: sqlite3.Connection, tables: Optional[Sequence[str]] = None) -> None:
+    """Create summary tables (all by default) and their triggers, empty; see rebuild"""
+    tables = list(SUMMARIES) if tables is None else tables
+    for summary in SUMMARIES.values():
+        if summary.table not in tables:
+            continue
+        columns = [f"{key} TEXT NOT NULL" for key in summary.keys]
+        columns += [f"{value} INTEGER NOT NULL DEFAULT 0" for value in summary.values]
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {summary.table} (
+                {", ".join(columns)},
+                PRIMARY KEY ({", ".join(summary.keys)})
+            ) WITHOUT ROWID
+        """)
+    for statement in _trigger_sql(tables):
+        conn.execute(statement)
+
+
+def rebuild(conn: sqlite3.Connection, tables: Optional[Sequence[str]] = None) -> None:
+    """Recompute summary tables from their source rows (in dependency order)"""
+    for summary in SUMMARIES.values():
+        if tables is None or summary.table in tables:
+            conn.execute(f"DELETE FROM {summary.table}")
+            conn.execute(f"INSERT INTO {summary.table} {summary.source}")
+
+
+def check(conn: sqlite3.Connection) -> Dict[str, Tuple[int, int]]:
+    """{table: (stored rows that differ from the source, source rows missing)} for tables that drifted"""
+    drift = {}
+    for summary in SUMMARIES.values():
+        columns = ", ".join((*summary.keys, *summary.values))
+        stored = f"SELECT {columns} FROM {summary.table}"
+        wrong = conn.execute(f"SELECT COUNT(*) FROM ({stored} EXCEPT {summary.source})").fetchone()[0]
+        missing = conn.execute(f"SELECT COUNT(*) FROM ({summary.source} EXCEPT {stored})").fetchone()[0]
+        if wrong or missing:
+            drift[summary.table] = (wrong, missing)
+    return drift
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "check"
+    if command not in ("check", "rebuild"):
+        raise SystemExit(f"Unknown command '{command}'; use check or rebuild")
+    conn = database.connect(database.DATABASE_URL)
+    conn.isolation_level = None
+    try:
+        if command == "rebuild":
+            conn.execute("BEGIN IMMEDIATE")
+            rebuild(conn)
+            conn.execute("COMMIT")
+            print(f"✅ Rebuilt {len(SUMMARIES)} summary tables")
+        else:
+            conn.execute("BEGIN")
+            drift = check(conn)
+            conn.execute("COMMIT")
+            for table, (wrong, missing) in drift.items():
+                print(f"❌ {table}: {wrong} stale rows, {missing} missing rows (run `python summaries.py rebuild`)")
+            if not drift:
+                print(f"✅ {len(SUMMARIES)} summary tables match their source")
+            sys.exit(1 if drift else 0)
+    finally:
+        conn.close()
@@ -0,0 +1,232 @@
+"""Single-writer queue with group commit.
+
+SQLite allows one writer at a time, so instead of every mutating request
+opening its own transaction and fighting for the write lock, write jobs are
+queued to one writer thread that owns one connection. Jobs that arrive while
+a commit is in progress are executed together in the next transaction, each
+inside its own SAVEPOINT: a failing job is rolled back alone and gets its own
+exception, the rest share a single COMMIT (and a single fsync).
+
+Inside a job, ``database.get_db()`` hands out the writer connection, so
+handler code does not change. If the writer cannot open its connection, the
+error is logged and every queued and later job fails with it.
+"""
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Executor, Future
+from typing import Callable, List, Optional, Tuple
+
+import database
+
+DB_WRITE_MAX_BATCH = int(os.getenv("DB_WRITE_MAX_BATCH", "64"))
+DB_WRITE_BATCH_WAIT_MS = float(os.getenv("DB_WRITE_BATCH_WAIT_MS", "0"))
+
+# Upper bounds of the commit batch-size histogram buckets (plus one overflow bucket)
+_BATCH_BUCKETS = (1, 2, 4, 8, 16, 32)
+
+_Job = Tuple[Future, Callable, tuple, dict]
+_STOP = object()
+
+logger = logging.getLogger(__name__)
+
+
+class WriteCoordinator(Executor):
+    """Executor that serializes write jobs through one connection with group commit"""
+
+    def __init__(self, max_batch: int = DB_WRITE_MAX_BATCH, batch_wait_ms: float = DB_WRITE_BATCH_WAIT_MS):
+        self.max_batch = max(1, max_batch)
+        self.batch_wait = batch_wait_ms / 1000
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._shutdown = False
+        # Why the writer connection could not be opened; every job fails with it
+        self._broken: Optional[BaseException] = None
+        self._stats_lock = threading.Lock()
+        self._started_at = time.monotonic()
+        self._jobs = 0
+        self._failed_jobs = 0
+        self._commits = 0
+        self._failed_commits = 0
+        self._max_batch_seen = 0
+        self._commit_time = 0.0
+        self._histogram = {f"<={bucket}": 0 for bucket in _BATCH_BUCKETS}
+        self._histogram[f">{_BATCH_BUCKETS[-1]}"] = 0
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        if self._shutdown:
+            raise RuntimeError("Write coordinator has been shut down")
+        self._ensure_started()
+        future: Future = Future()
+        if self._broken is not None:
+            future.set_exception(self._broken)
+            return future
+        self._queue.put((future, fn, args, kwargs))
+        if self._broken is not None:
+            # The writer thread may have drained the queue before this put
+            self._fail_queued(self._broken)
+        return future
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        self._shutdown = True
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        if wait:
+            self._thread.join()
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+                self._thread.start()
+
+    def _next_batch(self) -> Tuple[List[_Job], bool]:
+        """Block for one job, then take whatever else is already queued"""
+        first = self._queue.get()
+        if first is _STOP:
+            return [], True
+        batch = [first]
+        deadline = time.monotonic() + self.batch_wait
+        while len(batch) < self.max_batch:
+            try:
+                remaining = deadline - time.monotonic()
+                job = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is _STOP:
+                return batch, True
+            batch.append(job)
+        return batch, False
+
+    def _fail_queued(self, exc: BaseException) -> None:
+        """Fail every job still in the queue with ``exc``"""
+        while True:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if job is not _STOP and job[0].set_running_or_notify_cancel():
+                job[0].set_exception(exc)
+
+    def _run(self) -> None:
+        try:
+            conn = database.connect()
+        except Exception as exc:
+            # Without a connection no write can run: fail queued and later jobs
+            # instead of leaving their requests waiting forever
+            logger.exception("Write coordinator could not open the database; failing all writes")
+            self._broken = exc
+            self._fail_queued(exc)
+            return
+        # Transactions are managed explicitly with BEGIN/SAVEPOINT/COMMIT
+        conn.isolation_level = None
+        try:
+            stop = False
+            while not stop:
+                batch, stop = self._next_batch()
+                if not batch:
+                    continue
+                try:
+                    self._execute_batch(conn, batch)
+                except Exception as exc:
+                    # Never let the writer thread die; fail whatever is still pending
+                    for future, *_ in batch:
+                        if not future.done():
+                            future.set_exception(exc)
+        finally:
+            conn.close()
+
+    def _execute_batch(self, conn: sqlite3.Connection, batch: List[_Job]) -> None:
+        outcomes = []
+        running = [job for job in batch if job[0].set_running_or_notify_cancel()]
+        if not running:
+            return
+
+        started = time.perf_counter()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for future, fn, args, kwargs in running:
+                conn.execute("SAVEPOINT write_job")
+                database.bind_writer_connection(conn)
+                try:
+                    result = fn(*args, **kwargs)
+                except Exception as exc:
+                    conn.execute("ROLLBACK TO write_job")
+                    conn.execute("RELEASE write_job")
+                    outcomes.append((future, None, exc))
+                else:
+                    conn.execute("RELEASE write_job")
+                    outcomes.append((future, result, None))
+                finally:
+                    database.bind_writer_connection(None)
+
+            started = time.perf_counter()
+            conn.execute("COMMIT")
+        except sqlite3.Error as exc:
+            # The whole transaction is lost (lock timeout, disk full, failed
+            # COMMIT ...): every job in the batch fails with the same error
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            for future, *_ in running:
+                future.set_exception(exc)
+            self._record(len(running), failed_jobs=len(running), commit_failed=True,
+                         commit_time=time.perf_counter() - started)
+            return
+        commit_time = time.perf_counter() - started
+
+        failed = 0
+        for future, result, exc in outcomes:
+            if exc is not None:
+                failed += 1
+                future.set_exception(exc)
+            else:
+                future.set_result(result)
+        self._record(len(outcomes), failed_jobs=failed, commit_failed=False, commit_time=commit_time)
+
+    def _record(self, size: int, failed_jobs: int, commit_failed: bool, commit_time: float) -> None:
+        with self._stats_lock:
+            self._jobs += size
+            self._failed_jobs += failed_jobs
+            self._commit_time += commit_time
+            if commit_failed:
+                self._failed_commits += 1
+                return
+            self._commits += 1
+            self._max_batch_seen = max(self._max_batch_seen, size)
+            for bucket in _BATCH_BUCKETS:
+                if size <= bucket:
+                    self._histogram[f"<={bucket}"] += 1
+                    break
+            else:
+                self._histogram[f">{_BATCH_BUCKETS[-1]}"] += 1
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            uptime = time.monotonic() - self._started_at
+            return {
+                "queued": self._queue.qsize(),
+                "jobs": self._jobs,
+                "failed_jobs": self._failed_jobs,
+                "commits": self._commits,
+                "failed_commits": self._failed_commits,
+                "avg_batch_size": round(self._jobs / self._commits, 2) if self._commits else 0.0,
+                "max_batch_size": self._max_batch_seen,
+                "batch_size_histogram": dict(self._histogram),
+                "avg_commit_ms": round(self._commit_time / self._commits * 1000, 3) if self._commits else 0.0,
+                "jobs_per_second": round(self._jobs / uptime, 2) if uptime > 0 else 0.0,
+            }
+
+
+writer = WriteCoordinator()
+
+
+def get_writer_stats() -> dict:
+    """Throughput and commit batch-size metrics of the writer thread"""
+    return writer.stats()
@@ -15,7 +15,13 @@ mkdir -p "$BACKUP_DIR"
 
 # بکاپ گرفتن
 echo "$(date): شروع بکاپ..."
-cp "$DB_PATH" "$BACKUP_FILE"
+# دیتابیس در حالت WAL هست، پس به جای cp از backup API خود SQLite استفاده می‌کنیم
+# تا تغییرات داخل فایل -wal هم در بکاپ باشه
+if command -v sqlite3 >/dev/null 2>&1; then
+    sqlite3 "$DB_PATH" ".backup '$BACKUP_FILE'"
+else
+    python3 -c "import sqlite3, sys; sqlite3.connect(sys.argv[1]).backup(sqlite3.connect(sys.argv[2]))" "$DB_PATH" "$BACKUP_FILE"
+fi
 
 # فشرده‌سازی
 gzip "$BACKUP_FILE"
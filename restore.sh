@@ -33,10 +33,24 @@ docker compose stop backend
 
 # بکاپ از دیتابیس فعلی (احتیاط)
 echo "بکاپ احتیاطی از دیتابیس فعلی..."
-cp "$DB_PATH" "${DB_PATH}.before_restore_$(date +%Y%m%d_%H%M%S)"
+# با backup API خود SQLite (مثل backup.sh) تا تغییرات داخل -wal هم در این کپی باشه،
+# چون بعدش فایل‌های -wal/-shm پاک می‌شن
+SAFETY_FILE="${DB_PATH}.before_restore_$(date +%Y%m%d_%H%M%S)"
+if command -v sqlite3 >/dev/null 2>&1; then
+    sqlite3 "$DB_PATH" ".backup '$SAFETY_FILE'"
+else
+    python3 -c "import sqlite3, sys; sqlite3.connect(sys.argv[1]).backup(sqlite3.connect(sys.argv[2]))" "$DB_PATH" "$SAFETY_FILE"
+fi
+if [ $? -ne 0 ] || [ ! -s "$SAFETY_FILE" ]; then
+    echo "خطا: بکاپ احتیاطی ساخته نشد، بازیابی انجام نمی‌شه."
+    docker compose start backend
+    exit 1
+fi
 
 # بازیابی
 echo "بازیابی دیتابیس..."
+# فایل‌های WAL قدیمی نباید روی دیتابیس بازیابی‌شده اعمال بشن
+rm -f "${DB_PATH}-wal" "${DB_PATH}-shm"
 gunzip -c "$BACKUP_DIR/$BACKUP_FILE" > "$DB_PATH"
 
 # راه‌اندازی مجدد backend
@@ -1,4 +1,5 @@
 // API Store - connects to FastAPI backend
+import type { FinancialSummary } from './profitCalculator';
 
 const API_BASE_URL = import.meta.env.VITE_API_URL || '';
 
@@ -17,6 +18,12 @@ export interface Partner {
   deletedAt?: string; // تاریخ غیرفعال شدن
 }
 
+export interface CapitalShares {
+  at: string;
+  totalCapital: number;
+  partners: { partnerId: string; capital: number; share: number }[];
+}
+
 export interface Transaction {
   id: string;
   partnerId: string;
@@ -69,6 +76,20 @@ export interface Sale {
   status: 'active' | 'completed' | 'defaulted';
 }
 
+// فروش به همراه مشتری، گوشی و وضعیت بازپرداخت (GET /api/sales/enriched)
+export interface SaleEnriched extends Sale {
+  customerName: string | null;
+  phoneBrand: string | null;
+  phoneModel: string | null;
+  phoneImei: string | null;
+  installmentCount: number;
+  paidInstallments: number;
+  remainingInstallments: number;
+  paidAmount: number;
+  outstandingBalance: number;
+  nextDueDate: string | null;
+}
+
 export interface Installment {
   id: string;
   saleId: string;
@@ -91,6 +112,40 @@ export interface Expense {
   createdAt: string;
 }
 
+export interface ExpenseTotal {
+  count: number;
+  total: number;
+}
+
+export interface ExpenseSummary extends ExpenseTotal {
+  byType: (ExpenseTotal & { type: string })[];
+  byMonth: (ExpenseTotal & { month: string })[];
+}
+
+// مانده‌ها و جمع‌ها از جدول‌های خلاصه سرور (backend/summaries.py)
+export interface CustomerBalance {
+  customerId: string;
+  saleCount: number;
+  downPayments: number;
+  paidInstallments: number;
+  totalPaid: number;
+  outstandingBalance: number;
+}
+
+export interface CollectionMonth {
+  month: string; // YYYY-MM
+  count: number;
+  principal: number;
+  interest: number;
+  total: number;
+}
+
+export interface TransactionTotal {
+  type: string;
+  count: number;
+  total: number;
+}
+
 export interface Investor {
   id: string;
   name: string;
@@ -143,6 +198,12 @@ export const partnersStore = {
     return await apiCall<Partner[]>('/api/partners/all');
   },
 
+  // سهم هر شریک از سرمایه کل در یک زمان (پیش‌فرض: الان)
+  getSharesAt: async (at?: string): Promise<CapitalShares> => {
+    const query = at ? `?${new URLSearchParams({ at })}` : '';
+    return await apiCall<CapitalShares>(`/api/partners/shares${query}`);
+  },
+
   add: async (partner: Omit<Partner, 'id' | 'createdAt' | 'availableCapital' | 'initialProfit' | 'monthlyProfit'> & { joinDate?: string }): Promise<Partner> => {
     return await apiCall<Partner>('/api/partners', {
       method: 'POST',
@@ -199,6 +260,10 @@ export const customersStore = {
     return await apiCall<Customer[]>('/api/customers');
   },
 
+  getBalance: async (id: string): Promise<CustomerBalance> => {
+    return await apiCall<CustomerBalance>(`/api/customers/${id}/balance`);
+  },
+
   add: async (customer: Omit<Customer, 'id' | 'createdAt'>): Promise<Customer> => {
     return await apiCall<Customer>('/api/customers', {
       method: 'POST',
@@ -227,6 +292,11 @@ export const salesStore = {
     return await apiCall<Sale[]>('/api/sales');
   },
 
+  getEnriched: async (status?: Sale['status']): Promise<SaleEnriched[]> => {
+    const query = status ? `?${new URLSearchParams({ status })}` : '';
+    return await apiCall<SaleEnriched[]>(`/api/sales/enriched${query}`);
+  },
+
   add: async (sale: Omit<Sale, 'id'>): Promise<Sale> => {
     return await apiCall<Sale>('/api/sales', {
       method: 'POST',
@@ -259,6 +329,13 @@ export const installmentsStore = {
     return await apiCall<Installment[]>(`/api/installments/sale/${saleId}`);
   },
 
+  getCollections: async (range: { from?: string; to?: string } = {}): Promise<CollectionMonth[]> => {
+    const params = new URLSearchParams(
+      Object.entries(range).filter(([, value]) => value) as [string, string][]
+    );
+    return await apiCall<CollectionMonth[]>(`/api/installments/collections?${params}`);
+  },
+
   add: async (installment: Omit<Installment, 'id'>): Promise<Installment> => {
     return await apiCall<Installment>('/api/installments', {
       method: 'POST',
@@ -291,6 +368,10 @@ export const transactionsStore = {
     return await apiCall<Transaction[]>(`/api/transactions/partner/${partnerId}`);
   },
 
+  getTotalsByPartnerId: async (partnerId: string): Promise<TransactionTotal[]> => {
+    return await apiCall<TransactionTotal[]>(`/api/transactions/partner/${partnerId}/totals`);
+  },
+
   add: async (transaction: Omit<Transaction, 'id' | 'date'>): Promise<Transaction> => {
     return await apiCall<Transaction>('/api/transactions', {
       method: 'POST',
@@ -382,23 +463,153 @@ export const expensesStore = {
   },
 
   getByDateRange: async (startDate: string, endDate: string): Promise<Expense[]> => {
-    const expenses = await expensesStore.getAll();
-    return expenses.filter(e => {
-      const expenseDate = new Date(e.date);
-      const start = new Date(startDate);
-      const end = new Date(endDate);
-      return expenseDate >= start && expenseDate <= end;
-    });
+    try {
+      const params = new URLSearchParams({ from: startDate, to: endDate });
+      return await apiCall<Expense[]>(`/api/expenses?${params}`);
+    } catch (error) {
+      const expenses = await expensesStore.getAll();
+      return expenses.filter(e => {
+        const expenseDate = new Date(e.date);
+        const start = new Date(startDate);
+        const end = new Date(endDate);
+        return expenseDate >= start && expenseDate <= end;
+      });
+    }
   },
 
   getByType: async (type: string): Promise<Expense[]> => {
-    const expenses = await expensesStore.getAll();
-    return expenses.filter(e => e.type === type);
+    try {
+      return await apiCall<Expense[]>(`/api/expenses?${new URLSearchParams({ type })}`);
+    } catch (error) {
+      const expenses = await expensesStore.getAll();
+      return expenses.filter(e => e.type === type);
+    }
+  },
+
+  // جمع‌ها در سرور محاسبه می‌شن (کل، به تفکیک نوع و ماه)
+  getSummary: async (filters: { from?: string; to?: string; type?: string } = {}): Promise<ExpenseSummary> => {
+    const params = new URLSearchParams(
+      Object.entries(filters).filter(([, value]) => value) as [string, string][]
+    );
+    return apiCall<ExpenseSummary>(`/api/expenses/summary?${params}`);
   },
 
   getTotalAmount: async (): Promise<number> => {
-    const expenses = await expensesStore.getAll();
-    return expenses.reduce((sum, e) => sum + e.amount, 0);
+    try {
+      return (await expensesStore.getSummary()).total;
+    } catch (error) {
+      const expenses = await expensesStore.getAll();
+      return expenses.reduce((sum, e) => sum + e.amount, 0);
+    }
+  },
+};
+
+// وضعیت مالی شرکا در سرور محاسبه می‌شه (همان نتیجه calculateFinancialsFromData)
+export const financialsStore = {
+  get: (): Promise<FinancialSummary> => apiCall('/api/financials/'),
+};
+
+// خلاصه داشبورد: چند جمع SQL در سرور، اندازه پاسخ به حجم داده بستگی نداره
+export interface InstallmentTotal {
+  count: number;
+  total: number;
+}
+
+export interface DashboardSummary {
+  totalSales: number;
+  totalRevenue: number;
+  activeCustomers: number;
+  totalCapital: number; // شرکا + سرمایه‌گذاران
+  partnersCapital: number;
+  investorsCapital: number;
+  usedCapital: number;
+  receivables: InstallmentTotal; // اقساط در انتظار و معوق
+  dueOrOverdue: InstallmentTotal; // معوق + در انتظارهایی که سررسیدشون رسیده (جزو receivables هم هستن)
+  collected: InstallmentTotal;
+  initialProfit: number;
+  monthlyProfit: number;
+  totalProfit: number;
+  totalExpenses: number;
+  investorsProfitPaid: number;
+  netProfit: number;
+}
+
+export const dashboardStore = {
+  getSummary: (): Promise<DashboardSummary> => apiCall('/api/dashboard/summary'),
+};
+
+// جمع‌های ماهانه شمسی: GROUP BY روی جدول تقویم سرور (backend/jalali.py)، بدون تبدیل تاریخ در مرورگر
+export interface JalaliMonth {
+  year: number;
+  month: number; // ۱ = فروردین .. ۱۲ = اسفند
+  count: number;
+}
+
+export interface JalaliSalesMonth extends JalaliMonth {
+  revenue: number;
+  purchaseTotal: number;
+  initialProfit: number;
+  downPayments: number;
+}
+
+export interface JalaliCollectionsMonth extends JalaliMonth {
+  principal: number;
+  interest: number;
+  total: number;
+}
+
+export interface JalaliInterestMonth extends JalaliMonth {
+  interest: number;
+}
+
+export interface JalaliExpensesMonth extends JalaliMonth {
+  total: number;
+}
+
+// from و to تاریخ میلادی (YYYY-MM-DD) هستن، هر دو شامل
+function jalaliMonths<T>(report: string, range: { from?: string; to?: string } = {}): Promise<T[]> {
+  const params = new URLSearchParams(
+    Object.entries(range).filter(([, value]) => value) as [string, string][]
+  );
+  return apiCall<T[]>(`/api/reports/jalali-months/${report}?${params}`);
+}
+
+export const reportsStore = {
+  getSalesByJalaliMonth: (range?: { from?: string; to?: string }) =>
+    jalaliMonths<JalaliSalesMonth>('sales', range),
+  getCollectionsByJalaliMonth: (range?: { from?: string; to?: string }) =>
+    jalaliMonths<JalaliCollectionsMonth>('collections', range),
+  getInterestByJalaliMonth: (range?: { from?: string; to?: string }) =>
+    jalaliMonths<JalaliInterestMonth>('interest', range),
+  getExpensesByJalaliMonth: (range?: { from?: string; to?: string }) =>
+    jalaliMonths<JalaliExpensesMonth>('expenses', range),
+};
+
+// Batch: چند لیست در یک درخواست و از یک snapshot دیتابیس (POST /api/batch)
+export interface BatchQuery {
+  resource: string;
+  key?: string;
+  limit?: number;
+  cursor?: string;
+  fields?: string;
+  status?: string;
+  from?: string;
+  to?: string;
+  type?: string;
+}
+
+export interface BatchResult<T = unknown> {
+  data: T;
+  nextCursor?: string | null;
+}
+
+export const batchStore = {
+  get: async (queries: BatchQuery[]): Promise<Record<string, BatchResult>> => {
+    const response = await apiCall<{ results: Record<string, BatchResult> }>('/api/batch', {
+      method: 'POST',
+      body: JSON.stringify({ queries }),
+    });
+    return response.results;
   },
 };
 
@@ -438,6 +649,8 @@ export const investorsStore = {
       method: 'POST',
       body: JSON.stringify({ amount, description: description || '' }),
     }),
+
+  getTotals: (id: string): Promise<TransactionTotal[]> => apiCall(`/api/investors/${id}/totals`),
 };
 
 // Investor Transactions
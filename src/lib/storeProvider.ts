@@ -27,6 +27,10 @@ export const transactionsStore = apiStore.transactionsStore;
 export const expensesStore = apiStore.expensesStore;
 export const investorsStore = apiStore.investorsStore;
 export const investorTransactionsStore = apiStore.investorTransactionsStore;
+export const batchStore = apiStore.batchStore;
+export const financialsStore = apiStore.financialsStore;
+export const dashboardStore = apiStore.dashboardStore;
+export const reportsStore = apiStore.reportsStore;
 
 // Health check
 export const checkApiHealth = apiStore.checkApiHealth;
@@ -31,25 +31,20 @@ import {
   AlertDialogTitle,
 } from "@/components/ui/alert-dialog";
 import {
-  salesStore,
-  customersStore,
-  installmentsStore,
-  partnersStore,
-  transactionsStore,
-  expensesStore,
-  phonesStore,
+  batchStore,
   Partner,
   Transaction,
   Sale,
   Phone,
   Expense,
 } from "@/lib/storeProvider";
+import type { DashboardSummary, JalaliSalesMonth } from "@/lib/apiStore";
+import type { FinancialSummary } from "@/lib/profitCalculator";
 import { ChartContainer, ChartTooltip, ChartTooltipContent, ChartLegend, ChartLegendContent } from "@/components/ui/chart";
 import { Line, LineChart, Pie, PieChart, Cell, Bar, BarChart, XAxis, YAxis, CartesianGrid, Area, AreaChart } from "recharts";
 import { formatCurrency, toPersianDigits, toJalaliDate } from "@/lib/persian";
-import { dateToJalali, jalaliMonthNames } from "@/lib/jalali";
+import { jalaliMonthNames } from "@/lib/jalali";
 import { loadSampleData, clearAllData } from "@/lib/sampleData";
-import { calculateFinancialsFromData } from "@/lib/profitCalculator";
 import { useToast } from "@/hooks/use-toast";
 import { cn } from "@/lib/utils";
 
@@ -90,79 +85,42 @@ const Dashboard = () => {
   const [sales, setSales] = useState<Sale[]>([]);
   const [phones, setPhones] = useState<Phone[]>([]);
   const [expenses, setExpenses] = useState<Expense[]>([]);
+  const [salesByMonth, setSalesByMonth] = useState<JalaliSalesMonth[]>([]);
   const [loading, setLoading] = useState(true);
   const { toast } = useToast();
   const { refreshDashboard } = useDataContext();
 
   const fetchDashboardStats = useCallback(async () => {
     try {
-      const [allSales, customers, allInstallments, allTransactions, allPartners, allExpenses, allPhones, allInvestors, allInvestorTransactions] = await Promise.all([
-        salesStore.getAll(),
-        customersStore.getAll(),
-        installmentsStore.getAll(),
-        transactionsStore.getAll(),
-        partnersStore.getAll(),
-        expensesStore.getAll(),
-        phonesStore.getAll(),
-        (async () => {
-          try {
-            const { investorsStore } = await import('@/lib/storeProvider');
-            return await investorsStore.getAll();
-          } catch {
-            return [];
-          }
-        })(),
-        (async () => {
-          try {
-            const { investorTransactionsStore } = await import('@/lib/storeProvider');
-            return await investorTransactionsStore.getAll();
-          } catch {
-            return [];
-          }
-        })(),
-      ]);
-
-      setTransactions(allTransactions);
-      setPartners(allPartners);
-      setSales(allSales);
-      setExpenses(allExpenses);
-      setPhones(allPhones);
-
-      const totalRevenue = allSales.reduce((sum, sale) => sum + sale.announcedPrice, 0);
-      
-      const pendingInstallments = allInstallments
-        .filter(i => i.status === 'pending' || i.status === 'overdue')
-        .reduce((sum, inst) => sum + inst.totalAmount, 0);
-
-      // دریافت تمام شرکا (شامل غیرفعال‌ها) برای محاسبات دقیق
-      const allPartnersIncludingInactive = await partnersStore.getAllIncludingInactive();
-      const financials = calculateFinancialsFromData(allPartners, allSales, allInstallments, allPartnersIncludingInactive);
-      const totalExpenses = allExpenses.reduce((sum, e) => sum + e.amount, 0);
-      
-      // محاسبه سرمایه سرمایه‌گذاران
-      const investorsCapital = allInvestors.reduce((sum, inv) => sum + inv.investmentAmount, 0);
-      
-      // محاسبه سود پرداختی به سرمایه‌گذاران
-      const investorsProfitPaid = allInvestorTransactions
-        .filter(t => t.type === 'profit_payment')
-        .reduce((sum, t) => sum + t.amount, 0);
-      
-      // سود خالص = سود کل - هزینه‌ها - سود پرداختی به سرمایه‌گذاران
-      const netProfit = financials.totalProfit - totalExpenses - investorsProfitPaid;
+      // جمع‌ها در سرور محاسبه می‌شن؛ لیست‌ها فقط برای نمودارها و تراکنش‌های اخیر
+      const results = await batchStore.get(
+        ['dashboardSummary', 'financials', 'sales', 'transactions', 'partners', 'expenses', 'phones', 'jalaliSales']
+          .map(resource => ({ resource }))
+      );
+      const summary = results.dashboardSummary.data as DashboardSummary;
+      const financials = results.financials.data as FinancialSummary;
+
+      setTransactions(results.transactions.data as Transaction[]);
+      setPartners(results.partners.data as Partner[]);
+      setSales(results.sales.data as Sale[]);
+      setExpenses(results.expenses.data as Expense[]);
+      setPhones(results.phones.data as Phone[]);
+      setSalesByMonth(results.jalaliSales.data as JalaliSalesMonth[]);
 
       setStats({
-        totalRevenue,
-        totalSales: allSales.length,
-        activeCustomers: customers.length,
-        pendingInstallments,
-        totalCapital: financials.totalCapital + investorsCapital, // سرمایه کل شامل سرمایه سرمایه‌گذاران
+        totalRevenue: summary.totalRevenue,
+        totalSales: summary.totalSales,
+        activeCustomers: summary.activeCustomers,
+        pendingInstallments: summary.receivables.total,
+        // سرمایه و سود همه از financials (همون محاسبه صفحه مالی) تا با هم جور باشن
+        totalCapital: financials.totalCapital + summary.investorsCapital, // سرمایه کل شامل سرمایه سرمایه‌گذاران
         availableCapital: financials.totalAvailableCapital,
         usedCapital: financials.totalUsedCapital,
         initialProfit: financials.totalInitialProfit,
         monthlyProfit: financials.totalMonthlyProfit,
         totalProfit: financials.totalProfit,
-        totalExpenses,
-        netProfit,
+        totalExpenses: summary.totalExpenses,
+        netProfit: financials.totalProfit - summary.totalExpenses - summary.investorsProfitPaid, // سود کل - هزینه‌ها - سود پرداختی به سرمایه‌گذاران
       });
     } catch (error) {
       console.error('Error loading dashboard stats:', error);
@@ -247,14 +205,10 @@ const Dashboard = () => {
 
   // آماده‌سازی داده‌های نمودارها
   // 1. نمودار خطی - Total Revenue (ماهانه)
-  const monthlyRevenue = sales.reduce((acc, sale) => {
-    const date = new Date(sale.saleDate);
-    const jalali = dateToJalali(date);
-    const month = jalaliMonthNames[jalali.month - 1];
-    if (!acc[month]) {
-      acc[month] = 0;
-    }
-    acc[month] += sale.announcedPrice;
+  // جمع ماهانه (شمسی) در سرور محاسبه می‌شه؛ ماه‌های همه سال‌ها با هم جمع می‌شن
+  const monthlyRevenue = salesByMonth.reduce((acc, row) => {
+    const month = jalaliMonthNames[row.month - 1];
+    acc[month] = (acc[month] || 0) + row.revenue;
     return acc;
   }, {} as Record<string, number>);
 
@@ -315,14 +269,9 @@ const Dashboard = () => {
     }));
 
   // 4. نمودار میله‌ای عمودی - Monthly Sales (تعداد فروش ماهانه)
-  const monthlySalesCount = sales.reduce((acc, sale) => {
-    const date = new Date(sale.saleDate);
-    const jalali = dateToJalali(date);
-    const month = jalaliMonthNames[jalali.month - 1];
-    if (!acc[month]) {
-      acc[month] = 0;
-    }
-    acc[month] += 1;
+  const monthlySalesCount = salesByMonth.reduce((acc, row) => {
+    const month = jalaliMonthNames[row.month - 1];
+    acc[month] = (acc[month] || 0) + row.count;
     return acc;
   }, {} as Record<string, number>);
 
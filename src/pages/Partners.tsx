@@ -24,9 +24,9 @@ import {
 import { Input } from "@/components/ui/input";
 import { Label } from "@/components/ui/label";
 import { Badge } from "@/components/ui/badge";
-import { partnersStore, Partner, transactionsStore, Transaction, salesStore, installmentsStore } from "@/lib/storeProvider";
+import { partnersStore, Partner, transactionsStore, Transaction, financialsStore } from "@/lib/storeProvider";
 import { formatCurrency, toPersianDigits } from "@/lib/persian";
-import { calculateFinancialsFromData, PartnerFinancials } from "@/lib/profitCalculator";
+import type { PartnerFinancials } from "@/lib/profitCalculator";
 import { Plus, Edit, Trash2, Users, TrendingUp, DollarSign, ArrowUp, ArrowDown, Eye, Percent, CreditCard, Wallet, PieChart, Activity, Calendar, FileText, Sparkles, Target, Zap, User, CheckCircle2, AlertCircle } from "lucide-react";
 import { useToast } from "@/hooks/use-toast";
 import { cn } from "@/lib/utils";
@@ -65,10 +65,9 @@ const Partners = () => {
 
   const loadPartners = useCallback(async () => {
     try {
-      const [data, sales, installments] = await Promise.all([
+      const [data, financials] = await Promise.all([
         partnersStore.getAll(),
-        salesStore.getAll(),
-        installmentsStore.getAll(),
+        financialsStore.get(),
       ]);
       
       // محاسبه سهم هر شریک بر اساس سرمایه
@@ -79,9 +78,7 @@ const Partners = () => {
       }));
       setPartners(partnersWithShare);
 
-      // محاسبه وضعیت مالی هر شریک با در نظر گیری تمام شرکا (شامل غیرفعال‌ها)
-      const allPartnersIncludingInactive = await partnersStore.getAllIncludingInactive();
-      const financials = calculateFinancialsFromData(data, sales, installments, allPartnersIncludingInactive);
+      // وضعیت مالی هر شریک (با در نظر گیری شرکای غیرفعال) در سرور محاسبه می‌شه
       const financialMap = new Map<string, PartnerFinancials>();
       financials.partnerFinancials.forEach(p => {
         financialMap.set(p.partnerId, p);